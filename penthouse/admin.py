@@ -2,21 +2,100 @@
 # SPDX-License-Identifier: MIT
 # SPDX-FileType: SOURCE
 
-"""Integrates the app's models into Django's admin interface."""
+"""Integrates the app's models into Django's admin interface.
+
+The changelists are meant to work with millions of runs: related objects are
+joined instead of queried per row, the unfiltered tables are not counted (see
+:class:`~penthouse.pagination.EstimatedCountPaginator`), the date hierarchy
+and the tier filter are backed by indexes of ``Run`` and the profiles are
+not provided as a dropdown of all profiles. Profiles and runs are deleted
+in bulk, see :mod:`penthouse.bulk`.
+"""
 
 # Django imports
 from django.contrib import admin
+from django.contrib.admin import ShowFacets
+from django.http import StreamingHttpResponse
+from django.utils.translation import gettext_lazy as _
 
 # app imports
+from penthouse.bulk import delete_profile, delete_runs
+from penthouse.exporter import CONTENT_TYPES, STORED_COLUMNS, get_stored_rows, write_csv
+from penthouse.importer import FORMAT_CSV
 from penthouse.models.profile import Profile
 from penthouse.models.tracker import Run
+from penthouse.pagination import EstimatedCountPaginator
 
 
 @admin.register(Profile)
 class ProfileAdmin(admin.ModelAdmin):  # noqa: D101
-    pass
+    list_display = ("__str__", "settings_tracker_avg_windows")
+    list_select_related = ("owner",)
+    ordering = ("owner__username",)
+    raw_id_fields = ("owner",)
+    # required by the autocomplete of RunAdmin
+    search_fields = ("owner__username",)
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = ShowFacets.NEVER
+
+    def delete_model(self, request, obj):
+        """Delete the profile with all of its runs at once.
+
+        See :func:`penthouse.bulk.delete_profile`.
+        """
+        delete_profile(obj)
+
+    def delete_queryset(self, request, queryset):
+        """Delete the profiles one by one, see :meth:`delete_model`."""
+        for profile in queryset:
+            delete_profile(profile)
 
 
 @admin.register(Run)
 class RunAdmin(admin.ModelAdmin):  # noqa: D101
-    pass
+    list_display = (
+        "__str__",
+        "profile",
+        "date",
+        "tier",
+        "waves",
+        "duration",
+        "coins",
+        "cells",
+    )
+    list_filter = ("tier",)
+    list_select_related = ("profile__owner",)
+    autocomplete_fields = ("profile",)
+    date_hierarchy = "date"
+    ordering = ("-date", "-id")
+    actions = ["export_csv"]
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = ShowFacets.NEVER
+
+    def delete_queryset(self, request, queryset):
+        """Delete the runs by profile, see :func:`penthouse.bulk.delete_runs`.
+
+        The derived data is maintained once per profile instead of by the
+        receivers of every single run.
+        """
+        delete_runs(queryset)
+
+    @admin.action(description=_("Export selected runs as CSV"))
+    def export_csv(self, request, queryset):
+        """Stream the stored values of the selected runs as CSV file.
+
+        The runs are fetched in chunks, see
+        :func:`~penthouse.exporter.get_stored_rows`, so all runs of a
+        changelist may be exported at once.
+        """
+        response = StreamingHttpResponse(
+            write_csv(get_stored_rows(queryset), STORED_COLUMNS),
+            content_type=CONTENT_TYPES[FORMAT_CSV],
+        )
+        response["Content-Disposition"] = 'attachment; filename="runs.csv"'
+
+        return response
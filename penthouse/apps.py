@@ -11,8 +11,8 @@ from django.apps import AppConfig
 class PenthouseConfig(AppConfig):
     """Application-specific configuration class, as required by Django.
 
-    As of now, this doesn't really do anything and just provides meta
-    information.
+    Besides providing meta information, this connects the app's signal
+    receivers.
     """
 
     name = "penthouse"
@@ -20,4 +20,5 @@ class PenthouseConfig(AppConfig):
 
     def ready(self):
         """Apply app-specific stuff."""
-        pass
+        # app imports
+        from penthouse import signals  # noqa: F401
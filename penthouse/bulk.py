@@ -0,0 +1,148 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Bulk changes of the runs of a profile.
+
+Selected runs are deleted, moved to another tier or shifted in time with a
+single ``QuerySet.delete()`` or ``QuerySet.update()``, restricted to the runs
+of the profile. The derived data (personal bests, rollups, sketches and
+cached data) is maintained once for all runs, within the same transaction, instead of by
+the receivers of every single run, see :mod:`penthouse.signals`.
+
+:func:`delete_profile` deletes a profile with all of its runs the same way.
+"""
+
+# Python imports
+import logging
+
+# Django imports
+from django.db import transaction
+from django.db.models import F, Min
+
+# app imports
+from penthouse.cache import bump_generation
+from penthouse.models.personal_best import PersonalBest
+from penthouse.models.profile import Profile
+from penthouse.models.rollup import RunRollup
+from penthouse.models.sketch import SKETCH_FIELDS, RunSketch
+from penthouse.models.tracker import Run
+from penthouse.signals import suspend_run_receivers
+
+logger = logging.getLogger(__name__)
+
+
+def delete_profile(profile):
+    """Delete a profile, its runs and all of its derived data.
+
+    Django's ``Collector`` sends ``post_delete`` for every cascaded run, which
+    would maintain the derived data run by run. The receivers are suspended
+    instead and the derived data is deleted with one query per model.
+    """
+    profile_id = profile.pk
+
+    with transaction.atomic():
+        with suspend_run_receivers():
+            PersonalBest.objects.filter(profile_id=profile_id).delete()
+            RunRollup.objects.filter(profile_id=profile_id).delete()
+            RunSketch.objects.filter(profile_id=profile_id).delete()
+            count = (
+                Run.objects.filter(profile_id=profile_id)
+                .delete()[1]
+                .get(Run._meta.label, 0)
+            )
+            profile.delete()
+
+    logger.info("Deleted profile %d with %d runs", profile_id, count)
+
+
+def delete_runs(runs):
+    """Delete the runs of a queryset, which may belong to several profiles.
+
+    The runs are deleted by profile with :class:`RunBulkEditor`. Returns the
+    number of deleted runs.
+    """
+    run_ids = {}
+    for profile_id, run_id in runs.order_by().values_list("profile_id", "id"):
+        run_ids.setdefault(profile_id, []).append(run_id)
+
+    return sum(
+        RunBulkEditor(profile, run_ids[profile.pk]).delete()
+        for profile in Profile.objects.filter(pk__in=list(run_ids))
+    )
+
+
+class RunBulkEditor:
+    """Apply a change to several runs of a profile at once.
+
+    ``run_ids`` are the IDs of the runs to change; IDs of runs of other
+    profiles are ignored. All methods return the number of changed runs.
+    """
+
+    def __init__(self, profile, run_ids):
+        self.profile = profile
+        self.runs = Run.objects.filter_by_profile(profile.pk).filter(
+            pk__in=list(run_ids)
+        )
+
+    def _apply(self, change, tiers=(), offset=None, sketches=None):
+        """Apply ``change`` and maintain the derived data of the profile.
+
+        ``change`` is a callable, that changes the runs of :attr:`runs` and
+        returns the number of changed runs. ``tiers`` are the tiers the runs
+        are moved to; ``offset`` is the time the runs are shifted by.
+        ``sketches`` is a callable, that maps the rows of
+        :data:`~penthouse.models.sketch.SKETCH_FIELDS` of the runs to the
+        rows to remove from and add to the sketches; it is omitted, if the
+        change does not affect the sketches.
+        """
+        with transaction.atomic():
+            affected = dict(
+                self.runs.order_by().values_list("tier").annotate(Min("date"))
+            )
+            if not affected:
+                return 0
+
+            if sketches is not None:
+                rows = list(self.runs.order_by().values_list(*SKETCH_FIELDS))
+
+            with suspend_run_receivers():
+                count = change()
+
+            if sketches is not None:
+                removed, added = sketches(rows)
+                RunSketch.objects.apply(self.profile.pk, removed=removed, added=added)
+
+            since = min(affected.values())
+            if offset is not None and offset.total_seconds() < 0:
+                since += offset
+
+            PersonalBest.objects.refresh_scopes(
+                self.profile.pk, set(affected) | set(tiers)
+            )
+            RunRollup.objects.invalidate(self.profile.pk, since=since)
+            transaction.on_commit(lambda: bump_generation(self.profile.pk))
+
+        logger.info("Changed %d runs of profile %d", count, self.profile.pk)
+        return count
+
+    def delete(self):
+        """Delete the runs."""
+        return self._apply(
+            lambda: self.runs.delete()[1].get(Run._meta.label, 0),
+            sketches=lambda rows: (rows, []),
+        )
+
+    def set_tier(self, tier):
+        """Move the runs to ``tier``."""
+        return self._apply(
+            lambda: self.runs.update(tier=tier),
+            tiers=(tier,),
+            sketches=lambda rows: (rows, [(tier, *row[1:]) for row in rows]),
+        )
+
+    def shift_dates(self, offset):
+        """Shift the dates of the runs by ``offset``, a ``datetime.timedelta``."""
+        return self._apply(
+            lambda: self.runs.update(date=F("date") + offset), offset=offset
+        )
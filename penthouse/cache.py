@@ -0,0 +1,184 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Versioned caching of computed, profile-specific data.
+
+Every profile has a *generation*, stored in the cache. The generation is part
+of the keys of all cached entries of the profile, so replacing the generation
+(see :func:`bump_generation`) invalidates all of them at once, without
+knowing their actual keys. Outdated entries simply expire.
+
+The implementation only relies on ``get()``, ``set()`` and ``add()`` (and
+their async variants, see :func:`aget_or_compute`), so it works with all of
+Django's cache backends, e.g. the file based, the Memcached and the Redis
+backend. Caching is disabled by default; the configured cache
+(``PENTHOUSE_CACHE_ALIAS``) has to be shared by all processes serving the
+app, as the generations are only replaced in the cache of the process, that
+changed the data. The local-memory backend is only suitable for a single
+process, e.g. the development server.
+"""
+
+# Python imports
+import hashlib
+import logging
+import threading
+import time
+
+# Django imports
+from django.core.cache import caches
+
+# app imports
+from penthouse.conf import get_setting
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "penthouse"
+
+
+class CacheStatistics:
+    """Count the hits and misses of the cache in the current process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit):
+        """Count a single cache lookup."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    @property
+    def ratio(self):
+        """Return the ratio of hits to all lookups or ``None`` without lookups."""
+        total = self.hits + self.misses
+        return self.hits / total if total else None
+
+    def reset(self):
+        """Reset the counters."""
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+statistics = CacheStatistics()
+"""The statistics of :func:`get_or_compute` in the current process."""
+
+
+def get_cache():
+    """Return the cache to be used or ``None`` if caching is disabled."""
+    alias = get_setting("CACHE_ALIAS")
+    if alias is None:
+        return None
+
+    return caches[alias]
+
+
+def _get_generation_key(profile_id):
+    """Provide the cache key of a profile's generation."""
+    return "{}:generation:{}".format(_KEY_PREFIX, profile_id)
+
+
+def get_generation(profile_id, cache=None):
+    """Return the current generation of a profile's cached entries.
+
+    Generations are based on the current time (in nanoseconds), so a
+    generation, that got evicted from the cache, is not restarted with a value
+    that has already been used.
+    """
+    cache = cache or get_cache()
+    key = _get_generation_key(profile_id)
+
+    generation = cache.get(key, None)
+    if generation is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        generation = cache.get(key, None)
+
+    return generation
+
+
+async def aget_generation(profile_id, cache=None):
+    """Async variant of :func:`get_generation`."""
+    cache = cache or get_cache()
+    key = _get_generation_key(profile_id)
+
+    generation = await cache.aget(key, None)
+    if generation is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        generation = await cache.aget(key, None)
+
+    return generation
+
+
+def bump_generation(profile_id):
+    """Invalidate all cached entries of a profile."""
+    cache = get_cache()
+    if cache is None:
+        return
+
+    cache.set(_get_generation_key(profile_id), time.time_ns(), timeout=None)
+
+
+def _get_key(namespace, profile_id, generation, variant):
+    """Provide the cache key of an entry of a profile."""
+    return "{}:{}:{}:{}:{}".format(
+        _KEY_PREFIX,
+        namespace,
+        profile_id,
+        generation,
+        hashlib.md5(variant.encode(), usedforsecurity=False).hexdigest(),
+    )
+
+
+def get_or_compute(namespace, profile_id, variant, compute):
+    """Return a cached value of a profile or compute and cache it.
+
+    ``variant`` is a string to distinguish several values within the same
+    ``namespace`` (e.g. the pages of a list); it is hashed to keep the key's
+    length within the limits of all backends. ``compute`` is a callable
+    without arguments, providing the actual value. It must be picklable.
+    """
+    cache = get_cache()
+    if cache is None:
+        return compute()
+
+    key = _get_key(
+        namespace, profile_id, get_generation(profile_id, cache=cache), variant
+    )
+
+    value = cache.get(key, None)
+    statistics.record(value is not None)
+    if value is None:
+        logger.debug("Cache miss for %s", key)
+        value = compute()
+        cache.set(key, value, timeout=get_setting("CACHE_TIMEOUT"))
+
+    return value
+
+
+async def aget_or_compute(namespace, profile_id, variant, compute):
+    """Async variant of :func:`get_or_compute`.
+
+    ``compute`` is a coroutine function without arguments. The entries are
+    shared with :func:`get_or_compute`.
+    """
+    cache = get_cache()
+    if cache is None:
+        return await compute()
+
+    key = _get_key(
+        namespace, profile_id, await aget_generation(profile_id, cache=cache), variant
+    )
+
+    value = await cache.aget(key, None)
+    statistics.record(value is not None)
+    if value is None:
+        logger.debug("Cache miss for %s", key)
+        value = await compute()
+        await cache.aset(key, value, timeout=get_setting("CACHE_TIMEOUT"))
+
+    return value
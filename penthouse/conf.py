@@ -0,0 +1,100 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""App-specific settings.
+
+All settings may be overridden in the project's settings module, using the
+setting's name prefixed with ``PENTHOUSE_``, e.g. ``PENTHOUSE_TRACKER_ENGINE``.
+"""
+
+# Django imports
+from django.conf import settings
+
+DEFAULTS = {
+    "ADMIN_COUNT_ESTIMATE_THRESHOLD": 100000,
+    "ASYNC_WORKERS": 4,
+    "CACHE_ALIAS": None,
+    "CACHE_TIMEOUT": 60 * 60 * 24,
+    "EXPORT_CHUNK_SIZE": 2000,
+    "LEADERBOARD_PAGE_SIZE": 50,
+    "METRICS_TOKEN": None,
+    "PROFILE_SESSION": False,
+    "QUERY_BUDGETS": {},
+    "TIMING": False,
+    "TRACKER_ENGINE": "database",
+    "TRACKER_PAGE_SIZE": 50,
+}
+"""The default values of the app-specific settings.
+
+``ADMIN_COUNT_ESTIMATE_THRESHOLD``
+    The number of rows of a table, from which on the admin's changelists use
+    the estimated number of rows of the database's statistics instead of
+    counting them, see :class:`penthouse.pagination.EstimatedCountPaginator`.
+    ``None`` disables the estimate.
+
+``ASYNC_WORKERS``
+    The number of threads of the async views to run CPU-bound work, e.g. the
+    evaluation of runs and the rendering of templates, see
+    :mod:`penthouse.executor`. Read once, when the executor is created.
+
+``CACHE_ALIAS``
+    The alias of the cache (see :setting:`CACHES`) to store computed data,
+    e.g. the tracker overview. ``None`` disables caching. The cache has to be
+    shared by all processes serving the app, e.g. Redis or Memcached: cached
+    data is invalidated by writing to the cache, so a per process cache like
+    Django's default ``LocMemCache`` would serve outdated data in all other
+    processes.
+
+``CACHE_TIMEOUT``
+    The timeout of cached entries in seconds. Entries are invalidated as soon
+    as the underlying data changes, see :mod:`penthouse.cache`.
+
+``EXPORT_CHUNK_SIZE``
+    The number of runs fetched from the database at once while exporting
+    runs, see :mod:`penthouse.exporter`.
+
+``LEADERBOARD_PAGE_SIZE``
+    The number of profiles per page of the leaderboards, see
+    :mod:`penthouse.views.leaderboard`.
+
+``METRICS_TOKEN``
+    A secret to access the metrics endpoint without a staff account, provided
+    as ``Authorization: Bearer <token>`` header, see :mod:`penthouse.metrics`.
+
+``PROFILE_SESSION``
+    Keep the ID of the user's profile in the session, so that it is not
+    queried on every request, see :mod:`penthouse.middleware`. The ID is
+    validated by the profile's generation of :mod:`penthouse.cache`, so the
+    setting has no effect without a cache (``CACHE_ALIAS``).
+
+``QUERY_BUDGETS``
+    The maximum number of queries per view, e.g.
+    ``{"penthouse:tracker-overview": 10}``. Exceeding a budget is logged as
+    warning by :class:`penthouse.middleware.MetricsMiddleware`; tests may
+    assert the budgets with :func:`penthouse.metrics.assert_query_budget`.
+
+``TIMING``
+    Measure the stages of the app's request processing and provide them as
+    ``Server-Timing`` header, see :mod:`penthouse.timing`. Requires
+    :class:`penthouse.middleware.TimingMiddleware`.
+
+``TRACKER_ENGINE``
+    The implementation used to evaluate the runs in the tracker overview.
+    ``"database"`` uses window functions of the database, ``"python"`` uses
+    :class:`penthouse.views.tracker.TrackerList` and ``"numpy"`` uses
+    :mod:`penthouse.vectorized`, if NumPy is installed (otherwise it falls
+    back to ``"python"``).
+
+``TRACKER_PAGE_SIZE``
+    The number of runs per page of the tracker overview's run list.
+"""
+
+
+def get_setting(name):
+    """Return the value of an app-specific setting.
+
+    The value is read on every call, so that changes to the project's
+    settings (e.g. during testing) are picked up.
+    """
+    return getattr(settings, "PENTHOUSE_{}".format(name), DEFAULTS[name])
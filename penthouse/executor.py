@@ -0,0 +1,67 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""A bounded thread pool for the CPU-bound work of the async views.
+
+The async views (see :mod:`penthouse.views.async_tracker`) fetch their data
+with Django's async ORM, but evaluating runs and rendering templates would
+block the event loop. This work is run in a dedicated pool of
+``PENTHOUSE_ASYNC_WORKERS`` threads instead of asgiref's default executor, so
+a burst of expensive requests can not exhaust the threads, that are required
+for the database queries of all other requests.
+
+The work must not access the database, as the threads of this pool are not
+managed by asgiref's ``sync_to_async()``.
+"""
+
+# Python imports
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# app imports
+from penthouse.conf import get_setting
+
+_executor = None
+_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the executor, creating it on first use."""
+    global _executor
+
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=get_setting("ASYNC_WORKERS"),
+                thread_name_prefix="penthouse",
+            )
+
+    return _executor
+
+
+def shutdown():
+    """Shut down the executor, waiting for pending work to finish."""
+    global _executor
+
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+async def run_in_executor(func, *args, **kwargs):
+    """Run ``func`` in the executor and return its result.
+
+    The function is run in a copy of the current context, so context
+    variables, e.g. the spans of :mod:`penthouse.timing`, are available.
+    """
+    context = contextvars.copy_context()
+
+    return await asyncio.get_running_loop().run_in_executor(
+        get_executor(),
+        functools.partial(context.run, func, *args, **kwargs),
+    )
@@ -0,0 +1,169 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Export of runs, including their derived values, to CSV and JSON Lines.
+
+The runs are evaluated by the database (see
+:meth:`RunQuerySet.with_evaluation() <penthouse.models.tracker.RunQuerySet.with_evaluation>`)
+and fetched in chunks, so the export is produced as a stream and the runs
+never sit in memory as a whole.
+
+The exported files contain all keys of :mod:`penthouse.importer`, so they may
+be imported again; the derived columns are ignored by the import.
+
+:func:`get_stored_rows` provides just the stored values of any runs, e.g. of
+several profiles selected in the admin.
+"""
+
+# Python imports
+import csv
+import json
+
+# app imports
+from penthouse.conf import get_setting
+from penthouse.importer import FORMAT_CSV, FORMAT_JSONL, FORMATS_BY_EXTENSION
+from penthouse.models.tracker import Run, RunMetric
+
+BASE_COLUMNS = (
+    "date",
+    "tier",
+    "waves",
+    "duration",
+    "coins",
+    "cells",
+    "notes",
+    "coins_hour",
+    "coins_wave",
+    "cells_hour",
+    "cells_wave",
+)
+"""The columns of the export, besides personal bests and rolling averages."""
+
+STORED_COLUMNS = (
+    "id",
+    "profile",
+    "date",
+    "tier",
+    "waves",
+    "duration",
+    "coins",
+    "cells",
+    "notes",
+)
+"""The columns of an export of the stored values, see :func:`get_stored_rows`."""
+
+_DERIVED_COLUMNS = ("coins_hour", "coins_wave", "cells_hour", "cells_wave")
+
+CONTENT_TYPES = {
+    FORMAT_CSV: "text/csv",
+    FORMAT_JSONL: "application/jsonl",
+}
+
+
+def get_columns(windows):
+    """Return the columns of an export with the given rolling averages."""
+    return (
+        BASE_COLUMNS
+        + tuple("pb_{}".format(metric) for metric in RunMetric.values)
+        + tuple(
+            "{}_avg{}".format(metric, size)
+            for size in windows
+            for metric in RunMetric.values
+        )
+    )
+
+
+def get_rows(profile, chunk_size=None):
+    """Yield the evaluated runs of a profile as ``dict``, ordered by date.
+
+    The values are converted just like the tracker overview does: derived
+    values are truncated, averages are rounded. Dates are provided in ISO 8601
+    format. Averages are ``None`` while
+    there are less runs than the window's size.
+    """
+    windows = profile.get_avg_windows()
+    columns = get_columns(windows)
+    chunk_size = chunk_size or get_setting("EXPORT_CHUNK_SIZE")
+
+    runs = (
+        Run.objects.filter(profile=profile)
+        .with_evaluation(windows=windows)
+        .values("run_number", *columns)
+    )
+    for row in runs.iterator(chunk_size=chunk_size):
+        row["date"] = row["date"].isoformat()
+        for column in _DERIVED_COLUMNS:
+            row[column] = int(row[column])
+        for metric in RunMetric.values:
+            row["pb_{}".format(metric)] = bool(row["pb_{}".format(metric)])
+        for size in windows:
+            for metric in RunMetric.values:
+                column = "{}_avg{}".format(metric, size)
+                if row["run_number"] < size:
+                    row[column] = None
+                else:
+                    row[column] = round(row[column])
+
+        del row["run_number"]
+        yield row
+
+
+def get_stored_rows(runs, chunk_size=None):
+    """Yield the stored values of runs as ``dict``, in the order of ``runs``.
+
+    ``runs`` may contain the runs of several profiles, e.g. a selection in
+    the admin, so the runs are not evaluated; ``profile`` is the ID of the
+    run's profile.
+    """
+    chunk_size = chunk_size or get_setting("EXPORT_CHUNK_SIZE")
+
+    for row in runs.values(*STORED_COLUMNS).iterator(chunk_size=chunk_size):
+        row["date"] = row["date"].isoformat()
+        yield row
+
+
+class _Echo:
+    """Provide the interface of a file to ``csv.writer``, returning the lines."""
+
+    def write(self, value):
+        return value
+
+
+def write_csv(rows, columns):
+    """Yield the lines of a CSV file, starting with the header."""
+    writer = csv.DictWriter(_Echo(), fieldnames=columns)
+
+    yield writer.writerow(dict(zip(columns, columns)))
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def write_jsonl(rows, columns):
+    """Yield the lines of a JSON Lines file."""
+    for row in rows:
+        yield json.dumps(row) + "\n"
+
+
+WRITERS = {
+    FORMAT_CSV: write_csv,
+    FORMAT_JSONL: write_jsonl,
+}
+
+EXPORT_FORMATS_BY_EXTENSION = {
+    extension: file_format
+    for extension, file_format in FORMATS_BY_EXTENSION.items()
+    if file_format in WRITERS
+}
+"""Map file extensions to the formats, that may be exported.
+
+Battle reports (see :mod:`penthouse.reports`) may only be imported.
+"""
+
+
+def export_runs(profile, file_format, chunk_size=None):
+    """Yield the lines of an export of the profile's runs."""
+    return WRITERS[file_format](
+        get_rows(profile, chunk_size=chunk_size),
+        get_columns(profile.get_avg_windows()),
+    )
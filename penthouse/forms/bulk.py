@@ -0,0 +1,72 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Forms to change several runs at once."""
+
+# Django imports
+from django import forms
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+# app imports
+from penthouse.game_constants import TowerTiers
+from penthouse.models.tracker import Run
+
+
+class RunBulkAction(models.TextChoices):
+    """The actions of :class:`RunBulkForm`."""
+
+    DELETE = "delete", _("Delete")
+    SET_TIER = "set_tier", _("Change Tier")
+    SHIFT_DATES = "shift_dates", _("Shift Dates")
+
+
+class RunBulkForm(forms.Form):
+    """Select an action to be applied to the selected runs of the run list.
+
+    The runs are provided as ``runs`` parameters, e.g. by the checkboxes of
+    the tracker overview, and are restricted to the runs of the given
+    profile. See :class:`penthouse.bulk.RunBulkEditor`.
+    """
+
+    runs = forms.ModelMultipleChoiceField(
+        queryset=Run.objects.none(), widget=forms.MultipleHiddenInput
+    )
+
+    action = forms.ChoiceField(choices=RunBulkAction.choices, label=_("Selected Runs"))
+
+    tier = forms.ChoiceField(
+        choices=[("", "---------")] + list(TowerTiers.choices),
+        label=_("New Tier"),
+        required=False,
+    )
+
+    offset = forms.DurationField(
+        help_text=_("e.g. 02:00:00 or -1 00:00:00"),
+        label=_("Shift Dates by"),
+        required=False,
+    )
+
+    def __init__(self, profile_id, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # only the IDs are fetched to validate the selection
+        self.fields["runs"].queryset = Run.objects.filter_by_profile(profile_id).only(
+            "id"
+        )
+
+    def clean(self):  # noqa: D102
+        cleaned_data = super().clean()
+
+        action = cleaned_data.get("action", None)
+        if action == RunBulkAction.SET_TIER and not cleaned_data.get("tier", None):
+            self.add_error("tier", _("Please select the new tier."))
+        if action == RunBulkAction.SHIFT_DATES and not cleaned_data.get("offset", None):
+            self.add_error("offset", _("Please provide the time to shift by."))
+
+        return cleaned_data
+
+    def get_run_ids(self):
+        """Return the IDs of the selected runs."""
+        return [run.pk for run in self.cleaned_data["runs"]]
@@ -6,11 +6,21 @@
 
 
 # Django imports
-from django.forms.fields import ChoiceField, FloatField, IntegerField, MultiValueField
+from django.core.exceptions import ValidationError
+from django.forms.fields import (
+    CharField,
+    ChoiceField,
+    FloatField,
+    IntegerField,
+    MultiValueField,
+)
+from django.utils.translation import gettext_lazy as _
 
 # app imports
 from penthouse.forms.widgets import GameDurationWidget, GameNumberWidget
 from penthouse.game_constants import TowerUnitSuffix
+from penthouse.game_numbers import parse_number
+from penthouse.utility import parse_duration
 
 
 class GameDurationField(MultiValueField):
@@ -81,3 +91,63 @@ class GameNumberField(MultiValueField):
             # print("[GameNumberField.compress()] {}".format(int(data_list[0]*int(data_list[1]))))
             return int(data_list[0] * int(data_list[1]))
         return None
+
+
+class GameDurationTextField(CharField):
+    """Provide the input of durations as text, e.g. ``1h 2m 3s``.
+
+    The text is split into hours, minutes and seconds, which are validated
+    and compressed by :class:`GameDurationField`, so both fields apply the
+    same rules. See :func:`penthouse.utility.parse_duration` for the accepted
+    formats.
+    """
+
+    default_error_messages = {
+        "invalid": _("Enter a valid duration, e.g. 1h 2m 3s or 1:02:03."),
+    }
+
+    def __init__(self, *args, **kwargs):
+        self.duration_field = GameDurationField()
+
+        super().__init__(*args, **kwargs)
+
+    def to_python(self, value):  # noqa: D102
+        if isinstance(value, int):
+            value = str(value)
+
+        value = super().to_python(value)
+        if value in self.empty_values:
+            return None
+
+        try:
+            components = parse_duration(value)
+        except ValueError:
+            raise ValidationError(self.error_messages["invalid"], code="invalid")
+
+        return self.duration_field.clean(list(components))
+
+
+class GameNumberTextField(CharField):
+    """Provide the input of ingame numbers as text, e.g. ``1.23T``.
+
+    This is the single text input counterpart of :class:`GameNumberField`,
+    see :func:`penthouse.game_numbers.parse_number` for the accepted formats.
+    Integers are accepted as they are.
+    """
+
+    default_error_messages = {
+        "invalid": _("Enter a valid number, e.g. 1.23T."),
+    }
+
+    def to_python(self, value):  # noqa: D102
+        if isinstance(value, int):
+            return value
+
+        value = super().to_python(value)
+        if value in self.empty_values:
+            return None
+
+        try:
+            return parse_number(value)
+        except ValueError:
+            raise ValidationError(self.error_messages["invalid"], code="invalid")
@@ -0,0 +1,179 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Forms to filter the runs of the tracker."""
+
+# Python imports
+import datetime
+
+# Django imports
+from django import forms
+from django.core.exceptions import ValidationError
+from django.utils.http import urlencode
+from django.utils.translation import gettext_lazy as _
+
+# app imports
+from penthouse.game_constants import TowerTiers
+from penthouse.models.personal_best import GLOBAL_SCOPE
+from penthouse.models.rollup import RollupPeriod
+from penthouse.models.tracker import RunMetric
+from penthouse.utility import start_of_day
+
+_TIER_CHOICES = [("", _("any"))] + list(TowerTiers.choices)
+
+
+class RunFilterForm(forms.Form):
+    """Restrict the runs of the tracker overview, provided as GET parameters.
+
+    All fields are optional; the filters are applied as ``WHERE`` clauses,
+    that can use the indexes of :class:`~penthouse.models.tracker.Run`, see
+    :meth:`filter_runs`.
+    """
+
+    date_from = forms.DateField(
+        label=_("From"), required=False, widget=forms.DateInput(attrs={"type": "date"})
+    )
+
+    date_to = forms.DateField(
+        label=_("To"), required=False, widget=forms.DateInput(attrs={"type": "date"})
+    )
+
+    tier_min = forms.ChoiceField(
+        choices=_TIER_CHOICES, label=_("Lowest Tier"), required=False
+    )
+
+    tier_max = forms.ChoiceField(
+        choices=_TIER_CHOICES, label=_("Highest Tier"), required=False
+    )
+
+    waves_min = forms.IntegerField(
+        label=_("Minimum Waves"), max_value=32767, min_value=1, required=False
+    )
+
+    def clean(self):  # noqa: D102
+        cleaned_data = super().clean()
+
+        date_from = cleaned_data.get("date_from", None)
+        date_to = cleaned_data.get("date_to", None)
+        if date_from and date_to and date_from > date_to:
+            raise ValidationError(_("The start date must not be after the end date."))
+
+        tier_min = cleaned_data.get("tier_min", None)
+        tier_max = cleaned_data.get("tier_max", None)
+        if (
+            tier_min
+            and tier_max
+            and TowerTiers.get_ordinal(tier_min) > TowerTiers.get_ordinal(tier_max)
+        ):
+            raise ValidationError(
+                _("The lowest tier must not be higher than the highest tier.")
+            )
+
+        return cleaned_data
+
+    def get_filters(self):
+        """Return the cleaned values of all provided filters as ``dict``."""
+        return {
+            name: value
+            for name, value in self.cleaned_data.items()
+            if value not in (None, "")
+        }
+
+    def is_filtered(self):
+        """Return ``True`` if the form is valid and provides any filter."""
+        return self.is_valid() and bool(self.get_filters())
+
+    def get_query(self):
+        """Return the filters as URL parameters, e.g. for pagination links."""
+        if not self.is_valid():
+            return ""
+
+        return urlencode(
+            {
+                name: value.isoformat() if isinstance(value, datetime.date) else value
+                for name, value in self.get_filters().items()
+            }
+        )
+
+    def filter_runs(self, runs):
+        """Apply the filters to a queryset of runs.
+
+        The date range is compared with the run's date, so the index on
+        ``(profile, date, id)`` is used; the tier range is resolved to the
+        set of tiers in between (compared by their ordinal, see
+        :meth:`TowerTiers.get_range() <penthouse.game_constants.TowerTiers.get_range>`)
+        to use the index on ``(profile, tier, date, id)``.
+        """
+        if not self.is_valid():
+            return runs
+
+        filters = self.get_filters()
+        if "date_from" in filters:
+            runs = runs.filter(date__gte=start_of_day(filters["date_from"]))
+        if "date_to" in filters:
+            runs = runs.filter(
+                date__lt=start_of_day(filters["date_to"] + datetime.timedelta(days=1))
+            )
+        if "tier_min" in filters or "tier_max" in filters:
+            runs = runs.filter(
+                tier__in=TowerTiers.get_range(
+                    filters.get("tier_min", None), filters.get("tier_max", None)
+                )
+            )
+        if "waves_min" in filters:
+            runs = runs.filter(waves__gte=filters["waves_min"])
+
+        return runs
+
+
+class TrendsForm(forms.Form):
+    """Select the period and tier of the trends, provided as GET parameters."""
+
+    period = forms.ChoiceField(
+        choices=RollupPeriod.choices, label=_("Period"), required=False
+    )
+
+    tier = forms.ChoiceField(choices=_TIER_CHOICES, label=_("Tier"), required=False)
+
+    def get_period(self):
+        """Return the selected period, defaulting to weeks."""
+        if self.is_valid() and self.cleaned_data["period"]:
+            return self.cleaned_data["period"]
+        return RollupPeriod.WEEK
+
+    def get_tier(self):
+        """Return the selected tier or ``None`` for all tiers."""
+        if self.is_valid():
+            return self.cleaned_data["tier"] or None
+        return None
+
+
+class LeaderboardForm(forms.Form):
+    """Select the tier and metric of the leaderboard, provided as GET parameters."""
+
+    tier = forms.ChoiceField(
+        choices=[(GLOBAL_SCOPE, _("All Tiers"))] + list(TowerTiers.choices),
+        label=_("Tier"),
+        required=False,
+    )
+
+    metric = forms.ChoiceField(
+        choices=RunMetric.choices, label=_("Metric"), required=False
+    )
+
+    def get_tier(self):
+        """Return the selected tier, defaulting to all tiers."""
+        if self.is_valid():
+            return self.cleaned_data["tier"]
+        return GLOBAL_SCOPE
+
+    def get_metric(self):
+        """Return the selected metric, defaulting to coins per hour."""
+        if self.is_valid() and self.cleaned_data["metric"]:
+            return self.cleaned_data["metric"]
+        return RunMetric.COINS_HOUR
+
+    def get_query(self):
+        """Return the selection as URL parameters, e.g. for pagination links."""
+        return urlencode({"tier": self.get_tier(), "metric": self.get_metric()})
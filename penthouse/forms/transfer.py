@@ -0,0 +1,67 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Forms to transfer runs from and to files."""
+
+# Django imports
+from django import forms
+from django.core.exceptions import ValidationError
+from django.utils.translation import gettext_lazy as _
+
+# app imports
+from penthouse.importer import (
+    FORMAT_CSV,
+    FORMAT_JSONL,
+    FORMAT_REPORT,
+    RunImportException,
+    get_format,
+)
+
+
+class RunImportForm(forms.Form):
+    """Upload a file of runs to be imported.
+
+    The format is determined by the file's extension, unless it is provided
+    explicitly.
+    """
+
+    file = forms.FileField(label=_("File"))
+
+    file_format = forms.ChoiceField(
+        choices=[
+            ("", _("Determine by extension")),
+            (FORMAT_CSV, _("CSV")),
+            (FORMAT_JSONL, _("JSON Lines")),
+            (FORMAT_REPORT, _("Battle Reports")),
+        ],
+        label=_("Format"),
+        required=False,
+    )
+
+    def clean(self):  # noqa: D102
+        cleaned_data = super().clean()
+
+        upload = cleaned_data.get("file", None)
+        if upload is not None and not cleaned_data.get("file_format", None):
+            try:
+                cleaned_data["file_format"] = get_format(upload.name)
+            except RunImportException:
+                raise ValidationError(
+                    _("Unable to determine the format of the file, please select it.")
+                )
+
+        return cleaned_data
+
+
+class RunPasteForm(forms.Form):
+    """Paste the text of one or many battle reports to be imported.
+
+    See :mod:`penthouse.reports` for the expected text.
+    """
+
+    reports = forms.CharField(
+        help_text=_("The battle reports, as copied from the game"),
+        label=_("Battle Reports"),
+        widget=forms.Textarea,
+    )
@@ -9,6 +9,7 @@ from django.forms.widgets import MultiWidget, NumberInput, Select
 
 # app imports
 from penthouse.game_constants import TowerUnitSuffix
+from penthouse.game_numbers import split_number_to_unit_suffix
 from penthouse.utility import seconds_to_hms
 
 
@@ -65,27 +66,6 @@ class GameNumberWidget(MultiWidget):
         if value:
             # print("[GameNumberWidget.decompress()] {}".format(value))
 
-            # FIXME: Re-use the function in ``utility``
-            value = int(value)
-            if value / TowerUnitSuffix.UNIT_O > 1:
-                return [value / TowerUnitSuffix.UNIT_O, TowerUnitSuffix.UNIT_O]
-            elif value / TowerUnitSuffix.UNIT_S > 1:
-                return [value / TowerUnitSuffix.UNIT_S, TowerUnitSuffix.UNIT_S]
-            elif value / TowerUnitSuffix.UNIT_S_MIN > 1:
-                return [value / TowerUnitSuffix.UNIT_S_MIN, TowerUnitSuffix.UNIT_S_MIN]
-            elif value / TowerUnitSuffix.UNIT_Q > 1:
-                return [value / TowerUnitSuffix.UNIT_Q, TowerUnitSuffix.UNIT_Q]
-            elif value / TowerUnitSuffix.UNIT_Q_MIN > 1:
-                return [value / TowerUnitSuffix.UNIT_Q_MIN, TowerUnitSuffix.UNIT_Q_MIN]
-            elif value / TowerUnitSuffix.UNIT_T > 1:
-                return [value / TowerUnitSuffix.UNIT_T, TowerUnitSuffix.UNIT_T]
-            elif value / TowerUnitSuffix.UNIT_B > 1:
-                return [value / TowerUnitSuffix.UNIT_B, TowerUnitSuffix.UNIT_B]
-            elif value / TowerUnitSuffix.UNIT_M > 1:
-                return [value / TowerUnitSuffix.UNIT_M, TowerUnitSuffix.UNIT_M]
-            elif value / TowerUnitSuffix.UNIT_K > 1:
-                return [value / TowerUnitSuffix.UNIT_K, TowerUnitSuffix.UNIT_K]
-            else:
-                return [value, None]
+            return split_number_to_unit_suffix(int(value))
 
         return [None, None]
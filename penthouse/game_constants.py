@@ -34,6 +34,28 @@ class TowerTiers(TextChoices):
     T17 = "T17"
     T18 = "T18"
 
+    @classmethod
+    def get_ordinal(cls, tier):
+        """Return the number of a tier, e.g. ``10`` for ``"T10"``.
+
+        Tiers are compared by their ordinal, as their values do not sort
+        naturally as strings (``"T10" < "T2"``).
+        """
+        return cls.values.index(tier) + 1
+
+    @classmethod
+    def get_range(cls, first=None, last=None):
+        """Return the tiers from ``first`` to ``last``, both included.
+
+        Omitting ``first`` or ``last`` leaves the range open at that end.
+        """
+        return [
+            tier
+            for tier in cls.values
+            if (first is None or cls.get_ordinal(tier) >= cls.get_ordinal(first))
+            and (last is None or cls.get_ordinal(tier) <= cls.get_ordinal(last))
+        ]
+
 
 class TowerUnitSuffix(IntegerChoices):
     """The game's suffixes for number values.
@@ -0,0 +1,150 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Formatting and parsing of the game's big numbers.
+
+The Tower shortens big numbers using the suffixes of
+:class:`~penthouse.game_constants.TowerUnits`, e.g. ``1.23T``. All lookup
+tables are computed once on import, so the suffix of a number is determined
+in constant time from its bit length, instead of testing every suffix with a
+(floating point) division.
+"""
+
+# Python imports
+import re
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+
+# app imports
+from penthouse.game_constants import TowerUnits, TowerUnitSuffix
+
+_UNITS = sorted((unit.value for unit in TowerUnits), key=lambda unit: unit[0])
+
+SUFFIXES = ("",) + tuple(suffix for _, suffix in _UNITS)
+"""All suffixes, the index being the exponent of the multiplier divided by 3."""
+
+MULTIPLIERS = tuple(10 ** (3 * index) for index in range(len(SUFFIXES)))
+"""The multipliers of :data:`SUFFIXES`."""
+
+EXPONENTS = {suffix: exponent for exponent, suffix in _UNITS}
+"""The (decimal) exponents of the suffixes."""
+
+if [exponent for exponent, _ in _UNITS] != [3 * i for i in range(1, len(SUFFIXES))]:
+    raise RuntimeError("TowerUnits must provide a suffix for every power of 1000")
+
+
+def _get_slow_index(value):
+    """Determine the index of the suffix for ``value`` by comparison."""
+    index = 0
+    while index + 1 < len(MULTIPLIERS) and value >= MULTIPLIERS[index + 1]:
+        index += 1
+
+    return index
+
+
+# The index of the suffix for the smallest number of every bit length. The
+# numbers of one bit length only span a factor of 2, so they either share this
+# index or the next one, which requires one additional comparison.
+_INDEX_BY_BIT_LENGTH = tuple(
+    _get_slow_index(1 << (bit_length - 1) if bit_length else 0)
+    for bit_length in range((MULTIPLIERS[-1] * 1000).bit_length() + 1)
+)
+
+_NUMBER_RE = re.compile(
+    r"^\s*(?P<numeral>\d+(?:[.,]\d*)?|[.,]\d+)\s*(?P<suffix>[{}]?)\s*$".format(
+        "".join(SUFFIXES) + "K"
+    )
+)
+
+
+def get_suffix_index(value):
+    """Return the index of the suffix of ``value`` in :data:`SUFFIXES`.
+
+    Values below 1000 (including negative values) do not get a suffix, values
+    beyond the biggest suffix use the biggest one.
+    """
+    value = int(value)
+    if value < 1000:
+        return 0
+
+    bit_length = value.bit_length()
+    if bit_length >= len(_INDEX_BY_BIT_LENGTH):
+        return len(SUFFIXES) - 1
+
+    index = _INDEX_BY_BIT_LENGTH[bit_length]
+    if index + 1 < len(MULTIPLIERS) and value >= MULTIPLIERS[index + 1]:
+        index += 1
+
+    return index
+
+
+def split_number(value):
+    """Split ``value`` into the numeral and the suffix.
+
+    Returns a tuple of the numeral (a ``float``) and the suffix. Values below
+    1000 are returned unchanged, with an empty suffix.
+    """
+    index = get_suffix_index(value)
+    if index == 0:
+        return value, ""
+
+    return value / MULTIPLIERS[index], SUFFIXES[index]
+
+
+def split_number_to_unit_suffix(value):
+    """Split ``value`` into the numeral and a :class:`~penthouse.game_constants.TowerUnitSuffix`.
+
+    This is the counterpart of
+    :meth:`penthouse.forms.fields.GameNumberField.compress`, which only
+    supports the suffixes of ``TowerUnitSuffix``. Returns ``[value, None]``
+    for values below 1000.
+    """
+    index = min(get_suffix_index(value), len(TowerUnitSuffix))
+    if index == 0:
+        return [value, None]
+
+    return [value / MULTIPLIERS[index], TowerUnitSuffix(MULTIPLIERS[index])]
+
+
+@lru_cache(maxsize=4096)
+def format_number(value):
+    """Provide the short notation of ``value`` with two decimal places.
+
+    The results are memoized, as the same values (e.g. personal bests and
+    thresholds) are formatted repeatedly.
+    """
+    numeral, suffix = split_number(value)
+
+    return "{:0.2f}{}".format(numeral, suffix)
+
+
+def format_numbers(values):
+    """Format a whole column of values, see :func:`format_number`.
+
+    Returns a list of the formatted values, in the order of ``values``.
+    Recurring values are served from the memoized results.
+    """
+    return list(map(format_number, values))
+
+
+def parse_number(text):
+    """Parse the short notation of a number, e.g. ``1.23T``, into an integer.
+
+    The numeral may use ``.`` or ``,`` as decimal separator; ``K`` is
+    accepted as an alias of ``k``. The calculation is done with
+    :class:`~decimal.Decimal` to not lose precision for big numbers.
+
+    Raises ``ValueError`` if ``text`` is not a valid number.
+    """
+    match = _NUMBER_RE.match(text)
+    if match is None:
+        raise ValueError("'{}' is not a valid number".format(text))
+
+    suffix = match.group("suffix").replace("K", "k")
+    try:
+        numeral = Decimal(match.group("numeral").replace(",", "."))
+    except InvalidOperation:
+        raise ValueError("'{}' is not a valid number".format(text))
+
+    return int(numeral.scaleb(EXPONENTS.get(suffix, 0)))
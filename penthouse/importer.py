@@ -0,0 +1,269 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Bulk import of runs from CSV and JSON Lines files.
+
+The files are parsed as streams, row by row, and the runs are inserted in
+batches, so the memory consumption does not depend on the size of the file.
+
+Both formats use the same keys (CSV: the header row):
+
+``date``
+    Date and time of the run, e.g. ``2024-10-19 19:22`` or ISO 8601.
+``tier``
+    The tier, e.g. ``T10``.
+``waves``
+    The end wave.
+``duration``
+    The duration, as seconds, ``1:02:03`` or ``1h 2m 3s``.
+``coins`` / ``cells``
+    The earnings, as integer or in the game's notation, e.g. ``1.23T``.
+``notes``
+    Optional notes.
+
+Battle reports of the game, as copied from the game, are imported the same
+way, see :mod:`penthouse.reports`.
+"""
+
+# Python imports
+import csv
+import io
+import json
+import logging
+
+# Django imports
+from django import forms
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+# app imports
+from penthouse.cache import bump_generation
+from penthouse.exceptions import PenthouseException
+from penthouse.forms.fields import GameDurationTextField, GameNumberTextField
+from penthouse.game_constants import TowerTiers
+from penthouse.models.personal_best import PersonalBest
+from penthouse.models.rollup import RunRollup
+from penthouse.models.sketch import RunSketch, get_sketch_row
+from penthouse.models.tracker import Run
+from penthouse.reports import read_battle_reports
+
+logger = logging.getLogger(__name__)
+
+FORMAT_CSV = "csv"
+FORMAT_JSONL = "jsonl"
+FORMAT_REPORT = "report"
+
+FORMATS_BY_EXTENSION = {
+    ".csv": FORMAT_CSV,
+    ".jsonl": FORMAT_JSONL,
+    ".ndjson": FORMAT_JSONL,
+    ".txt": FORMAT_REPORT,
+}
+"""Map file extensions to the import formats."""
+
+
+class RunImportException(PenthouseException):
+    """Raised if a file can not be imported at all."""
+
+
+def get_format(filename, formats_by_extension=None):
+    """Determine the format of a file by its extension.
+
+    ``formats_by_extension`` defaults to :data:`FORMATS_BY_EXTENSION`, the
+    formats, that may be imported.
+    """
+    if formats_by_extension is None:
+        formats_by_extension = FORMATS_BY_EXTENSION
+
+    for extension, file_format in formats_by_extension.items():
+        if filename.lower().endswith(extension):
+            return file_format
+
+    raise RunImportException(
+        "Unable to determine the format of '{}', use one of {}".format(
+            filename, ", ".join(formats_by_extension)
+        )
+    )
+
+
+def read_csv(stream):
+    """Yield the rows of a CSV text stream with their line number."""
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def read_jsonl(stream):
+    """Yield the objects of a JSON Lines text stream with their line number.
+
+    Invalid lines are yielded as ``None`` and reported as errors.
+    """
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+
+        yield line_number, row if isinstance(row, dict) else None
+
+
+READERS = {
+    FORMAT_CSV: read_csv,
+    FORMAT_JSONL: read_jsonl,
+    FORMAT_REPORT: read_battle_reports,
+}
+
+
+class ImportResult:
+    """The outcome of an import.
+
+    Only the first ``max_errors`` errors are kept, but all of them are
+    counted.
+    """
+
+    def __init__(self, max_errors=100):
+        self.created = 0
+        self.error_count = 0
+        self.errors = []
+        self.max_errors = max_errors
+
+    def add_error(self, line_number, messages):
+        """Record the error(s) of a single row."""
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append((line_number, messages))
+
+
+class RunImporter:
+    """Validate rows and insert them as runs of a profile.
+
+    The rows are validated with the same fields, that are used by the
+    app's forms, but the fields are only instantiated once, and by the
+    validators of the model's fields, e.g. the range of the earnings, just
+    like :class:`~penthouse.models.tracker.RunForm` does. Valid rows are
+    inserted with ``bulk_create()``, every batch in its own transaction;
+    invalid rows are reported in the :class:`ImportResult` and skipped.
+
+    As ``bulk_create()`` does not send any signals, the profile's personal
+    bests are rebuilt and its cached data and rollups are invalidated once
+    after the import.
+    """
+
+    def __init__(self, profile, batch_size=1000, max_errors=100):
+        self.profile = profile
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+
+        self.fields = {
+            "date": forms.DateTimeField(),
+            "tier": forms.ChoiceField(choices=TowerTiers),
+            "waves": forms.IntegerField(min_value=1, max_value=32767),
+            "duration": GameDurationTextField(),
+            "coins": GameNumberTextField(),
+            "cells": GameNumberTextField(),
+            "notes": forms.CharField(required=False),
+        }
+
+    def clean_row(self, row):
+        """Validate a single row and return the (unsaved) ``Run`` instance.
+
+        Raises ``ValidationError`` with the errors of all fields.
+        """
+        if row is None:
+            raise ValidationError("Unable to parse the row")
+
+        values = {}
+        errors = []
+        for name, field in self.fields.items():
+            try:
+                values[name] = field.clean(row.get(name, None))
+            except ValidationError as e:
+                errors.extend("{}: {}".format(name, message) for message in e.messages)
+
+        if values.get("duration", None) == 0:
+            errors.append("duration: The duration must be at least one second.")
+        if errors:
+            raise ValidationError(errors)
+
+        run = Run(profile=self.profile, **values)
+        try:
+            # the ranges of the model's fields, as validated by RunForm
+            run.clean_fields(exclude=["profile"])
+        except ValidationError as e:
+            raise ValidationError(
+                [
+                    "{}: {}".format(name, message)
+                    for name, messages in e.message_dict.items()
+                    for message in messages
+                ]
+            )
+
+        return run
+
+    def _insert(self, batch):
+        """Insert one batch of runs within a transaction.
+
+        ``bulk_create()`` does not send any signals, so the batch is applied
+        to the profile's sketches here.
+        """
+        with transaction.atomic():
+            Run.objects.bulk_create(batch)
+            RunSketch.objects.apply(
+                self.profile.pk, added=[get_sketch_row(run) for run in batch]
+            )
+
+        return len(batch)
+
+    def import_rows(self, rows):
+        """Import rows, as provided by the readers, e.g. :func:`read_csv`."""
+        result = ImportResult(max_errors=self.max_errors)
+
+        batch = []
+        earliest = None
+        for line_number, row in rows:
+            try:
+                run = self.clean_row(row)
+            except ValidationError as e:
+                result.add_error(line_number, e.messages)
+                continue
+
+            batch.append(run)
+            if earliest is None or run.date < earliest:
+                earliest = run.date
+
+            if len(batch) >= self.batch_size:
+                result.created += self._insert(batch)
+                batch = []
+
+        if batch:
+            result.created += self._insert(batch)
+
+        if result.created:
+            PersonalBest.objects.rebuild(self.profile)
+            RunRollup.objects.invalidate(self.profile.pk, since=earliest)
+            transaction.on_commit(lambda: bump_generation(self.profile.pk))
+
+        logger.info(
+            "Imported %d runs for profile %d (%d errors)",
+            result.created,
+            self.profile.pk,
+            result.error_count,
+        )
+        return result
+
+    def import_stream(self, stream, file_format):
+        """Import a text stream of the given format."""
+        return self.import_rows(READERS[file_format](stream))
+
+    def import_file(self, binary_file, file_format):
+        """Import a binary file object, e.g. an uploaded file."""
+        stream = io.TextIOWrapper(binary_file, encoding="utf-8-sig", newline="")
+        try:
+            return self.import_stream(stream, file_format)
+        finally:
+            # don't close the underlying file, it is owned by the caller
+            stream.detach()
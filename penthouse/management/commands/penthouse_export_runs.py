@@ -0,0 +1,58 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Export the runs of a profile, including their derived values.
+
+See :mod:`penthouse.exporter` for the provided columns.
+"""
+
+# Python imports
+import sys
+
+# Django imports
+from django.core.management.base import BaseCommand, CommandError
+
+# app imports
+from penthouse.exporter import EXPORT_FORMATS_BY_EXTENSION, WRITERS, export_runs
+from penthouse.importer import RunImportException, get_format
+from penthouse.models.profile import Profile
+
+
+class Command(BaseCommand):  # noqa: D101
+    help = "Export the runs of a user's profile as CSV or JSON Lines file."
+
+    def add_arguments(self, parser):  # noqa: D102
+        parser.add_argument("path", help="The file to write, '-' to write stdout")
+        parser.add_argument(
+            "--user", required=True, help="The username of the profile's owner"
+        )
+        parser.add_argument(
+            "--format",
+            choices=sorted(WRITERS),
+            dest="file_format",
+            help="The format of the file, determined by its extension by default",
+        )
+        parser.add_argument("--chunk-size", default=None, type=int)
+
+    def handle(self, *args, **options):  # noqa: D102
+        try:
+            profile = Profile.objects.get(owner__username=options["user"])
+        except Profile.DoesNotExist:
+            raise CommandError("No profile found for '{}'".format(options["user"]))
+
+        file_format = options["file_format"]
+        if file_format is None:
+            if options["path"] == "-":
+                raise CommandError("--format is required to write stdout")
+            try:
+                file_format = get_format(options["path"], EXPORT_FORMATS_BY_EXTENSION)
+            except RunImportException as e:
+                raise CommandError(e)
+
+        lines = export_runs(profile, file_format, chunk_size=options["chunk_size"])
+        if options["path"] == "-":
+            sys.stdout.writelines(lines)
+        else:
+            with open(options["path"], "w", encoding="utf-8", newline="") as stream:
+                stream.writelines(lines)
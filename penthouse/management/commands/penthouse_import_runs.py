@@ -0,0 +1,77 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Import runs from a CSV or JSON Lines file or from battle reports.
+
+See :mod:`penthouse.importer` for the expected keys and
+:mod:`penthouse.reports` for the battle reports, e.g. pasted to stdin with
+``--format report``.
+"""
+
+# Python imports
+import sys
+
+# Django imports
+from django.core.management.base import BaseCommand, CommandError
+
+# app imports
+from penthouse.importer import READERS, RunImporter, RunImportException, get_format
+from penthouse.models.profile import Profile
+
+
+class Command(BaseCommand):  # noqa: D101
+    help = (
+        "Import runs from a CSV or JSON Lines file or from the game's battle "
+        "reports into a user's profile."
+    )
+
+    def add_arguments(self, parser):  # noqa: D102
+        parser.add_argument("path", help="The file to import, '-' to read stdin")
+        parser.add_argument(
+            "--user", required=True, help="The username of the profile's owner"
+        )
+        parser.add_argument(
+            "--format",
+            choices=sorted(READERS),
+            dest="file_format",
+            help="The format of the file, determined by its extension by default",
+        )
+        parser.add_argument("--batch-size", default=1000, type=int)
+
+    def handle(self, *args, **options):  # noqa: D102
+        try:
+            profile = Profile.objects.get(owner__username=options["user"])
+        except Profile.DoesNotExist:
+            raise CommandError("No profile found for '{}'".format(options["user"]))
+
+        file_format = options["file_format"]
+        if file_format is None:
+            if options["path"] == "-":
+                raise CommandError("--format is required to read stdin")
+            try:
+                file_format = get_format(options["path"])
+            except RunImportException as e:
+                raise CommandError(e)
+
+        importer = RunImporter(profile, batch_size=options["batch_size"])
+        if options["path"] == "-":
+            result = importer.import_stream(sys.stdin, file_format)
+        else:
+            with open(options["path"], encoding="utf-8-sig", newline="") as stream:
+                result = importer.import_stream(stream, file_format)
+
+        for line_number, messages in result.errors:
+            self.stderr.write("line {}: {}".format(line_number, "; ".join(messages)))
+        if result.error_count > len(result.errors):
+            self.stderr.write(
+                "... {} more errors".format(result.error_count - len(result.errors))
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Imported {} runs, skipped {} invalid rows".format(
+                    result.created, result.error_count
+                )
+            )
+        )
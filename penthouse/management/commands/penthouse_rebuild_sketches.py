@@ -0,0 +1,40 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Rebuild the quantile sketches of the profiles from their runs.
+
+The sketches are maintained on every change of a run, see
+:mod:`penthouse.signals`; this command restores them, e.g. after runs have
+been changed bypassing the app's code.
+"""
+
+# Django imports
+from django.core.management.base import BaseCommand, CommandError
+
+# app imports
+from penthouse.models.profile import Profile
+from penthouse.models.sketch import RunSketch
+
+
+class Command(BaseCommand):  # noqa: D101
+    help = "Rebuild the quantile sketches of all profiles or a user's profile."
+
+    def add_arguments(self, parser):  # noqa: D102
+        parser.add_argument(
+            "--user", default=None, help="The username of the profile's owner"
+        )
+
+    def handle(self, *args, **options):  # noqa: D102
+        profiles = Profile.objects.all()
+        if options["user"] is not None:
+            profiles = profiles.filter(owner__username=options["user"])
+            if not profiles.exists():
+                raise CommandError("No profile found for '{}'".format(options["user"]))
+
+        count = 0
+        for profile in profiles.iterator():
+            RunSketch.objects.rebuild(profile)
+            count += 1
+
+        self.stdout.write("Rebuilt the sketches of {} profile(s)".format(count))
@@ -0,0 +1,222 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""In-process metrics of the app's views.
+
+The metrics are recorded by :class:`penthouse.middleware.MetricsMiddleware`
+per URL name (e.g. ``penthouse:tracker-overview``) as histograms and
+exposed in the text format of Prometheus, see
+:meth:`ViewMetrics.render_prometheus`.
+
+The histograms are cumulative over the lifetime of the process, just like
+Prometheus expects them; rolling rates and quantiles are derived by
+Prometheus, e.g. with ``rate()`` and ``histogram_quantile()``.
+
+The query budgets of the views (``PENTHOUSE_QUERY_BUDGETS``) are logged by
+the middleware and may be asserted in tests by :func:`assert_query_budget`.
+"""
+
+# Python imports
+import bisect
+import contextlib
+import threading
+import time
+
+# Django imports
+from django.db import connections
+from django.urls import reverse
+
+# app imports
+from penthouse.conf import get_setting
+
+
+class Histogram:
+    """Count observations in cumulative buckets, see Prometheus' histograms."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value):
+        """Record a single observation."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def get_cumulative_counts(self):
+        """Return tuples of the upper bounds and the cumulative counts."""
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            yield bound, total
+
+
+METRICS = {
+    "duration_seconds": (
+        "Total time of the request",
+        (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+    ),
+    "db_duration_seconds": (
+        "Time spent executing SQL queries",
+        (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+    ),
+    "queries": (
+        "Number of SQL queries",
+        (1, 2, 5, 10, 20, 50, 100, 200, 500),
+    ),
+    "response_bytes": (
+        "Size of the response body, not available for streamed responses",
+        (1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+    ),
+}
+"""The recorded metrics with their description and the histogram's buckets."""
+
+
+class ViewMetrics:
+    """Collect the histograms of all views in the current process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, view_name, **values):
+        """Record the ``values`` (see :data:`METRICS`) of a single request.
+
+        Values, that are ``None``, are not recorded.
+        """
+        with self._lock:
+            histograms = self._views.get(view_name, None)
+            if histograms is None:
+                histograms = {
+                    metric: Histogram(buckets)
+                    for metric, (_, buckets) in METRICS.items()
+                }
+                self._views[view_name] = histograms
+
+            for metric, value in values.items():
+                if value is not None:
+                    histograms[metric].observe(value)
+
+    def get_histogram(self, view_name, metric):
+        """Return the histogram of a view's metric or ``None``."""
+        return self._views.get(view_name, {}).get(metric, None)
+
+    def reset(self):
+        """Discard all recorded values."""
+        with self._lock:
+            self._views = {}
+
+    def render_prometheus(self):
+        """Provide all histograms in the text format of Prometheus."""
+        lines = []
+        with self._lock:
+            for metric, (description, _) in METRICS.items():
+                name = "penthouse_view_{}".format(metric)
+                lines.append("# HELP {} {}".format(name, description))
+                lines.append("# TYPE {} histogram".format(name))
+
+                for view_name in sorted(self._views):
+                    histogram = self._views[view_name][metric]
+                    for bound, count in histogram.get_cumulative_counts():
+                        lines.append(
+                            '{}_bucket{{view="{}",le="{}"}} {}'.format(
+                                name, view_name, _format_bound(bound), count
+                            )
+                        )
+                    lines.append(
+                        '{}_sum{{view="{}"}} {}'.format(name, view_name, histogram.sum)
+                    )
+                    lines.append(
+                        '{}_count{{view="{}"}} {}'.format(
+                            name, view_name, histogram.count
+                        )
+                    )
+
+        return "\n".join(lines) + "\n"
+
+
+def _format_bound(bound):
+    """Format the upper bound of a bucket as Prometheus expects it."""
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+view_metrics = ViewMetrics()
+"""The metrics of the views in the current process."""
+
+
+class QueryCounter:
+    """Count the queries and their execution time of all database connections.
+
+    This is implemented with Django's ``execute_wrapper()``, so it does not
+    depend on ``DEBUG``. Use :func:`count_queries` to install it.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):  # noqa: D102
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+@contextlib.contextmanager
+def count_queries():
+    """Count the queries within the ``with`` block, see :class:`QueryCounter`.
+
+    See :func:`assert_query_budget` to assert the query budgets of views.
+    """
+    counter = QueryCounter()
+    with contextlib.ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(counter))
+        yield counter
+
+
+def get_query_budget(view_name):
+    """Return the query budget of a view (see ``QUERY_BUDGETS``) or ``None``."""
+    return get_setting("QUERY_BUDGETS").get(view_name, None)
+
+
+def assert_query_budget(
+    client, view_name, budget=None, method="get", kwargs=None, data=None
+):
+    """Request a view with Django's test client and assert its query budget.
+
+    The view is requested by its URL name, e.g. ``penthouse:tracker-overview``,
+    and all queries of the request are counted, including the ones of the
+    session and authentication middlewares; streamed responses are consumed.
+    Without an explicit ``budget``, the view's budget of ``QUERY_BUDGETS`` is
+    asserted, e.g.::
+
+        assert_query_budget(self.client, "penthouse:tracker-overview")
+
+    Returns the response, so it may be verified further. Raises
+    ``AssertionError`` if the view has no budget or exceeds it.
+    """
+    if budget is None:
+        budget = get_query_budget(view_name)
+    if budget is None:
+        raise AssertionError("No query budget for '{}'".format(view_name))
+
+    url = reverse(view_name, kwargs=kwargs)
+    with count_queries() as queries:
+        response = getattr(client, method)(url, data)
+        if response.streaming:
+            response.streaming_content = list(response.streaming_content)
+
+    if queries.count > budget:
+        raise AssertionError(
+            "'{}' executed {} queries (budget: {})".format(
+                view_name, queries.count, budget
+            )
+        )
+
+    return response
@@ -0,0 +1,278 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""App-specific middlewares and the resolution of the user's profile.
+
+:func:`get_profile` and :func:`get_profile_id` resolve the current user's
+profile lazily and at most once per request, no matter how many views and
+mixins access it; async views use :func:`aget_profile`. With
+``PENTHOUSE_PROFILE_SESSION`` enabled, the profile's ID is additionally kept
+in the session, so filtering by the profile does not require to fetch the
+profile at all. :class:`ProfileMiddleware` provides the profile of
+:func:`get_profile` as lazy request attribute, e.g. for templates.
+
+:class:`MetricsMiddleware` records the metrics of the app's views, see
+:mod:`penthouse.metrics`.
+
+:class:`TimingMiddleware` provides the timing spans of a request (see
+:mod:`penthouse.timing`) and profiles single requests on demand.
+"""
+
+# Python imports
+import cProfile
+import io
+import logging
+import pstats
+import time
+
+# Django imports
+from django.http import HttpResponse
+from django.utils.functional import SimpleLazyObject
+
+# external imports
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+
+# app imports
+from penthouse.cache import get_cache, get_generation
+from penthouse.conf import get_setting
+from penthouse.metrics import count_queries, get_query_budget, view_metrics
+from penthouse.models.profile import Profile
+from penthouse.timing import (
+    format_server_timing,
+    start as start_timing,
+    stop as stop_timing,
+)
+
+logger = logging.getLogger(__name__)
+
+SESSION_KEY = "_penthouse_profile_id"
+"""The key of the profile's ID in the session."""
+
+PROFILING_PARAMETER = "penthouse-profile"
+"""The query parameter to profile a request, see :class:`TimingMiddleware`."""
+
+
+def get_profile(request):
+    """Return the profile of the request's user.
+
+    The profile is fetched once and then stored on the request. Raises
+    ``Profile.DoesNotExist`` if the user has no profile; a profile ID in the
+    session is removed then, see :func:`forget_profile`.
+    """
+    if not hasattr(request, "_cached_penthouse_profile"):
+        try:
+            request._cached_penthouse_profile = Profile.objects.get(owner=request.user)
+        except Profile.DoesNotExist:
+            forget_profile(request)
+            raise
+
+    return request._cached_penthouse_profile
+
+
+async def aget_profile(request):
+    """Async variant of :func:`get_profile`, sharing the profile stored on the request."""
+    if not hasattr(request, "_cached_penthouse_profile"):
+        try:
+            request._cached_penthouse_profile = await Profile.objects.aget(
+                owner=await request.auser()
+            )
+        except Profile.DoesNotExist:
+            # the session may have to be loaded from the database
+            await sync_to_async(forget_profile)(request)
+            raise
+
+    return request._cached_penthouse_profile
+
+
+def _get_session_profile_id(session, cache):
+    """Return the profile's ID stored in the session, if it is still valid.
+
+    The ID is stored together with the profile's generation of
+    :mod:`penthouse.cache`. The generation is replaced whenever the profile
+    is changed or deleted (see :mod:`penthouse.signals`), e.g. through the
+    admin, so a stale ID is not used.
+    """
+    value = session.get(SESSION_KEY, None)
+    if not isinstance(value, list) or len(value) != 2:
+        return None
+
+    profile_id, generation = value
+    if generation != get_generation(profile_id, cache=cache):
+        return None
+
+    return profile_id
+
+
+def get_profile_id(request):
+    """Return the ID of the profile of the request's user.
+
+    The ID is read from the session, if ``PENTHOUSE_PROFILE_SESSION`` is
+    enabled and the cache is available, otherwise it is provided by
+    :func:`get_profile`.
+    """
+    if hasattr(request, "_cached_penthouse_profile_id"):
+        return request._cached_penthouse_profile_id
+
+    session = getattr(request, "session", None)
+    cache = get_cache()
+    if session is None or cache is None or not get_setting("PROFILE_SESSION"):
+        profile_id = get_profile(request).pk
+    else:
+        profile_id = _get_session_profile_id(session, cache)
+        if profile_id is None:
+            profile_id = get_profile(request).pk
+            session[SESSION_KEY] = [profile_id, get_generation(profile_id, cache=cache)]
+
+    request._cached_penthouse_profile_id = profile_id
+    return profile_id
+
+
+def forget_profile(request):
+    """Remove the resolved profile from the request and the session.
+
+    This should be called whenever the user's profile is deleted; profiles
+    deleted elsewhere are detected by :func:`get_profile_id`.
+    """
+    for attribute in ("_cached_penthouse_profile", "_cached_penthouse_profile_id"):
+        if hasattr(request, attribute):
+            delattr(request, attribute)
+
+    session = getattr(request, "session", None)
+    if session is not None:
+        session.pop(SESSION_KEY, None)
+
+
+class ProfileMiddleware:
+    """Provide the user's profile as ``request.penthouse_profile``.
+
+    The attribute is a lazy object of :func:`get_profile`, so the database is
+    only queried if the profile is actually accessed, and only once per
+    request, shared with :func:`get_profile` and :func:`aget_profile`. It
+    must be placed after Django's ``AuthenticationMiddleware``.
+
+    The middleware supports sync and async requests, so it does not force
+    async views to be run in a thread. Async code has to resolve the profile
+    with :func:`aget_profile` before accessing the attribute.
+    """
+
+    sync_capable = True
+
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):  # noqa: D102
+        request.penthouse_profile = SimpleLazyObject(lambda: get_profile(request))
+
+        if iscoroutinefunction(self):
+            return self.get_response_async(request)
+        return self.get_response(request)
+
+    async def get_response_async(self, request):
+        """Await the response of the async middleware chain."""
+        return await self.get_response(request)
+
+
+class MetricsMiddleware:
+    """Record the query count, database time, total time and response size.
+
+    The metrics are recorded for all views of the app, identified by their
+    URL name, e.g. ``penthouse:tracker-overview``, and logged as structured
+    log line (the values are provided as ``penthouse_metrics`` attribute of
+    the log record). Views exceeding their budget of queries (see
+    ``PENTHOUSE_QUERY_BUDGETS``) are logged as warning.
+
+    The middleware is optional and should be placed as early as possible.
+    Queries of streamed responses, that are executed while the response is
+    sent, are not included.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):  # noqa: D102
+        start = time.perf_counter()
+        with count_queries() as queries:
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        match = getattr(request, "resolver_match", None)
+        if match is None or "penthouse" not in match.namespaces:
+            return response
+
+        values = {
+            "duration_seconds": duration,
+            "db_duration_seconds": queries.duration,
+            "queries": queries.count,
+            "response_bytes": None if response.streaming else len(response.content),
+        }
+        view_metrics.record(match.view_name, **values)
+        logger.info(
+            "%s: %d queries, %.1f ms database, %.1f ms total, %s bytes",
+            match.view_name,
+            queries.count,
+            queries.duration * 1000,
+            duration * 1000,
+            values["response_bytes"],
+            extra={"penthouse_metrics": dict(values, view=match.view_name)},
+        )
+
+        budget = get_query_budget(match.view_name)
+        if budget is not None and queries.count > budget:
+            logger.warning(
+                "%s exceeded its query budget: %d queries (budget: %d)",
+                match.view_name,
+                queries.count,
+                budget,
+            )
+
+        return response
+
+
+class TimingMiddleware:
+    """Provide the timing spans of a request as ``Server-Timing`` header.
+
+    The spans are only collected if ``PENTHOUSE_TIMING`` is enabled. Staff
+    users may then add the query parameter ``penthouse-profile`` to any URL
+    to run the request with :mod:`cProfile`; the response is replaced by the
+    profiler's statistics, ordered by cumulative time.
+
+    The middleware must be placed after Django's ``AuthenticationMiddleware``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):  # noqa: D102
+        if not get_setting("TIMING"):
+            return self.get_response(request)
+
+        if PROFILING_PARAMETER in request.GET and request.user.is_staff:
+            return self.get_profile_response(request)
+
+        token = start_timing()
+        try:
+            start = time.perf_counter()
+            response = self.get_response(request)
+            duration = time.perf_counter() - start
+        finally:
+            spans = stop_timing(token)
+
+        spans["total"] = duration
+        response["Server-Timing"] = format_server_timing(spans)
+
+        return response
+
+    def get_profile_response(self, request):
+        """Process the request with :mod:`cProfile` and provide the statistics."""
+        profiler = cProfile.Profile()
+        profiler.runcall(self.get_response, request)
+
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(50)
+
+        return HttpResponse(stream.getvalue(), content_type="text/plain")
@@ -7,7 +7,6 @@ from django.db import migrations, models
 
 class Migration(migrations.Migration):
 
-    replaces = [('penthouse', '0001_initial'), ('penthouse', '0002_run'), ('penthouse', '0003_alter_run_duration'), ('penthouse', '0004_alter_run_tier'), ('penthouse', '0005_remove_run_cells_hour_remove_run_cells_wave_and_more'), ('penthouse', '0006_profile_settings_tracker_threshold_top_cells_and_more')]
 
     initial = True
 
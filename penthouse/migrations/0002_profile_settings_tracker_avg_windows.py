@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:51
+
+import django.core.validators
+import penthouse.models.profile
+import re
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("penthouse", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="settings_tracker_avg_windows",
+            field=models.CharField(
+                default="5",
+                help_text="Number of runs to calculate rolling averages for, comma-separated (e.g. 5,10,25)",
+                max_length=32,
+                validators=[
+                    django.core.validators.RegexValidator(
+                        re.compile("^\\d+(?:,\\d+)*\\Z"),
+                        code="invalid",
+                        message="Enter only digits separated by commas.",
+                    ),
+                    penthouse.models.profile.validate_avg_windows,
+                ],
+                verbose_name="Rolling average windows",
+            ),
+        ),
+    ]
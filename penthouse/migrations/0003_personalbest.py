@@ -0,0 +1,139 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models.functions import Cast, Floor
+
+
+def _metric_expression(metric):
+    if metric.endswith("_hour"):
+        return Floor(
+            Cast(metric[: -len("_hour")], models.FloatField())
+            / (Cast("duration", models.FloatField()) / 3600.0)
+        )
+    return models.F(metric)
+
+
+def populate_personal_bests(apps, schema_editor):
+    PersonalBest = apps.get_model("penthouse", "PersonalBest")
+    Run = apps.get_model("penthouse", "Run")
+
+    personal_bests = []
+    scopes = Run.objects.order_by().values_list("profile_id", "tier").distinct()
+    scopes = set(scopes) | {(profile_id, "") for profile_id, _ in scopes}
+    for profile_id, tier in scopes:
+        runs = Run.objects.filter(profile_id=profile_id)
+        if tier:
+            runs = runs.filter(tier=tier)
+        for metric in ("coins", "coins_hour", "cells", "cells_hour"):
+            run_id, value = (
+                runs.annotate(metric_value=_metric_expression(metric))
+                .order_by("-metric_value", "date", "id")
+                .values_list("id", "metric_value")
+                .first()
+            )
+            personal_bests.append(
+                PersonalBest(
+                    profile_id=profile_id,
+                    tier=tier,
+                    metric=metric,
+                    run_id=run_id,
+                    value=int(value),
+                )
+            )
+
+    PersonalBest.objects.bulk_create(personal_bests)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("penthouse", "0002_profile_settings_tracker_avg_windows"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PersonalBest",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "tier",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("T1", "T1"),
+                            ("T2", "T2"),
+                            ("T3", "T3"),
+                            ("T4", "T4"),
+                            ("T5", "T5"),
+                            ("T6", "T6"),
+                            ("T7", "T7"),
+                            ("T8", "T8"),
+                            ("T9", "T9"),
+                            ("T10", "T10"),
+                            ("T11", "T11"),
+                            ("T12", "T12"),
+                            ("T13", "T13"),
+                            ("T14", "T14"),
+                            ("T15", "T15"),
+                            ("T16", "T16"),
+                            ("T17", "T17"),
+                            ("T18", "T18"),
+                        ],
+                        max_length=3,
+                        verbose_name="Tier",
+                    ),
+                ),
+                (
+                    "metric",
+                    models.CharField(
+                        choices=[
+                            ("coins", "Coins"),
+                            ("coins_hour", "Coins/h"),
+                            ("cells", "Cells"),
+                            ("cells_hour", "Cells/h"),
+                        ],
+                        max_length=10,
+                        verbose_name="Metric",
+                    ),
+                ),
+                ("value", models.PositiveBigIntegerField(verbose_name="Value")),
+                (
+                    "profile",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="penthouse.profile",
+                        verbose_name="Profile",
+                    ),
+                ),
+                (
+                    "run",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="penthouse.run",
+                        verbose_name="Run",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Personal Best",
+                "verbose_name_plural": "Personal Bests",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("profile", "tier", "metric"),
+                        name="penthouse_personalbest_unique_scope",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(populate_personal_bests, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("penthouse", "0003_personalbest"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="run",
+            index=models.Index(
+                fields=["profile", "date", "id"], name="penthouse_run_profile_date"
+            ),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("penthouse", "0004_run_profile_date_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="run",
+            index=models.Index(
+                fields=["profile", "tier", "date", "id"],
+                name="penthouse_run_profile_tier",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="run",
+            index=models.Index(
+                fields=["profile", "coins"], name="penthouse_run_profile_coins"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="run",
+            index=models.Index(
+                fields=["profile", "cells"], name="penthouse_run_profile_cells"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="run",
+            name="profile",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="penthouse.profile",
+                verbose_name="Profile",
+            ),
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("penthouse", "0005_run_access_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RunRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "period",
+                    models.CharField(
+                        choices=[("day", "Day"), ("week", "Week"), ("month", "Month")],
+                        max_length=5,
+                        verbose_name="Period",
+                    ),
+                ),
+                (
+                    "tier",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("T1", "T1"),
+                            ("T2", "T2"),
+                            ("T3", "T3"),
+                            ("T4", "T4"),
+                            ("T5", "T5"),
+                            ("T6", "T6"),
+                            ("T7", "T7"),
+                            ("T8", "T8"),
+                            ("T9", "T9"),
+                            ("T10", "T10"),
+                            ("T11", "T11"),
+                            ("T12", "T12"),
+                            ("T13", "T13"),
+                            ("T14", "T14"),
+                            ("T15", "T15"),
+                            ("T16", "T16"),
+                            ("T17", "T17"),
+                            ("T18", "T18"),
+                        ],
+                        max_length=3,
+                        verbose_name="Tier",
+                    ),
+                ),
+                ("start", models.DateTimeField(verbose_name="Start")),
+                ("runs", models.PositiveIntegerField(verbose_name="Runs")),
+                ("duration", models.PositiveBigIntegerField(verbose_name="Duration")),
+                ("coins", models.PositiveBigIntegerField(verbose_name="Coins")),
+                ("cells", models.PositiveBigIntegerField(verbose_name="Cells")),
+                (
+                    "profile",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="penthouse.profile",
+                        verbose_name="Profile",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Run Rollup",
+                "verbose_name_plural": "Run Rollups",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("profile", "period", "start", "tier"),
+                        name="penthouse_runrollup_unique_bucket",
+                    )
+                ],
+            },
+        ),
+    ]
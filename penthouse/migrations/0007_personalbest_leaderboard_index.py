@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("penthouse", "0006_runrollup"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="personalbest",
+            index=models.Index(
+                fields=["tier", "metric", "-value"], name="penthouse_pb_leaderboard"
+            ),
+        ),
+    ]
@@ -0,0 +1,141 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:38
+
+import math
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# A frozen copy of the bucket layout of penthouse.sketch.QuantileSketch (with a
+# relative accuracy of 0.01) at the time of this migration, so later changes
+# of the sketch do not change the data written by this migration.
+_GAMMA = (1 + 0.01) / (1 - 0.01)
+_LOG_GAMMA = math.log(_GAMMA)
+
+
+def _get_bucket(value):
+    return math.ceil(math.log(value) / _LOG_GAMMA)
+
+
+def _to_dict(buckets, zeros):
+    if not buckets:
+        return {"offset": 0, "counts": [], "zeros": zeros}
+
+    offset = min(buckets)
+    return {
+        "offset": offset,
+        "counts": [buckets.get(index, 0) for index in range(offset, max(buckets) + 1)],
+        "zeros": zeros,
+    }
+
+
+def populate_run_sketches(apps, schema_editor):
+    Run = apps.get_model("penthouse", "Run")
+    RunSketch = apps.get_model("penthouse", "RunSketch")
+
+    sketches = {}
+    rows = (
+        Run.objects.order_by()
+        .values_list("profile_id", "tier", "waves", "duration", "coins")
+        .iterator(chunk_size=5000)
+    )
+    for profile_id, tier, waves, duration, coins in rows:
+        for metric, value in (
+            ("waves", waves),
+            ("coins_hour", int(coins / (duration / 3600))),
+        ):
+            buckets, zeros = sketches.setdefault((profile_id, tier, metric), ({}, [0]))
+            if value <= 0:
+                zeros[0] += 1
+            else:
+                index = _get_bucket(value)
+                buckets[index] = buckets.get(index, 0) + 1
+
+    RunSketch.objects.bulk_create(
+        RunSketch(
+            profile_id=profile_id,
+            tier=tier,
+            metric=metric,
+            data=_to_dict(buckets, zeros[0]),
+        )
+        for (profile_id, tier, metric), (buckets, zeros) in sketches.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("penthouse", "0007_personalbest_leaderboard_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RunSketch",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "tier",
+                    models.CharField(
+                        choices=[
+                            ("T1", "T1"),
+                            ("T2", "T2"),
+                            ("T3", "T3"),
+                            ("T4", "T4"),
+                            ("T5", "T5"),
+                            ("T6", "T6"),
+                            ("T7", "T7"),
+                            ("T8", "T8"),
+                            ("T9", "T9"),
+                            ("T10", "T10"),
+                            ("T11", "T11"),
+                            ("T12", "T12"),
+                            ("T13", "T13"),
+                            ("T14", "T14"),
+                            ("T15", "T15"),
+                            ("T16", "T16"),
+                            ("T17", "T17"),
+                            ("T18", "T18"),
+                        ],
+                        max_length=3,
+                        verbose_name="Tier",
+                    ),
+                ),
+                (
+                    "metric",
+                    models.CharField(
+                        choices=[("waves", "Waves"), ("coins_hour", "Coins/h")],
+                        max_length=10,
+                        verbose_name="Metric",
+                    ),
+                ),
+                ("data", models.JSONField(default=dict, verbose_name="Data")),
+                (
+                    "profile",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="penthouse.profile",
+                        verbose_name="Profile",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Run Sketch",
+                "verbose_name_plural": "Run Sketches",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("profile", "tier", "metric"),
+                        name="penthouse_runsketch_unique_scope",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(populate_run_sketches, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("penthouse", "0009_run_admin_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="run",
+            name="penthouse_run_profile_tier",
+        ),
+        migrations.RemoveIndex(
+            model_name="run",
+            name="penthouse_run_profile_coins",
+        ),
+        migrations.RemoveIndex(
+            model_name="run",
+            name="penthouse_run_profile_cells",
+        ),
+        migrations.AddIndex(
+            model_name="run",
+            index=models.Index(
+                fields=["profile", "tier", "-date", "-id"],
+                name="penthouse_run_profile_tier",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="run",
+            index=models.Index(
+                fields=["profile", "-coins", "date", "id"],
+                name="penthouse_run_profile_coins",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="run",
+            index=models.Index(
+                fields=["profile", "-cells", "date", "id"],
+                name="penthouse_run_profile_cells",
+            ),
+        ),
+    ]
@@ -5,5 +5,8 @@
 """App-specific models."""
 
 # app imports
+from penthouse.models.personal_best import PersonalBest  # noqa: F401
 from penthouse.models.profile import Profile  # noqa: F401
+from penthouse.models.rollup import RunRollup  # noqa: F401
+from penthouse.models.sketch import RunSketch  # noqa: F401
 from penthouse.models.tracker import Run  # noqa: F401
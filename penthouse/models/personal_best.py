@@ -0,0 +1,295 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Persisted personal bests of a profile, maintained on every write of a run.
+
+As the personal bests of all profiles are stored, they also provide the
+leaderboards of every tier and metric across all profiles, see
+:meth:`PersonalBestManager.get_leaderboard`.
+"""
+
+# Django imports
+from django.db import models, transaction
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+
+# app imports
+from penthouse.game_constants import TowerTiers
+from penthouse.models.profile import Profile
+from penthouse.models.tracker import Run, RunMetric
+
+GLOBAL_SCOPE = ""
+"""The value of :attr:`PersonalBest.tier` for personal bests across all tiers."""
+
+
+class PersonalBestManager(models.Manager):
+    """Custom manager for ``PersonalBest`` model."""
+
+    def find_best(self, profile_id, tier, metric):
+        """Query the best run of a profile for the given scope and metric.
+
+        Returns a tuple of the run's ID and the value or ``None``, if there
+        are no runs in that scope, see
+        :meth:`RunQuerySet.find_best() <penthouse.models.tracker.RunQuerySet.find_best>`.
+        """
+        runs = Run.objects.filter(profile_id=profile_id)
+        if tier != GLOBAL_SCOPE:
+            runs = runs.filter(tier=tier)
+
+        return runs.find_best(metric)
+
+    def refresh(self, profile_id, tier, metric):
+        """Re-query a single personal best and update the stored value."""
+        best = self.find_best(profile_id, tier, metric)
+        if best is None:
+            self.filter(profile_id=profile_id, tier=tier, metric=metric).delete()
+            return
+
+        self.update_or_create(
+            profile_id=profile_id,
+            tier=tier,
+            metric=metric,
+            defaults={"run_id": best[0], "value": int(best[1])},
+        )
+
+    def refresh_scopes(self, profile_id, tiers):
+        """Re-query the global personal bests and the ones of the given tiers.
+
+        The stored personal bests are fetched at once; only the changed ones
+        are written.
+        """
+        scopes = [GLOBAL_SCOPE, *sorted(set(tiers) - {GLOBAL_SCOPE})]
+        current = {
+            (pb.tier, pb.metric): pb
+            for pb in self.filter(profile_id=profile_id, tier__in=scopes)
+        }
+
+        for tier in scopes:
+            for metric in RunMetric.values:
+                pb = current.get((tier, metric), None)
+                best = self.find_best(profile_id, tier, metric)
+                if best is None:
+                    if pb is not None:
+                        pb.delete()
+                elif pb is None:
+                    self.create(
+                        profile_id=profile_id,
+                        tier=tier,
+                        metric=metric,
+                        run_id=best[0],
+                        value=int(best[1]),
+                    )
+                elif (pb.run_id, pb.value) != (best[0], int(best[1])):
+                    pb.run_id = best[0]
+                    pb.value = int(best[1])
+                    pb.save(update_fields=["run", "value"])
+
+    def rebuild(self, profile):
+        """Re-query all personal bests of the given profile."""
+        with transaction.atomic():
+            self.filter(profile=profile).delete()
+
+            self.refresh_scopes(
+                profile.pk,
+                Run.objects.filter(profile=profile)
+                .order_by()
+                .values_list("tier", flat=True)
+                .distinct(),
+            )
+
+    def update_for_run(self, run):
+        """Apply a created or updated run to the stored personal bests.
+
+        A run only affects the global scope and the scope of its tier. If the
+        run is better than the stored personal best, it simply replaces it.
+        If the run holds a personal best itself, it might have been lowered
+        (or moved to another tier), so the scope is re-queried.
+        """
+        scopes = (GLOBAL_SCOPE, run.tier)
+
+        with transaction.atomic():
+            current = {
+                (pb.tier, pb.metric): pb
+                for pb in self.select_for_update(of=("self",))
+                .filter(Q(tier__in=scopes) | Q(run=run), profile_id=run.profile_id)
+                .select_related("run")
+            }
+
+            for (tier, metric), pb in current.items():
+                if pb.run_id == run.pk and tier not in scopes:
+                    self.refresh(run.profile_id, tier, metric)
+
+            for tier in scopes:
+                for metric in RunMetric.values:
+                    pb = current.get((tier, metric), None)
+                    if pb is None or pb.run_id == run.pk:
+                        self.refresh(run.profile_id, tier, metric)
+                    elif pb.is_beaten_by(run):
+                        pb.run = run
+                        pb.value = run.get_metric(metric)
+                        pb.save(update_fields=["run", "value"])
+
+    def update_for_deleted_run(self, run):
+        """Re-query the personal bests that were held by a deleted run.
+
+        The ``PersonalBest`` instances of the run are already removed by
+        cascading the deletion, so all missing scopes of the run's profile
+        are re-queried.
+        """
+        scopes = (GLOBAL_SCOPE, run.tier)
+
+        with transaction.atomic():
+            existing = set(
+                self.filter(profile_id=run.profile_id, tier__in=scopes).values_list(
+                    "tier", "metric"
+                )
+            )
+            for tier in scopes:
+                for metric in RunMetric.values:
+                    if (tier, metric) not in existing:
+                        self.refresh(run.profile_id, tier, metric)
+
+    def get_leaderboard(self, tier, metric):
+        """Return the personal bests of all profiles in one scope, ordered by rank.
+
+        The leaderboard is read from the index on ``(tier, metric, -value)``
+        instead of aggregating the runs of all profiles.
+        """
+        return self.filter(tier=tier, metric=metric).order_by("-value", "id")
+
+    def count_better(self, tier, metric, value):
+        """Return the number of profiles with a better value in one scope."""
+        return self.filter(tier=tier, metric=metric, value__gt=value).count()
+
+    def get_rank(self, profile_id, tier, metric):
+        """Return the rank of a profile in a leaderboard, ``None`` without runs.
+
+        Profiles with the same value share their rank, e.g. ``1, 2, 2, 4``.
+        """
+        value = (
+            self.filter(profile_id=profile_id, tier=tier, metric=metric)
+            .values_list("value", flat=True)
+            .first()
+        )
+        if value is None:
+            return None
+
+        return self.count_better(tier, metric, value) + 1
+
+    def get_best_runs(self, profile, tier=GLOBAL_SCOPE):
+        """Return the runs holding the personal bests of a profile in one query.
+
+        The result is a ``dict`` with the metrics as keys. The runs are
+        annotated with ``is_pb_<metric>`` for all metrics, indicating if the
+        run has been a personal best at the time it was played. Their notes
+        are deferred.
+        """
+        runs_by_id = {run.pk: run for run in self._get_best_runs_query(profile, tier)}
+        return {
+            pb.metric: runs_by_id[pb.run_id]
+            for pb in self.filter(profile=profile, tier=tier)
+            if pb.run_id in runs_by_id
+        }
+
+    async def aget_best_runs(self, profile, tier=GLOBAL_SCOPE):
+        """Async variant of :meth:`get_best_runs`."""
+        runs_by_id = {
+            run.pk: run async for run in self._get_best_runs_query(profile, tier)
+        }
+        return {
+            pb.metric: runs_by_id[pb.run_id]
+            async for pb in self.filter(profile=profile, tier=tier)
+            if pb.run_id in runs_by_id
+        }
+
+    def _get_best_runs_query(self, profile, tier):
+        """Provide the query of the runs of :meth:`get_best_runs`."""
+        scope = Run.objects.filter(profile=profile)
+        if tier != GLOBAL_SCOPE:
+            scope = scope.filter(tier=tier)
+
+        return (
+            Run.objects.filter(
+                pk__in=self.filter(profile=profile, tier=tier).values("run_id")
+            )
+            .defer("notes")
+            .with_pb_flags(scope)
+        )
+
+
+class PersonalBest(models.Model):
+    """The best run of a profile regarding one metric.
+
+    Personal bests are tracked globally (:attr:`tier` is empty) and per tier.
+    They are updated whenever a run is saved or deleted, see
+    :mod:`penthouse.signals`.
+    """
+
+    profile = models.ForeignKey(
+        Profile, on_delete=models.CASCADE, verbose_name=_("Profile")
+    )
+    """Reference to the associated profile."""
+
+    tier = models.CharField(
+        blank=True,
+        choices=TowerTiers,
+        max_length=3,
+        verbose_name=_("Tier"),
+    )
+    """The tier of the personal best, empty for the global personal best."""
+
+    metric = models.CharField(
+        choices=RunMetric, max_length=10, verbose_name=_("Metric")
+    )
+    """The evaluated metric."""
+
+    run = models.ForeignKey(
+        Run, on_delete=models.CASCADE, related_name="+", verbose_name=_("Run")
+    )
+    """Reference to the run holding the personal best."""
+
+    value = models.PositiveBigIntegerField(verbose_name=_("Value"))
+    """The value of :attr:`metric` of the referenced run."""
+
+    objects = PersonalBestManager()
+    """Apply a custom manager.
+
+    This should not interfere with Django's default inner mechanics, the
+    custom manager does not replace any default functions, it just provides
+    additional methods.
+    """
+
+    class Meta:  # noqa: D106
+        app_label = "penthouse"
+        verbose_name = _("Personal Best")
+        verbose_name_plural = _("Personal Bests")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["profile", "tier", "metric"],
+                name="penthouse_personalbest_unique_scope",
+            )
+        ]
+        indexes = [
+            # the leaderboards of all profiles, see get_leaderboard()
+            models.Index(
+                fields=["tier", "metric", "-value"], name="penthouse_pb_leaderboard"
+            ),
+        ]
+
+    def __str__(self):  # noqa: D105
+        return "[PersonalBest] ({}) {} {}: {}".format(
+            self.profile_id, self.tier or "global", self.metric, self.value
+        )
+
+    def is_beaten_by(self, run):
+        """Return ``True`` if ``run`` replaces this personal best.
+
+        Runs with the same value only replace the personal best, if they were
+        played earlier.
+        """
+        value = run.get_metric(self.metric)
+        if value != self.value:
+            return value > self.value
+
+        return (run.date, run.pk) < (self.run.date, self.run_id)
@@ -7,6 +7,8 @@
 # Django imports
 from django import forms
 from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_comma_separated_integer_list
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
@@ -18,6 +20,20 @@ class ProfileModelException(PenthouseModelException):
     """Base class for all exceptions related to :class:`~penthouse.models.profile.Profile`."""
 
 
+def validate_avg_windows(value):
+    """Ensure that all specified rolling average windows are usable.
+
+    The value is expected to be a comma-separated list of integers (see
+    :func:`~django.core.validators.validate_comma_separated_integer_list`), but
+    a window of ``0`` runs can not be evaluated.
+    """
+    if any(window.isdigit() and int(window) < 1 for window in value.split(",")):
+        raise ValidationError(
+            _("Rolling average windows must include at least one run"),
+            code="invalid",
+        )
+
+
 class ProfileManager(models.Manager):
     """Custom manager for ``Profile`` model."""
 
@@ -28,6 +44,14 @@ class ProfileManager(models.Manager):
 
         return self.get_queryset().filter(owner=user)
 
+    def filter_by_profile(self, profile_id):
+        """Filter the profiles by ID.
+
+        This is the counterpart of ``RunQuerySet.filter_by_profile()``, to be
+        used by :class:`~penthouse.views.mixins.RestrictToUserMixin`.
+        """
+        return self.get_queryset().filter(pk=profile_id)
+
 
 class Profile(models.Model):
     """The app-specific profile.
@@ -97,6 +121,22 @@ class Profile(models.Model):
     a percent value (value/100).
     """
 
+    settings_tracker_avg_windows = models.CharField(
+        default="5",
+        max_length=32,
+        validators=[validate_comma_separated_integer_list, validate_avg_windows],
+        help_text=_(
+            "Number of runs to calculate rolling averages for, comma-separated (e.g. 5,10,25)"
+        ),
+        verbose_name=_("Rolling average windows"),
+    )
+    """The window sizes of the rolling averages in the tracker overview.
+
+    The field stores a comma-separated list of integers, each one being the
+    number of runs to include in one rolling average. Use
+    :meth:`get_avg_windows` to access the actual values.
+    """
+
     objects = ProfileManager()
     """Apply a custom manager.
 
@@ -113,6 +153,14 @@ class Profile(models.Model):
     def __str__(self):  # noqa: D105
         return "[Profile] {}".format(self.owner)
 
+    def get_avg_windows(self):
+        """Return the rolling average windows as sorted tuple of unique integers."""
+        return tuple(
+            sorted(
+                {int(window) for window in self.settings_tracker_avg_windows.split(",")}
+            )
+        )
+
 
 class ProfileForm(forms.ModelForm):
     """Used to validate input for creating and updating ``Profile`` instances."""
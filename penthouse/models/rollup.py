@@ -0,0 +1,266 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Time-bucketed rollups of the runs of a profile.
+
+The runs are summed up per day, week or month and tier by the database (see
+:meth:`RunRollupManager.compute`). Buckets, that are closed, are stored as
+:class:`RunRollup` instances, so only the current bucket has to be computed
+again. Stored buckets are removed as soon as one of their runs changes, see
+:meth:`RunRollupManager.invalidate`.
+"""
+
+# Python imports
+import datetime
+import functools
+import operator
+
+# Django imports
+from django.db import models
+from django.db.models.functions import Trunc
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+# app imports
+from penthouse.game_constants import TowerTiers
+from penthouse.models.profile import Profile
+from penthouse.models.tracker import Run
+from penthouse.utility import start_of_day
+
+
+class RollupPeriod(models.TextChoices):
+    """The length of the buckets of rollups.
+
+    The values are the kinds of Django's ``Trunc()``.
+    """
+
+    DAY = "day", _("Day")
+    WEEK = "week", _("Week")
+    MONTH = "month", _("Month")
+
+
+def _get_local_date(value):
+    """Return the date of a datetime in the current time zone."""
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+
+    return value.date()
+
+
+def get_bucket_start(period, value):
+    """Return the start of the bucket of ``period``, that contains ``value``.
+
+    The buckets are determined in the current time zone, just like the
+    database does with ``Trunc()``. Weeks start on Monday.
+    """
+    date = _get_local_date(value)
+
+    if period == RollupPeriod.WEEK:
+        date -= datetime.timedelta(days=date.weekday())
+    elif period == RollupPeriod.MONTH:
+        date = date.replace(day=1)
+
+    return start_of_day(date)
+
+
+def get_next_bucket_start(period, start):
+    """Return the start of the bucket following the bucket starting at ``start``."""
+    date = _get_local_date(start)
+
+    if period == RollupPeriod.DAY:
+        date += datetime.timedelta(days=1)
+    elif period == RollupPeriod.WEEK:
+        date += datetime.timedelta(days=7)
+    else:
+        date = (date.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+
+    return start_of_day(date)
+
+
+class RunRollupManager(models.Manager):
+    """Custom manager for ``RunRollup`` model."""
+
+    def compute(self, runs, period):
+        """Sum up the runs of a queryset per bucket and tier.
+
+        Returns unsaved ``RunRollup`` instances, ordered by their start.
+        """
+        buckets = (
+            runs.order_by()
+            .values("profile", "tier", bucket=Trunc("date", period))
+            .annotate(
+                run_count=models.Count("id"),
+                total_duration=models.Sum("duration"),
+                total_coins=models.Sum("coins"),
+                total_cells=models.Sum("cells"),
+            )
+            .order_by("bucket", "tier")
+        )
+
+        return [
+            self.model(
+                profile_id=bucket["profile"],
+                period=period,
+                tier=bucket["tier"],
+                start=bucket["bucket"],
+                runs=bucket["run_count"],
+                duration=bucket["total_duration"],
+                coins=bucket["total_coins"],
+                cells=bucket["total_cells"],
+            )
+            for bucket in buckets
+        ]
+
+    def get_rollups(self, profile, period, tier=None):
+        """Return the rollups of a profile, ordered by their start and tier.
+
+        The stored rollups are completed by computing the buckets after the
+        last stored bucket; the buckets, that are closed by now, are stored.
+        The current bucket (and future buckets) are never stored.
+
+        If ``tier`` is provided, only the rollups of that tier are returned.
+        """
+        stored = self.filter(profile=profile, period=period)
+        runs = Run.objects.filter_by_profile(profile.pk)
+
+        last = stored.aggregate(last=models.Max("start"))["last"]
+        if last is not None:
+            runs = runs.filter(date__gte=get_next_bucket_start(period, last))
+
+        current = get_bucket_start(period, timezone.now())
+        closed, pending = [], []
+        for rollup in self.compute(runs, period):
+            if rollup.start < current:
+                closed.append(rollup)
+            else:
+                pending.append(rollup)
+        if closed:
+            self.bulk_create(closed, ignore_conflicts=True)
+
+        if tier:
+            stored = stored.filter(tier=tier)
+            pending = [rollup for rollup in pending if rollup.tier == tier]
+
+        return list(stored.order_by("start", "tier")) + pending
+
+    def invalidate(self, profile_id, since=None):
+        """Remove the stored rollups of a profile, that have to be computed again.
+
+        If ``since`` is provided, only the buckets containing ``since`` and
+        all later buckets are removed, as the stored buckets have to be
+        contiguous (see :meth:`get_rollups`).
+        """
+        rollups = self.filter(profile_id=profile_id)
+        if since is not None:
+            rollups = rollups.filter(
+                functools.reduce(
+                    operator.or_,
+                    (
+                        models.Q(
+                            period=period, start__gte=get_bucket_start(period, since)
+                        )
+                        for period in RollupPeriod.values
+                    ),
+                )
+            )
+
+        rollups.delete()
+
+
+class RunRollup(models.Model):
+    """The sums of the runs of a profile in one bucket and tier."""
+
+    profile = models.ForeignKey(
+        Profile, db_index=False, on_delete=models.CASCADE, verbose_name=_("Profile")
+    )
+    """Reference to the associated profile."""
+
+    period = models.CharField(
+        choices=RollupPeriod, max_length=5, verbose_name=_("Period")
+    )
+    """The length of the bucket."""
+
+    tier = models.CharField(
+        blank=True, choices=TowerTiers, max_length=3, verbose_name=_("Tier")
+    )
+    """The tier of the runs, empty for the sums of all tiers (never stored)."""
+
+    start = models.DateTimeField(verbose_name=_("Start"))
+    """The first moment of the bucket."""
+
+    runs = models.PositiveIntegerField(verbose_name=_("Runs"))
+    """The number of runs in the bucket."""
+
+    duration = models.PositiveBigIntegerField(verbose_name=_("Duration"))
+    """The total playtime of the runs in seconds."""
+
+    coins = models.PositiveBigIntegerField(verbose_name=_("Coins"))
+    """The total coins of the runs."""
+
+    cells = models.PositiveBigIntegerField(verbose_name=_("Cells"))
+    """The total cells of the runs."""
+
+    objects = RunRollupManager()
+    """Apply a custom manager.
+
+    This should not interfere with Django's default inner mechanics, the
+    custom manager does not replace any default functions, it just provides
+    additional methods.
+    """
+
+    class Meta:  # noqa: D106
+        app_label = "penthouse"
+        verbose_name = _("Run Rollup")
+        verbose_name_plural = _("Run Rollups")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["profile", "period", "start", "tier"],
+                name="penthouse_runrollup_unique_bucket",
+            )
+        ]
+
+    def __str__(self):  # noqa: D105
+        return "[RunRollup] ({}) {} {} {}: {} runs".format(
+            self.profile_id, self.period, self.start, self.tier or "all", self.runs
+        )
+
+    @property
+    def coins_hour(self):
+        """Return the coins per hour of playtime."""
+        return int(self.coins / (self.duration / 3600))
+
+    @property
+    def cells_hour(self):
+        """Return the cells per hour of playtime."""
+        return int(self.cells / (self.duration / 3600))
+
+    @classmethod
+    def combine(cls, rollups):
+        """Sum up the rollups of all tiers per bucket.
+
+        ``rollups`` have to be ordered by their start, as provided by
+        :meth:`RunRollupManager.get_rollups`. Returns unsaved instances
+        without a tier.
+        """
+        combined = []
+        for rollup in rollups:
+            if not combined or combined[-1].start != rollup.start:
+                combined.append(
+                    cls(
+                        profile_id=rollup.profile_id,
+                        period=rollup.period,
+                        tier="",
+                        start=rollup.start,
+                        runs=0,
+                        duration=0,
+                        coins=0,
+                        cells=0,
+                    )
+                )
+            combined[-1].runs += rollup.runs
+            combined[-1].duration += rollup.duration
+            combined[-1].coins += rollup.coins
+            combined[-1].cells += rollup.cells
+
+        return combined
@@ -0,0 +1,225 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Persisted quantile sketches of the runs of a profile by tier.
+
+Every profile has one :class:`~penthouse.sketch.QuantileSketch` per tier and
+metric, covering its full history. The sketches are updated on every write of
+a run (see :mod:`penthouse.signals`), so the quantiles are available without
+fetching the runs at all.
+"""
+
+# Django imports
+from django.db import models, transaction
+from django.utils.translation import gettext_lazy as _
+
+# app imports
+from penthouse.game_constants import TowerTiers
+from penthouse.models.profile import Profile
+from penthouse.models.tracker import Run
+from penthouse.sketch import QUANTILES, QuantileSketch
+
+SKETCH_FIELDS = ("tier", "waves", "duration", "coins")
+"""The fields of ``Run``, that are required to update the sketches."""
+
+
+class SketchMetric(models.TextChoices):
+    """The metrics of runs, that are sketched."""
+
+    WAVES = "waves", _("Waves")
+    COINS_HOUR = "coins_hour", _("Coins/h")
+
+
+def get_sketch_row(run):
+    """Return the values of :data:`SKETCH_FIELDS` of a ``Run`` instance."""
+    return tuple(getattr(run, field) for field in SKETCH_FIELDS)
+
+
+def _get_values(row):
+    """Return the sketched values of a row of :data:`SKETCH_FIELDS`.
+
+    The result is a ``dict`` with the metrics as keys, the values are
+    calculated just like :meth:`Run.get_metric() <penthouse.models.tracker.Run.get_metric>`
+    does.
+    """
+    _tier, waves, duration, coins = row
+
+    return {
+        SketchMetric.WAVES: waves,
+        SketchMetric.COINS_HOUR: int(coins / (duration / 3600)),
+    }
+
+
+class RunSketchManager(models.Manager):
+    """Custom manager for ``RunSketch`` model."""
+
+    def apply(self, profile_id, removed=(), added=()):
+        """Remove and add rows of :data:`SKETCH_FIELDS` to the profile's sketches.
+
+        Only the sketches of the affected tiers are fetched and written; the
+        sketches of tiers without runs are removed.
+        """
+        changes = [(row, -1) for row in removed] + [(row, 1) for row in added]
+        if not changes:
+            return
+
+        with transaction.atomic():
+            sketches = {
+                (sketch.tier, sketch.metric): sketch
+                for sketch in self.select_for_update().filter(
+                    profile_id=profile_id,
+                    tier__in={row[0] for row, _count in changes},
+                )
+            }
+            decoded = {}
+            for row, count in changes:
+                for metric, value in _get_values(row).items():
+                    key = (row[0], metric)
+                    if key not in decoded:
+                        sketch = sketches.get(key, None)
+                        decoded[key] = (
+                            sketch.get_sketch()
+                            if sketch is not None
+                            else QuantileSketch()
+                        )
+                    decoded[key].add(value, count)
+
+            for (tier, metric), quantile_sketch in decoded.items():
+                sketch = sketches.get((tier, metric), None)
+                if quantile_sketch.count <= 0:
+                    if sketch is not None:
+                        sketch.delete()
+                elif sketch is None:
+                    self.create(
+                        profile_id=profile_id,
+                        tier=tier,
+                        metric=metric,
+                        data=quantile_sketch.to_dict(),
+                    )
+                else:
+                    sketch.data = quantile_sketch.to_dict()
+                    sketch.save(update_fields=["data"])
+
+    def update_for_run(self, run, previous=None):
+        """Apply a created or updated run to the sketches of its profile.
+
+        ``previous`` is the ``dict`` of the stored values of an updated run.
+        """
+        removed = []
+        if previous is not None:
+            removed.append(tuple(previous[field] for field in SKETCH_FIELDS))
+
+        self.apply(run.profile_id, removed=removed, added=[get_sketch_row(run)])
+
+    def update_for_deleted_run(self, run):
+        """Remove a deleted run from the sketches of its profile."""
+        self.apply(run.profile_id, removed=[get_sketch_row(run)])
+
+    def rebuild(self, profile):
+        """Create the sketches of a profile from all of its runs.
+
+        The runs are streamed from the database, so the memory consumption
+        does not depend on the number of runs.
+        """
+        decoded = {}
+        rows = (
+            Run.objects.filter(profile=profile)
+            .order_by()
+            .values_list(*SKETCH_FIELDS)
+            .iterator(chunk_size=5000)
+        )
+        for row in rows:
+            for metric, value in _get_values(row).items():
+                decoded.setdefault((row[0], metric), QuantileSketch()).add(value)
+
+        with transaction.atomic():
+            self.filter(profile=profile).delete()
+            self.bulk_create(
+                self.model(
+                    profile=profile,
+                    tier=tier,
+                    metric=metric,
+                    data=quantile_sketch.to_dict(),
+                )
+                for (tier, metric), quantile_sketch in decoded.items()
+            )
+
+    def build_quantiles(self, sketches, quantiles=QUANTILES):
+        """Estimate the quantiles of the given sketches of one profile.
+
+        The result is a ``dict`` with the tiers as keys, ordered by tier. Its
+        values provide the number of ``runs`` and the estimated quantiles of
+        every metric as ``list``.
+        """
+        results = {}
+        for sketch in sketches:
+            quantile_sketch = sketch.get_sketch()
+            tier = results.setdefault(sketch.tier, {"runs": quantile_sketch.count})
+            tier[sketch.metric] = [
+                round(quantile_sketch.quantile(q)) for q in quantiles
+            ]
+
+        return {
+            key: results[key]
+            for key in sorted(results.keys(), key=TowerTiers.get_ordinal)
+        }
+
+    def get_quantiles(self, profile, quantiles=QUANTILES):
+        """Estimate the quantiles of all tiers of a profile with a single query.
+
+        See :meth:`build_quantiles` for the result.
+        """
+        return self.build_quantiles(self.filter(profile=profile), quantiles)
+
+    async def aget_quantiles(self, profile, quantiles=QUANTILES):
+        """Async variant of :meth:`get_quantiles`."""
+        return self.build_quantiles(
+            [sketch async for sketch in self.filter(profile=profile)], quantiles
+        )
+
+
+class RunSketch(models.Model):
+    """The quantile sketch of one metric of a profile's runs in one tier."""
+
+    profile = models.ForeignKey(
+        Profile, db_index=False, on_delete=models.CASCADE, verbose_name=_("Profile")
+    )
+    """Reference to the associated profile."""
+
+    tier = models.CharField(choices=TowerTiers, max_length=3, verbose_name=_("Tier"))
+    """The tier of the sketched runs."""
+
+    metric = models.CharField(
+        choices=SketchMetric, max_length=10, verbose_name=_("Metric")
+    )
+    """The sketched metric."""
+
+    data = models.JSONField(default=dict, verbose_name=_("Data"))
+    """The sketch, see :meth:`QuantileSketch.to_dict() <penthouse.sketch.QuantileSketch.to_dict>`."""
+
+    objects = RunSketchManager()
+    """Apply a custom manager.
+
+    This should not interfere with Django's default inner mechanics, the
+    custom manager does not replace any default functions, it just provides
+    additional methods.
+    """
+
+    class Meta:  # noqa: D106
+        app_label = "penthouse"
+        verbose_name = _("Run Sketch")
+        verbose_name_plural = _("Run Sketches")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["profile", "tier", "metric"],
+                name="penthouse_runsketch_unique_scope",
+            )
+        ]
+
+    def __str__(self):  # noqa: D105
+        return "[RunSketch] ({}) {} {}".format(self.profile_id, self.tier, self.metric)
+
+    def get_sketch(self):
+        """Return the stored sketch as ``QuantileSketch`` instance."""
+        return QuantileSketch.from_dict(self.data)
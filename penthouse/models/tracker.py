@@ -6,7 +6,10 @@
 
 # Django imports
 from django import forms
-from django.db import models
+from django.db import models, transaction
+from django.db.models.expressions import RowRange
+from django.db.models.functions import Cast, Floor, RowNumber
+from django.db.models.lookups import GreaterThan, IsNull
 from django.utils.translation import gettext_lazy as _
 
 # app imports
@@ -20,24 +23,268 @@ class RunModelException(PenthouseModelException):
     """Base class for all exceptions related to :class:`~penthouse.models.tracker.Run` model."""
 
 
-class RunManager(models.Manager):
-    """Custom manager for ``Run`` model."""
+class RunMetric(models.TextChoices):
+    """The evaluated metrics of a run, that are tracked as personal bests."""
+
+    COINS = "coins", _("Coins")
+    COINS_HOUR = "coins_hour", _("Coins/h")
+    CELLS = "cells", _("Cells")
+    CELLS_HOUR = "cells_hour", _("Cells/h")
+
+
+def _per_hour(field_name):
+    """Provide the database expression of an hourly value of a run."""
+    return Floor(
+        Cast(field_name, models.FloatField())
+        / (Cast("duration", models.FloatField()) / 3600.0)
+    )
+
+
+def get_metric_expression(metric):
+    """Return a database expression to evaluate ``metric`` for ``Run`` instances.
+
+    Hourly values are calculated just like
+    :class:`~penthouse.views.tracker.RunData` does: as floating point
+    division, truncated to an integer.
+    """
+    if metric == RunMetric.COINS_HOUR:
+        return _per_hour("coins")
+    if metric == RunMetric.CELLS_HOUR:
+        return _per_hour("cells")
+
+    return models.F(metric)
+
+
+def _per_wave(field_name):
+    """Provide the database expression of a per wave value of a run."""
+    return Floor(
+        Cast(field_name, models.FloatField()) / Cast("waves", models.FloatField())
+    )
+
+
+class RunQuerySet(models.QuerySet):
+    """Custom queryset for ``Run`` model.
+
+    The evaluation methods annotate the derived values of the runs, as
+    provided by :class:`~penthouse.views.tracker.RunData`, so that the
+    database does the actual work in a single pass.
+    """
+
+    evaluation_order = (models.F("date").asc(), models.F("id").asc())
+    """The order of runs to evaluate rolling averages and personal bests."""
 
     def filter_by_user(self, user=None):
-        """Filter the runs by the specified user."""
+        """Filter the runs by the specified user.
+
+        The user's profile is determined by a subquery, so the runs are
+        filtered by the profile's ID and the database can use the indexes,
+        that start with ``profile``.
+        """
         if user is None:
             raise RunModelException("No user specified!")
 
-        return self.get_queryset().filter(profile__owner=user)
+        return self.filter(
+            profile_id=models.Subquery(
+                Profile.objects.filter(owner=user).values("pk")[:1]
+            )
+        )
+
+    def filter_by_profile(self, profile_id):
+        """Filter the runs by the ID of their profile."""
+        return self.filter(profile_id=profile_id)
+
+    def with_metrics(self):
+        """Annotate the hourly and per wave values of the runs.
+
+        The values are truncated, but provided as floating point numbers by
+        most database backends.
+        """
+        return self.annotate(
+            coins_hour=_per_hour("coins"),
+            coins_wave=_per_wave("coins"),
+            cells_hour=_per_hour("cells"),
+            cells_wave=_per_wave("cells"),
+        )
+
+    def _window(self, expression, frame=None):
+        """Provide a window expression over the runs of one profile."""
+        return models.Window(
+            expression,
+            partition_by=[models.F("profile")],
+            order_by=list(self.evaluation_order),
+            frame=frame,
+        )
+
+    def with_evaluation(self, windows=(5,)):
+        """Annotate metrics, local personal bests and rolling averages.
+
+        Besides the annotations of :meth:`with_metrics` this provides:
+
+        - ``run_number``: the position of the run in the profile's history;
+        - ``pb_<metric>``: ``True`` if the run was a personal best (for all
+          metrics of :class:`RunMetric`) at the time it was played, meaning it
+          is greater than the running maximum of all previous runs;
+        - ``<metric>_avg<size>``: the average of the last ``size`` runs,
+          including the current one, for all metrics and window sizes.
+
+        The rolling averages are provided as they are computed by the database,
+        that is not rounded and even if there are less than ``size`` runs.
+
+        Notes
+        -----
+        All values are calculated over the runs, that match the queryset's
+        filters. Filtering the runs afterwards requires to wrap the queryset,
+        see Django's documentation on filtering against window functions.
+        """
+        queryset = self.with_metrics().annotate(run_number=self._window(RowNumber()))
+
+        for metric in RunMetric.values:
+            previous_max = self._window(
+                models.Max(metric), frame=RowRange(start=None, end=-1)
+            )
+            queryset = queryset.annotate(
+                **{
+                    "pb_{}".format(metric): models.Case(
+                        models.When(
+                            models.Q(IsNull(previous_max, True))
+                            | models.Q(GreaterThan(models.F(metric), previous_max)),
+                            then=models.Value(True),
+                        ),
+                        default=models.Value(False),
+                        output_field=models.BooleanField(),
+                    ),
+                    **{
+                        "{}_avg{}".format(metric, size): self._window(
+                            models.Avg(metric), frame=RowRange(start=-(size - 1), end=0)
+                        )
+                        for size in windows
+                    },
+                }
+            )
+
+        return queryset.order_by(*self.evaluation_order)
+
+    def find_best(self, metric):
+        """Query the best run of the queryset regarding ``metric``.
+
+        The runs are ordered by the metric and their date, so the first run
+        to reach the best value is returned, just like the evaluation of the
+        run tracker does. Returns a tuple of the run's ID and the value or
+        ``None``, if the queryset is empty.
+        """
+        return self._get_best_query(metric).first()
+
+    async def afind_best(self, metric):
+        """Async variant of :meth:`find_best`."""
+        return await self._get_best_query(metric).afirst()
+
+    def _get_best_query(self, metric):
+        """Provide the query of :meth:`find_best`."""
+        return (
+            self.annotate(metric_value=get_metric_expression(metric))
+            .order_by("-metric_value", "date", "id")
+            .values_list("id", "metric_value")
+        )
+
+    def with_pb_flags(self, scope):
+        """Annotate ``is_pb_<metric>`` for all metrics of :class:`RunMetric`.
+
+        The flag is ``True`` if the run was a personal best at the time it was
+        played, meaning no earlier run of ``scope`` (a queryset of runs) has
+        reached the run's value.
+        """
+        queryset = self.annotate(
+            **{
+                "metric_{}".format(metric): get_metric_expression(metric)
+                for metric in RunMetric.values
+            }
+        )
+
+        earlier_runs = scope.filter(
+            models.Q(date__lt=models.OuterRef("date"))
+            | models.Q(date=models.OuterRef("date"), pk__lt=models.OuterRef("pk"))
+        )
+        return queryset.annotate(
+            **{
+                "is_pb_{}".format(metric): ~models.Exists(
+                    earlier_runs.annotate(
+                        earlier_value=get_metric_expression(metric)
+                    ).filter(
+                        earlier_value__gte=models.OuterRef("metric_{}".format(metric))
+                    )
+                )
+                for metric in RunMetric.values
+            }
+        )
+
+    def get_best_runs(self):
+        """Return the runs holding the personal bests among the queryset's runs.
+
+        The result is a ``dict`` with the metrics as keys, the runs are
+        annotated by :meth:`with_pb_flags` and their notes are deferred.
+
+        Notes
+        -----
+        This evaluates the runs of the queryset, e.g. a filtered part of a
+        profile's history. The personal bests of all runs of a profile are
+        persisted, see :class:`~penthouse.models.personal_best.PersonalBest`.
+        """
+        best = {metric: self.find_best(metric) for metric in RunMetric.values}
+
+        runs_by_id = {run.pk: run for run in self._get_best_runs_query(best)}
+        return {
+            metric: runs_by_id[value[0]]
+            for metric, value in best.items()
+            if value is not None
+        }
+
+    async def aget_best_runs(self):
+        """Async variant of :meth:`get_best_runs`."""
+        best = {metric: await self.afind_best(metric) for metric in RunMetric.values}
+
+        runs_by_id = {run.pk: run async for run in self._get_best_runs_query(best)}
+        return {
+            metric: runs_by_id[value[0]]
+            for metric, value in best.items()
+            if value is not None
+        }
+
+    def _get_best_runs_query(self, best):
+        """Provide the query of the runs of :meth:`find_best`'s results."""
+        return (
+            self.model.objects.filter(
+                pk__in=[value[0] for value in best.values() if value is not None]
+            )
+            .defer("notes")
+            .with_pb_flags(self)
+        )
+
+    def latest_by_tier(self, count=5):
+        """Limit the runs to the latest ``count`` runs of every tier."""
+        return self.alias(
+            tier_run_number=models.Window(
+                RowNumber(),
+                partition_by=[models.F("profile"), models.F("tier")],
+                order_by=[models.F("date").desc(), models.F("id").desc()],
+            )
+        ).filter(tier_run_number__lte=count)
+
+
+class RunManager(models.Manager.from_queryset(RunQuerySet)):
+    """Custom manager for ``Run`` model."""
 
 
 class Run(models.Model):
     """A single run instance."""
 
     profile = models.ForeignKey(
-        Profile, on_delete=models.CASCADE, verbose_name=_("Profile")
+        Profile, db_index=False, on_delete=models.CASCADE, verbose_name=_("Profile")
     )
-    """Reference to the associated profile."""
+    """Reference to the associated profile.
+
+    The field is not indexed on its own, all indexes of :class:`Run` start
+    with the profile.
+    """
 
     date = models.DateTimeField(
         help_text=_("Date and time of the run"), verbose_name=_("Run Date")
@@ -91,12 +338,61 @@ class Run(models.Model):
         app_label = "penthouse"
         verbose_name = _("Run")
         verbose_name_plural = _("Runs")
+        indexes = [
+            # keyset pagination and evaluation of a profile's runs by date
+            models.Index(
+                fields=["profile", "date", "id"], name="penthouse_run_profile_date"
+            ),
+            # filtering by tier, e.g. the latest runs of every tier; descending
+            # like the window of latest_by_tier(), scanned backwards by date
+            models.Index(
+                fields=["profile", "tier", "-date", "-id"],
+                name="penthouse_run_profile_tier",
+            ),
+            # lookups of personal bests, in the order of find_best()
+            models.Index(
+                fields=["profile", "-coins", "date", "id"],
+                name="penthouse_run_profile_coins",
+            ),
+            models.Index(
+                fields=["profile", "-cells", "date", "id"],
+                name="penthouse_run_profile_cells",
+            ),
+            # the admin's changelist of all profiles' runs, by date and tier
+            models.Index(fields=["date", "id"], name="penthouse_run_date"),
+            models.Index(fields=["tier", "date", "id"], name="penthouse_run_tier"),
+        ]
 
     def __str__(self):  # noqa: D105
         return "[Run] ({}) {} {}-{}: {} / {}".format(
-            self.profile, self.date, self.tier, self.waves, self.coins, self.cells
+            self.profile_id, self.date, self.tier, self.waves, self.coins, self.cells
         )
 
+    def save(self, *args, **kwargs):
+        """Save the instance.
+
+        The actual saving is wrapped in a transaction, so that the receivers
+        of ``post_save`` (e.g. the maintenance of
+        :class:`~penthouse.models.personal_best.PersonalBest`) are applied
+        atomically together with the run.
+        """
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
+    def get_metric(self, metric):
+        """Return the value of ``metric`` for this run.
+
+        Notes
+        -----
+        See :func:`get_metric_expression` for the database equivalent.
+        """
+        if metric == RunMetric.COINS_HOUR:
+            return int(self.coins / (self.duration / 3600))
+        if metric == RunMetric.CELLS_HOUR:
+            return int(self.cells / (self.duration / 3600))
+
+        return getattr(self, metric)
+
 
 class RunForm(forms.ModelForm):
     """Used to validate input for creating and updating ``Run`` instances."""
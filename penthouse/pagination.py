@@ -0,0 +1,224 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Keyset pagination of runs.
+
+Runs are paginated by their ``(date, id)`` key instead of an ``OFFSET``, so
+fetching any page is an index range scan of constant cost, independent of the
+number of preceding runs.
+
+:class:`EstimatedCountPaginator` is a regular Django paginator for the admin,
+that takes the number of objects of large tables from the database's
+statistics instead of counting them.
+"""
+
+# Python imports
+from datetime import datetime
+
+# Django imports
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+# app imports
+from penthouse.conf import get_setting
+
+_ESTIMATE_QUERIES = {
+    "postgresql": "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+    "mysql": (
+        "SELECT table_rows FROM information_schema.tables "
+        "WHERE table_schema = DATABASE() AND table_name = %s"
+    ),
+}
+"""The queries of the estimated number of rows of a table by database vendor."""
+
+
+def keyset_filter(key, lookup):
+    """Provide a filter to compare the ``(date, id)`` key of runs with ``key``.
+
+    ``lookup`` is one of ``"lt"``, ``"lte"``, ``"gt"`` and ``"gte"``, applied
+    to the key as a whole.
+    """
+    date, pk = key
+
+    return Q(**{"date__{}".format(lookup[:2]): date}) | Q(
+        date=date, **{"id__{}".format(lookup): pk}
+    )
+
+
+def encode_cursor(key):
+    """Encode a ``(date, id)`` key to be used as URL parameter."""
+    return "{}_{}".format(key[0].isoformat(), key[1])
+
+
+def decode_cursor(value):
+    """Decode a URL parameter to a ``(date, id)`` key.
+
+    Returns ``None`` if the parameter is not a valid cursor.
+    """
+    try:
+        date, pk = value.rsplit("_", 1)
+        return datetime.fromisoformat(date), int(pk)
+    except (AttributeError, ValueError):
+        return None
+
+
+class KeysetPage:
+    """A single page of a ``KeysetPaginator``.
+
+    The page does not hold the actual objects, but the keys of its first and
+    last object, so that the objects can be evaluated in the context of their
+    preceding objects.
+    """
+
+    def __init__(self, start, end, has_previous, has_next):
+        self.start = start
+        self.end = end
+        self.has_previous = has_previous
+        self.has_next = has_next
+
+    def __bool__(self):  # noqa: D105
+        return self.start is not None
+
+    @property
+    def previous_cursor(self):
+        """Return the cursor to fetch the page before this page."""
+        return encode_cursor(self.start) if self.has_previous else None
+
+    @property
+    def next_cursor(self):
+        """Return the cursor to fetch the page after this page."""
+        return encode_cursor(self.end) if self.has_next else None
+
+
+class KeysetPaginator:
+    """Paginate a queryset of runs by their ``(date, id)`` key.
+
+    The pages are ordered by date. Without a cursor, the latest page is
+    returned.
+    """
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = per_page
+
+    def _get_keys_query(self, before=None, after=None):
+        """Query the keys of one page plus one, to determine further pages."""
+        if after is not None:
+            queryset = self.queryset.filter(keyset_filter(after, "gt"))
+            ordering = ("date", "id")
+        else:
+            queryset = self.queryset
+            if before is not None:
+                queryset = queryset.filter(keyset_filter(before, "lt"))
+            ordering = ("-date", "-id")
+
+        return queryset.order_by(*ordering).values_list("date", "id")[
+            : self.per_page + 1
+        ]
+
+    def _get_adjacent_query(self, keys, before=None, after=None):
+        """Query the runs on the other side of the page, ``None`` if not required.
+
+        Without a cursor, the latest page is returned, so there is no next
+        page.
+        """
+        if after is not None:
+            return self.queryset.filter(keyset_filter(keys[0], "lt"))
+        if before is not None:
+            return self.queryset.filter(keyset_filter(keys[-1], "gt"))
+        return None
+
+    def _build_page(self, keys, after, has_more, has_adjacent):
+        """Create the ``KeysetPage`` of the fetched keys."""
+        if after is not None:
+            return KeysetPage(keys[0], keys[-1], has_adjacent, has_more)
+        return KeysetPage(keys[0], keys[-1], has_more, has_adjacent)
+
+    def _split_keys(self, keys, after):
+        """Return the keys of the page in ascending order and if there are more."""
+        has_more = len(keys) > self.per_page
+        keys = keys[: self.per_page]
+
+        return (keys if after is not None else keys[::-1]), has_more
+
+    def get_page(self, before=None, after=None):
+        """Return the page before or after the given keys.
+
+        Only the keys of the page's objects are fetched; the existence of
+        further pages is determined by fetching one key more than required.
+        """
+        keys, has_more = self._split_keys(
+            list(self._get_keys_query(before, after)), after
+        )
+        if not keys:
+            return KeysetPage(None, None, False, False)
+
+        adjacent = self._get_adjacent_query(keys, before, after)
+        return self._build_page(
+            keys, after, has_more, adjacent is not None and adjacent.exists()
+        )
+
+    async def aget_page(self, before=None, after=None):
+        """Async variant of :meth:`get_page`, using Django's async ORM."""
+        keys, has_more = self._split_keys(
+            [key async for key in self._get_keys_query(before, after)], after
+        )
+        if not keys:
+            return KeysetPage(None, None, False, False)
+
+        adjacent = self._get_adjacent_query(keys, before, after)
+        return self._build_page(
+            keys, after, has_more, adjacent is not None and await adjacent.aexists()
+        )
+
+
+def get_estimated_count(model, using="default"):
+    """Return the estimated number of rows of the model's table.
+
+    The estimate is taken from the statistics of the database, which are
+    updated by ``ANALYZE``. Returns ``None``, if the database does not provide
+    an estimate (e.g. SQLite) or the table has not been analyzed yet.
+    """
+    connection = connections[using]
+    query = _ESTIMATE_QUERIES.get(connection.vendor, None)
+    if query is None:
+        return None
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(query, [model._meta.db_table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Estimate the number of objects of unfiltered large tables.
+
+    ``COUNT(*)`` has to visit every row, which is the most expensive query of
+    a changelist of a table with millions of rows. If the queryset is not
+    filtered and the estimated number of rows (see
+    :func:`get_estimated_count`) is at least the setting
+    ``ADMIN_COUNT_ESTIMATE_THRESHOLD``, the estimate is used instead; the last
+    pages might be empty or missing then. Filtered querysets are counted.
+    """
+
+    @cached_property
+    def count(self):
+        """Return the (estimated) number of objects."""
+        queryset = self.object_list
+        threshold = get_setting("ADMIN_COUNT_ESTIMATE_THRESHOLD")
+        if threshold is None or not hasattr(queryset, "query") or queryset.query.where:
+            return super().count
+
+        estimate = get_estimated_count(queryset.model, using=queryset.db)
+        if estimate is None or estimate < threshold:
+            return super().count
+        return estimate
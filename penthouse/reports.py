@@ -0,0 +1,133 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Parsing of the game's battle reports.
+
+The Tower provides a *Battle Report* of every run, that may be copied as
+text: one line per value, the label and the value separated by a tab, e.g.::
+
+    Battle Report
+    Battle Date     Oct 14, 2024 13:22
+    Game Time       1d 2h 3m 4s
+    Real Time       6h 12m 3s
+    Tier            10
+    Wave            4512
+    Coins Earned    12.34T
+    Cells Earned    12.3K
+    ...
+
+:func:`read_battle_reports` reads any number of pasted reports in a single
+pass over the lines and provides them as rows of :mod:`penthouse.importer`,
+so they are validated and inserted in batches like imported files. Lines are
+matched by one precompiled expression of the relevant labels, all other
+values of the reports are skipped. The numbers keep the game's notation and
+are parsed by :func:`penthouse.game_numbers.parse_number`, using the
+suffixes of :class:`~penthouse.game_constants.TowerUnits`.
+"""
+
+# Python imports
+import re
+from datetime import datetime
+
+LABELS = {
+    "battle date": "date",
+    "real time": "duration",
+    "tier": "tier",
+    "wave": "waves",
+    "coins earned": "coins",
+    "cells earned": "cells",
+}
+"""Map the (lowercase) labels of a battle report to the keys of the importer."""
+
+_HEADER = "battle report"
+
+_LINE_RE = re.compile(
+    r"^\s*(?P<label>{})(?!\w)[\s:]*(?P<value>.*?)\s*$".format(
+        "|".join(re.escape(label) for label in (_HEADER,) + tuple(LABELS))
+    ),
+    re.IGNORECASE,
+)
+
+_DURATION_RE = re.compile(
+    r"^(?:(?P<d>\d+)\s*d)?\s*(?:(?P<h>\d+)\s*h)?\s*(?:(?P<m>\d+)\s*m)?\s*(?:(?P<s>\d+)\s*s)?$"
+)
+
+_DATE_FORMATS = ("%b %d, %Y %H:%M", "%b %d, %Y %H:%M:%S", "%d.%m.%Y %H:%M")
+"""The formats of the date of a battle report, besides ISO 8601."""
+
+
+def _convert_date(value):
+    """Convert the date of a report to ISO 8601, if it is in a known format."""
+    for date_format in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).isoformat()
+        except ValueError:
+            pass
+
+    return value
+
+
+def _convert_duration(value):
+    """Convert a duration like ``1d 2h 3m 4s`` to seconds."""
+    match = _DURATION_RE.match(value)
+    if not value or match is None:
+        return value
+
+    days, hours, minutes, seconds = (int(match.group(c) or 0) for c in "dhms")
+    return str(((days * 24 + hours) * 60 + minutes) * 60 + seconds)
+
+
+def _convert_tier(value):
+    """Provide the tier as value of :class:`~penthouse.game_constants.TowerTiers`."""
+    return "T{}".format(value) if value.isdigit() else value.upper()
+
+
+def _convert_waves(value):
+    """Remove the thousands separators of the wave, e.g. ``4,512``."""
+    return value.replace(",", "")
+
+
+_CONVERTERS = {
+    "date": _convert_date,
+    "duration": _convert_duration,
+    "tier": _convert_tier,
+    "waves": _convert_waves,
+}
+
+
+def read_battle_reports(stream):
+    """Yield the runs of the battle reports of a text stream.
+
+    The runs are provided as ``dict`` with the keys of
+    :mod:`penthouse.importer`, together with the line number of the report's
+    first line. A report starts with the line ``Battle Report`` or with a
+    label, that has already been provided for the current report, so
+    reports without a header are separated as well. Incomplete reports are
+    yielded nevertheless and reported by the importer.
+    """
+    row = {}
+    start = None
+    for line_number, line in enumerate(stream, start=1):
+        match = _LINE_RE.match(line)
+        if match is None:
+            continue
+
+        label = match.group("label").lower()
+        key = LABELS.get(label, None)
+        if key is None or key in row:
+            if row:
+                yield start, row
+            row = {}
+            start = line_number
+            if key is None:
+                continue
+
+        if start is None:
+            start = line_number
+        value = match.group("value")
+        converter = _CONVERTERS.get(key, None)
+        row[key] = converter(value) if converter is not None else value
+
+    if row:
+        yield start, row
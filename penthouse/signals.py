@@ -0,0 +1,151 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Receivers of Django's model signals to keep derived data in sync.
+
+The receivers are connected in :meth:`penthouse.apps.PenthouseConfig.ready`.
+The receivers of ``Run`` may be suspended by :func:`suspend_run_receivers`
+for bulk changes, that maintain the derived data once afterwards.
+"""
+
+# Python imports
+import contextlib
+import contextvars
+
+# Django imports
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+# app imports
+from penthouse.cache import bump_generation
+from penthouse.models.personal_best import PersonalBest
+from penthouse.models.profile import Profile
+from penthouse.models.rollup import RunRollup
+from penthouse.models.sketch import SKETCH_FIELDS, RunSketch
+from penthouse.models.tracker import Run
+
+_suspended = contextvars.ContextVar("penthouse_run_receivers_suspended", default=False)
+
+
+@contextlib.contextmanager
+def suspend_run_receivers():
+    """Skip the receivers of ``Run``'s signals within the ``with`` block.
+
+    Django sends ``post_delete`` for every run of ``QuerySet.delete()``; the
+    bulk changes of :mod:`penthouse.bulk` apply the personal bests, rollups,
+    sketches and the cache once for all runs instead.
+    """
+    token = _suspended.set(True)
+    try:
+        yield
+    finally:
+        _suspended.reset(token)
+
+
+@receiver(post_save, sender=Run, dispatch_uid="penthouse_run_saved_personal_best")
+def update_personal_best_on_save(sender, instance, raw=False, **kwargs):
+    """Apply a created or updated ``Run`` to the profile's personal bests."""
+    if raw or _suspended.get():
+        return
+
+    PersonalBest.objects.update_for_run(instance)
+
+
+@receiver(post_delete, sender=Run, dispatch_uid="penthouse_run_deleted_personal_best")
+def update_personal_best_on_delete(sender, instance, **kwargs):
+    """Re-query the personal bests that were held by a deleted ``Run``."""
+    if _suspended.get():
+        return
+
+    PersonalBest.objects.update_for_deleted_run(instance)
+
+
+@receiver(pre_save, sender=Run, dispatch_uid="penthouse_run_saving_previous")
+def remember_previous_run(sender, instance, raw=False, **kwargs):
+    """Fetch the stored values of an updated ``Run``, before it is saved.
+
+    The values are stored as ``dict`` in ``instance._penthouse_previous``
+    (``None`` for created runs) and used by the other receivers.
+    """
+    if raw or _suspended.get():
+        return
+
+    previous = None
+    if instance.pk is not None:
+        previous = (
+            Run.objects.filter(pk=instance.pk).values("date", *SKETCH_FIELDS).first()
+        )
+    instance._penthouse_previous = previous
+
+
+@receiver(pre_save, sender=Run, dispatch_uid="penthouse_run_saving_rollup")
+def invalidate_rollups_on_save(sender, instance, raw=False, **kwargs):
+    """Remove the stored rollups, that are affected by a created or updated ``Run``.
+
+    An updated run might have been moved to another date, so the rollups are
+    invalidated from the earlier of the previous and the new date.
+    """
+    if raw or _suspended.get():
+        return
+
+    since = instance.date
+    previous = getattr(instance, "_penthouse_previous", None)
+    if previous is not None:
+        since = min(since, previous["date"])
+
+    RunRollup.objects.invalidate(instance.profile_id, since=since)
+
+
+@receiver(post_delete, sender=Run, dispatch_uid="penthouse_run_deleted_rollup")
+def invalidate_rollups_on_delete(sender, instance, **kwargs):
+    """Remove the stored rollups, that contained a deleted ``Run``."""
+    if _suspended.get():
+        return
+
+    RunRollup.objects.invalidate(instance.profile_id, since=instance.date)
+
+
+@receiver(post_save, sender=Run, dispatch_uid="penthouse_run_saved_sketch")
+def update_sketches_on_save(sender, instance, raw=False, **kwargs):
+    """Apply a created or updated ``Run`` to the profile's sketches."""
+    if raw or _suspended.get():
+        return
+
+    RunSketch.objects.update_for_run(
+        instance, previous=getattr(instance, "_penthouse_previous", None)
+    )
+    instance._penthouse_previous = None
+
+
+@receiver(post_delete, sender=Run, dispatch_uid="penthouse_run_deleted_sketch")
+def update_sketches_on_delete(sender, instance, **kwargs):
+    """Remove a deleted ``Run`` from the profile's sketches."""
+    if _suspended.get():
+        return
+
+    RunSketch.objects.update_for_deleted_run(instance)
+
+
+@receiver(post_save, sender=Run, dispatch_uid="penthouse_run_saved_cache")
+@receiver(post_delete, sender=Run, dispatch_uid="penthouse_run_deleted_cache")
+def invalidate_cache_on_run_change(sender, instance, **kwargs):
+    """Invalidate the cached data of the run's profile, once committed."""
+    if _suspended.get():
+        return
+
+    profile_id = instance.profile_id
+    transaction.on_commit(lambda: bump_generation(profile_id))
+
+
+@receiver(post_save, sender=Profile, dispatch_uid="penthouse_profile_saved_cache")
+@receiver(post_delete, sender=Profile, dispatch_uid="penthouse_profile_deleted_cache")
+def invalidate_cache_on_profile_change(sender, instance, **kwargs):
+    """Invalidate the cached data of a profile, e.g. on changed thresholds.
+
+    This invalidates the profile's ID in the sessions of its owner as well,
+    see :func:`penthouse.middleware.get_profile_id`.
+    """
+    profile_id = instance.pk
+    transaction.on_commit(lambda: bump_generation(profile_id))
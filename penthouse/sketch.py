@@ -0,0 +1,128 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Mergeable sketches to estimate quantiles of a stream of values.
+
+:class:`QuantileSketch` counts the values in logarithmically sized buckets,
+like DDSketch does: a value ``x > 0`` is counted in the bucket
+``ceil(log(x) / log(gamma))``, so every estimated quantile is within
+:data:`RELATIVE_ACCURACY` of the actual value. Adding and removing a value is
+``O(1)``; two sketches are merged by adding their counts. As values may be
+removed exactly, the sketches can follow updates and deletions of runs,
+which is not possible with t-digest or KLL sketches.
+
+The sketches are persisted as ``dict`` of the index of the first bucket and
+the dense list of counts, see :meth:`QuantileSketch.to_dict`. The values of
+runs span a few orders of magnitude, so a sketch has some hundred buckets
+at most.
+"""
+
+# Python imports
+import math
+
+RELATIVE_ACCURACY = 0.01
+"""The maximum relative error of the estimated quantiles."""
+
+QUANTILES = (0.5, 0.9, 0.99)
+"""The quantiles, that are provided by the app's views."""
+
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+
+
+class QuantileSketch:
+    """Count values in logarithmic buckets to estimate their quantiles.
+
+    ``counts`` is the dense list of counts of the buckets, starting with the
+    bucket ``offset``; values ``<= 0`` are counted as ``zeros``.
+    """
+
+    __slots__ = ("offset", "counts", "zeros")
+
+    def __init__(self, offset=0, counts=None, zeros=0):
+        self.offset = offset
+        self.counts = list(counts) if counts is not None else []
+        self.zeros = zeros
+
+    @property
+    def count(self):
+        """Return the number of values in the sketch."""
+        return self.zeros + sum(self.counts)
+
+    def add(self, value, count=1):
+        """Add a value, ``count`` times; a negative ``count`` removes it."""
+        if value <= 0:
+            self.zeros += count
+            return
+
+        self._add_to_bucket(math.ceil(math.log(value) / _LOG_GAMMA), count)
+
+    def _add_to_bucket(self, index, count):
+        """Add ``count`` to the bucket ``index``, extending the counts as required."""
+        if not self.counts:
+            self.offset = index
+            self.counts.append(0)
+        elif index < self.offset:
+            self.counts[:0] = [0] * (self.offset - index)
+            self.offset = index
+        elif index >= self.offset + len(self.counts):
+            self.counts.extend([0] * (index - self.offset - len(self.counts) + 1))
+
+        self.counts[index - self.offset] += count
+        if count < 0:
+            self._trim()
+
+    def remove(self, value):
+        """Remove a value, that has been added before."""
+        self.add(value, -1)
+
+    def _trim(self):
+        """Remove empty buckets at both ends of the counts."""
+        start = 0
+        while start < len(self.counts) and self.counts[start] == 0:
+            start += 1
+        end = len(self.counts)
+        while end > start and self.counts[end - 1] == 0:
+            end -= 1
+
+        self.counts = self.counts[start:end]
+        self.offset = self.offset + start if self.counts else 0
+
+    def merge(self, other):
+        """Add all values of another sketch to this sketch."""
+        self.zeros += other.zeros
+        for position, count in enumerate(other.counts):
+            if count:
+                self._add_to_bucket(other.offset + position, count)
+
+    def quantile(self, q):
+        """Return the estimated ``q``-quantile (``0 <= q <= 1``), ``None`` if empty."""
+        total = self.count
+        if total == 0:
+            return None
+
+        rank = q * (total - 1)
+        if rank < self.zeros:
+            return 0
+
+        seen = self.zeros
+        for position, count in enumerate(self.counts):
+            seen += count
+            if seen > rank:
+                return 2 * _GAMMA ** (self.offset + position) / (_GAMMA + 1)
+
+        return 2 * _GAMMA ** (self.offset + len(self.counts) - 1) / (_GAMMA + 1)
+
+    def to_dict(self):
+        """Return the sketch as JSON-serializable ``dict``."""
+        return {"offset": self.offset, "counts": self.counts, "zeros": self.zeros}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Restore a sketch from the result of :meth:`to_dict`."""
+        return cls(
+            offset=data.get("offset", 0),
+            counts=data.get("counts", None),
+            zeros=data.get("zeros", 0),
+        )
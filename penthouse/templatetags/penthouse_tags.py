@@ -2,9 +2,11 @@
 
 # Django imports
 from django.template import Library
+from django.utils.html import format_html
 
 # app imports
-from penthouse.utility import get_number_prefix, seconds_to_hms
+from penthouse.game_numbers import format_number
+from penthouse.utility import seconds_to_hms
 
 # create a valid Django templatetag library
 register = Library()
@@ -21,6 +23,34 @@ def hr_duration(value):
 @register.filter
 def hr_big_number(value):
     """Provide number notation with prefix."""
-    numerical, prefix = get_number_prefix(value)
-
-    return "{:0.2f}{}".format(numerical, prefix)
+    return format_number(value)
+
+
+@register.simple_tag
+def td_with_evaluation(current_value, max_value, top_value, current_pb=False):
+    """Render a table cell with the value's classification as CSS classes.
+
+    The value is classified as the global personal best (``max_value``), as
+    *top value* (at least ``top_value``) and as local personal best
+    (``current_pb``).
+    """
+    if current_value == max_value:
+        css_classes = "max-value pb-global"
+    else:
+        try:
+            is_top = current_value >= top_value
+        except TypeError:
+            # the template engine evaluates uncomparable values as False
+            is_top = False
+
+        css_classes = " ".join(
+            css_class
+            for css_class, applies in (("top-value", is_top), ("pb-local", current_pb))
+            if applies
+        )
+
+    if css_classes:
+        return format_html(
+            '<td class="{}">{}</td>', css_classes, hr_big_number(current_value)
+        )
+    return format_html("<td>{}</td>", hr_big_number(current_value))
@@ -0,0 +1,109 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Named timing spans within the app's request processing.
+
+Spans are only recorded while a collection is active, which is started by
+:class:`penthouse.middleware.TimingMiddleware` if ``PENTHOUSE_TIMING`` is
+enabled. Otherwise :func:`span` returns a shared no-op context manager, so the
+instrumented code paths are not slowed down.
+
+Every finished span sends :data:`span_finished`; the middleware provides the
+collected spans as ``Server-Timing`` header of the response.
+"""
+
+# Python imports
+import contextvars
+import time
+
+# Django imports
+from django.dispatch import Signal
+
+span_finished = Signal()
+"""Sent when a span is finished, providing its ``name`` and ``duration``."""
+
+_collection = contextvars.ContextVar("penthouse_timing", default=None)
+
+
+class _NullSpan:
+    """A span that does nothing, used while timing is disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """Measure the time of a ``with`` block and add it to the collection."""
+
+    def __init__(self, name, collection):
+        self.name = name
+        self.collection = collection
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record(self.name, time.perf_counter() - self.start, self.collection)
+        return False
+
+
+def is_enabled():
+    """Return ``True`` if spans are currently collected."""
+    return _collection.get() is not None
+
+
+def span(name):
+    """Provide a context manager measuring a span of the given name."""
+    collection = _collection.get()
+    if collection is None:
+        return _NULL_SPAN
+
+    return _Span(name, collection)
+
+
+def record(name, duration, collection=None):
+    """Add the ``duration`` (in seconds) of a span to the current collection.
+
+    This is meant for stages, that are measured manually, e.g. the
+    accumulated time of a single step within a loop. Durations of the same
+    name are summed up.
+    """
+    collection = collection if collection is not None else _collection.get()
+    if collection is None:
+        return
+
+    collection[name] = collection.get(name, 0) + duration
+    span_finished.send(sender=None, name=name, duration=duration)
+
+
+def start():
+    """Start the collection of spans, returning a token for :func:`stop`."""
+    return _collection.set({})
+
+
+def stop(token):
+    """Stop the collection of spans and return the spans, that were recorded.
+
+    The result is a ``dict`` with the names of the spans and their
+    durations in seconds, ordered by their first occurrence.
+    """
+    collection = _collection.get()
+    _collection.reset(token)
+
+    return collection
+
+
+def format_server_timing(spans):
+    """Format the spans as value of a ``Server-Timing`` header."""
+    return ", ".join(
+        "{};dur={:.3f}".format(name, duration * 1000)
+        for name, duration in spans.items()
+    )
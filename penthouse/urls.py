@@ -8,15 +8,33 @@
 from django.urls import path
 
 # app imports
-from penthouse.views import profile, tracker
+from penthouse.views import leaderboard, monitoring, profile, tracker, trends
 
 app_name = "penthouse"
 
 urlpatterns = [
+    path("leaderboard/", leaderboard.leaderboard, name="leaderboard"),
+    path("metrics/", monitoring.metrics, name="metrics"),
     path("profile/delete/", profile.ProfileDeleteView.as_view(), name="profile-delete"),
     path("profile/update/", profile.ProfileUpdateView.as_view(), name="profile-update"),
     path("tracker/", tracker.tracker_overview, name="tracker-overview"),
     path("tracker/run/add/", tracker.RunCreateView.as_view(), name="tracker-run-add"),
+    path("tracker/run/bulk/", tracker.RunBulkView.as_view(), name="tracker-run-bulk"),
+    path(
+        "tracker/run/export/<str:file_format>/",
+        tracker.run_export,
+        name="tracker-run-export",
+    ),
+    path(
+        "tracker/run/import/",
+        tracker.RunImportView.as_view(),
+        name="tracker-run-import",
+    ),
+    path(
+        "tracker/run/paste/",
+        tracker.RunPasteView.as_view(),
+        name="tracker-run-paste",
+    ),
     path(
         "tracker/run/<int:run_id>/delete/",
         tracker.RunDeleteView.as_view(),
@@ -27,4 +45,11 @@ urlpatterns = [
         tracker.RunUpdateView.as_view(),
         name="tracker-run-update",
     ),
+    path("tracker/trends/", trends.trends, name="tracker-trends"),
+    path("tracker/trends/data/", trends.trends_data, name="tracker-trends-data"),
+    path(
+        "tracker/quantiles/data/",
+        trends.quantiles_data,
+        name="tracker-quantiles-data",
+    ),
 ]
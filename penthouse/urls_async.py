@@ -0,0 +1,40 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""App-specific URL configuration using the async views, where available.
+
+This provides the same URLs (and URL names) as :mod:`penthouse.urls`, but the
+run tracker's overview and the views to add, update and delete runs are
+replaced by their async variants, see :mod:`penthouse.views.async_tracker`.
+It is meant to be included instead of :mod:`penthouse.urls`, if the project
+is served by an ASGI server::
+
+    path("", include("penthouse.urls_async")),
+"""
+
+# Django imports
+from django.urls import path
+
+# app imports
+from penthouse import urls
+from penthouse.views import async_tracker
+
+app_name = urls.app_name
+
+ASYNC_VIEWS = {
+    "tracker-overview": async_tracker.tracker_overview,
+    "tracker-run-add": async_tracker.run_create,
+    "tracker-run-delete": async_tracker.run_delete,
+    "tracker-run-update": async_tracker.run_update,
+}
+"""The async views by the names of the URLs they replace."""
+
+urlpatterns = [
+    (
+        path(str(pattern.pattern), ASYNC_VIEWS[pattern.name], name=pattern.name)
+        if pattern.name in ASYNC_VIEWS
+        else pattern
+    )
+    for pattern in urls.urlpatterns
+]
@@ -1,7 +1,15 @@
 """App-specific utility functions."""
 
+# Python imports
+import datetime
+import re
+
+# Django imports
+from django.conf import settings
+from django.utils import timezone
+
 # app imports
-from penthouse.game_constants import TowerUnits
+from penthouse.game_numbers import split_number
 
 
 def seconds_to_hms(value):
@@ -14,12 +22,51 @@ def seconds_to_hms(value):
     return h, m, s
 
 
+_DURATION_RE = re.compile(
+    r"^(?:(?P<h>\d+)\s*h)?\s*(?:(?P<m>\d+)\s*m(?:in)?)?\s*(?:(?P<s>\d+)\s*s)?$"
+)
+
+
+def parse_duration(value):
+    """Parse a textual duration into dedicated hour, minute and second components.
+
+    Accepted formats are plain seconds (``"3723"``), ``"1:02:03"`` /
+    ``"02:03"`` and the game's notation ``"1h 2m 3s"``. The components are
+    returned as provided, they are not normalized.
+
+    Raises ``ValueError`` if ``value`` is not a valid duration.
+    """
+    value = value.strip()
+
+    if value.isdigit():
+        return seconds_to_hms(int(value))
+
+    if ":" in value:
+        components = value.split(":")
+        if len(components) in (2, 3) and all(c.isdigit() for c in components):
+            components = [int(c) for c in components]
+            return tuple([0] * (3 - len(components)) + components)
+
+    match = _DURATION_RE.match(value)
+    if value and match is not None:
+        return tuple(int(match.group(c) or 0) for c in ("h", "m", "s"))
+
+    raise ValueError("'{}' is not a valid duration".format(value))
+
+
+def start_of_day(date):
+    """Return the first moment of ``date`` in the current time zone."""
+    value = datetime.datetime.combine(date, datetime.time.min)
+    if settings.USE_TZ:
+        return timezone.make_aware(value)
+    return value
+
+
 def get_number_prefix(value):
-    """Provide a short notation for big numbers."""
-    for prefix, mult in TowerUnits.get_multiplier_prefix().items():
-        # print("{}-{}".format(prefix, mult))
-        numerical = value / (10**mult)
-        if numerical >= 1:
-            return numerical, prefix
-
-    return value, ""
+    """Provide a short notation for big numbers.
+
+    Notes
+    -----
+    See :func:`penthouse.game_numbers.split_number`.
+    """
+    return split_number(value)
@@ -0,0 +1,192 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Vectorized evaluation of runs with NumPy.
+
+NumPy is an optional dependency. If it is not installed,
+:func:`is_available` returns ``False`` and the callers fall back to the pure
+Python implementation of :mod:`penthouse.views.tracker`.
+
+The results are identical to the pure Python implementation: rates are
+computed with the same floating point operations and truncated, averages are
+calculated on integers and rounded half to even. Values, that do not fit
+into 64 bit integers, can not be evaluated exactly, so ``None`` is returned
+and the caller has to fall back to the pure Python implementation.
+"""
+
+try:
+    # external imports
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+_INT64_MAX = 2**63 - 1
+
+# The quotient of two integers is exact as a float, as long as it is small
+# enough to distinguish all fractions of the maximum end wave (32767).
+_EXACT_QUOTIENT_LIMIT = 2**37
+
+
+def is_available():
+    """Return ``True`` if NumPy is installed."""
+    return np is not None
+
+
+def _per_hour(values, hours):
+    """Vectorized ``int(value / (duration / 3600))``, ``None`` on overflow."""
+    result = np.trunc(values.astype(np.float64) / hours)
+    if result.size and result.max() > _INT64_MAX:
+        return None
+
+    return result.astype(np.int64)
+
+
+def _per_wave(values, waves):
+    """Vectorized ``int(value / waves)`` as calculated by Python.
+
+    Python divides integers exactly and rounds the quotient to the nearest
+    float, so really big quotients are calculated by Python.
+    """
+    result = values // waves
+    for index in np.flatnonzero(result >= _EXACT_QUOTIENT_LIMIT):
+        result[index] = int(int(values[index]) / int(waves[index]))
+
+    return result
+
+
+def _rolling_means(values, size):
+    """Calculate the rounded means of all windows of ``size`` values.
+
+    The sums are calculated from the cumulative sum. Overflows of the
+    cumulative sum cancel out, as long as the sums of the windows fit into
+    64 bit integers, which has to be ensured by the caller. The means are
+    rounded half to even; positions with less than ``size`` preceding values
+    (including the value itself) are ``0``.
+    """
+    cumulative = np.concatenate(([0], np.cumsum(values, dtype=np.int64)))
+    sums = cumulative[size:] - cumulative[:-size]
+
+    quotients, remainders = np.divmod(sums, size)
+    quotients += (2 * remainders > size) | (
+        (2 * remainders == size) & (quotients % 2 == 1)
+    )
+
+    first = size - 1
+    means = np.zeros(len(values), dtype=np.int64)
+    means[first:] = quotients
+    return means
+
+
+def evaluate(columns, windows, maxima=None, offset=0):
+    """Evaluate the runs, provided as columns.
+
+    ``columns`` is a ``dict`` with the lists of ``waves``, ``duration``,
+    ``coins`` and ``cells``, ordered by date. The first ``offset`` runs only
+    precede the evaluated runs to fill the rolling windows; ``maxima`` are
+    the maximum values of all preceding runs to determine the personal bests
+    (see :func:`penthouse.views.tracker.get_seed`).
+
+    Returns a ``dict`` with the lists of the derived values, the personal
+    best flags (``pb_<metric>``) and the averages (``<metric>_avg<size>``)
+    of the evaluated runs, or ``None`` if the values are too big.
+    """
+    maxima = maxima or {}
+
+    try:
+        waves = np.asarray(columns["waves"], dtype=np.int64)
+        duration = np.asarray(columns["duration"], dtype=np.int64)
+        metrics = {
+            "coins": np.asarray(columns["coins"], dtype=np.int64),
+            "cells": np.asarray(columns["cells"], dtype=np.int64),
+        }
+    except OverflowError:
+        return None
+
+    hours = duration / 3600
+    for subject in ("coins", "cells"):
+        metrics["{}_hour".format(subject)] = _per_hour(metrics[subject], hours)
+        if metrics["{}_hour".format(subject)] is None:
+            return None
+
+    results = {
+        "coins_hour": metrics["coins_hour"][offset:],
+        "coins_wave": _per_wave(metrics["coins"][offset:], waves[offset:]),
+        "cells_hour": metrics["cells_hour"][offset:],
+        "cells_wave": _per_wave(metrics["cells"][offset:], waves[offset:]),
+    }
+
+    for metric, values in metrics.items():
+        # the personal bests only consider the evaluated runs, the preceding
+        # runs are represented by their maximum
+        evaluated = values[offset:]
+        initial = maxima.get(metric, None)
+        previous = np.maximum.accumulate(
+            np.concatenate(([-1 if initial is None else initial], evaluated[:-1]))
+        )
+        results["pb_{}".format(metric)] = evaluated > previous[: len(evaluated)]
+
+        for size in windows:
+            if values.size and int(values.max()) * size > _INT64_MAX:
+                return None
+            results["{}_avg{}".format(metric, size)] = _rolling_means(values, size)[
+                offset:
+            ]
+
+    return {key: value.tolist() for key, value in results.items()}
+
+
+TIER_SUBJECTS = ("waves", "coins", "coins_hour", "cells", "cells_hour")
+"""The attributes of runs, that are reduced per tier."""
+
+
+def get_tier_results(entries_by_tier):
+    """Calculate the minimum, rounded mean and maximum of the runs per tier.
+
+    ``entries_by_tier`` maps the tiers to sequences of ``RunData``
+    instances. Returns a ``dict`` with the results of every tier, just like
+    :meth:`penthouse.views.tracker.TierData.get_results`, but unordered, or
+    ``None`` if the values are too big.
+    """
+    tiers = [tier for tier, entries in entries_by_tier.items() if entries]
+    counts = np.array([len(entries_by_tier[tier]) for tier in tiers], dtype=np.int64)
+    if not counts.size:
+        return {}
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    reduced = {}
+    for subject in TIER_SUBJECTS:
+        try:
+            values = np.array(
+                [
+                    getattr(entry, subject)
+                    for tier in tiers
+                    for entry in entries_by_tier[tier]
+                ],
+                dtype=np.int64,
+            )
+        except OverflowError:
+            return None
+        if int(values.max()) * int(counts.max()) > _INT64_MAX:
+            return None
+
+        quotients, remainders = np.divmod(np.add.reduceat(values, starts), counts)
+        quotients += (2 * remainders > counts) | (
+            (2 * remainders == counts) & (quotients % 2 == 1)
+        )
+        reduced[subject] = (
+            np.minimum.reduceat(values, starts).tolist(),
+            quotients.tolist(),
+            np.maximum.reduceat(values, starts).tolist(),
+        )
+
+    results = {}
+    for index, tier in enumerate(tiers):
+        results[tier] = {}
+        for subject in TIER_SUBJECTS:
+            minima, means, maxima = reduced[subject]
+            results[tier]["{}_min".format(subject)] = minima[index]
+            results[tier]["{}_avg".format(subject)] = means[index]
+            results[tier]["{}_max".format(subject)] = maxima[index]
+
+    return results
@@ -0,0 +1,246 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Native async variants of the run tracker's views.
+
+The views provide the same responses as their sync counterparts in
+:mod:`penthouse.views.tracker`, but fetch their data with Django's async ORM,
+so a request waiting for the database does not occupy a thread. The
+CPU-bound parts, the evaluation of the runs and the rendering of the
+templates, are run in the bounded thread pool of :mod:`penthouse.executor`.
+The app's templates do not access the database, so they may be rendered
+there as well.
+
+The views are used with the URL configuration :mod:`penthouse.urls_async`,
+when the project is served by an ASGI server. The cached overviews are shared
+with the sync views, see :mod:`penthouse.cache`.
+"""
+
+# Django imports
+from django.contrib.auth.decorators import login_required
+from django.http import HttpResponseNotAllowed
+from django.shortcuts import aget_object_or_404, redirect, render
+
+# external imports
+from asgiref.sync import sync_to_async
+
+# app imports
+from penthouse.cache import aget_or_compute
+from penthouse.conf import get_setting
+from penthouse.executor import run_in_executor
+from penthouse.forms.bulk import RunBulkForm
+from penthouse.forms.filters import RunFilterForm
+from penthouse.middleware import aget_profile
+from penthouse.models.personal_best import PersonalBest
+from penthouse.models.sketch import RunSketch
+from penthouse.models.tracker import Run, RunForm
+from penthouse.pagination import KeysetPaginator, decode_cursor
+from penthouse.timing import span
+from penthouse.views.tracker import (
+    RUN_FIELDS,
+    apply_notes,
+    build_overview,
+    build_seed,
+    convert_personal_bests,
+    evaluate_rows_database,
+    evaluate_rows_numpy,
+    evaluate_rows_python,
+    evaluate_runs_database,
+    evaluate_runs_numpy,
+    evaluate_tiers,
+    get_evaluated_queryset,
+    get_notes_queryset,
+    get_overview_variant,
+    get_seed_queries,
+    get_tier_queryset,
+    get_tracker_engine,
+    restrict_runs,
+)
+
+
+async def aget_seed(runs, start, windows):
+    """Async variant of :func:`~penthouse.views.tracker.get_seed`."""
+    preceding, aggregates, rows = get_seed_queries(runs, start, windows)
+
+    return build_seed(
+        await preceding.aaggregate(**aggregates), [row async for row in rows]
+    )
+
+
+async def aevaluate_runs(runs, windows, start=None, end=None):
+    """Evaluate the runs with the configured engine.
+
+    The rows are fetched asynchronously and evaluated in the executor, see
+    :mod:`penthouse.executor`. The results are the same as the results of
+    :func:`~penthouse.views.tracker.get_tracker_engine`'s implementation.
+    """
+    engine = get_tracker_engine()
+    seed = await aget_seed(runs, start, windows) if start is not None else None
+
+    if engine is evaluate_runs_database:
+        rows = [
+            row
+            async for row in get_evaluated_queryset(
+                runs, windows, start, end, seed=seed
+            )
+        ]
+        return await run_in_executor(
+            evaluate_rows_database, rows, windows, start=start, seed=seed
+        )
+
+    rows = [
+        row
+        async for row in restrict_runs(runs, start, end)
+        .order_by("date", "id")
+        .values_list(*RUN_FIELDS)
+    ]
+    if engine is evaluate_runs_numpy:
+        return await run_in_executor(evaluate_rows_numpy, rows, windows, seed=seed)
+    return await run_in_executor(evaluate_rows_python, rows, windows, seed=seed)
+
+
+async def aload_notes(entries):
+    """Async variant of :func:`~penthouse.views.tracker.load_notes`."""
+    apply_notes(entries, {pk: notes async for pk, notes in get_notes_queryset(entries)})
+
+
+async def aget_overview(profile, runs, before=None, after=None, filtered=False):
+    """Async variant of :func:`~penthouse.views.tracker.get_overview`."""
+    windows = profile.get_avg_windows()
+
+    with span("tier-data"):
+        rows = [row async for row in get_tier_queryset(runs)]
+    with span("tier-results"):
+        tier_results = await run_in_executor(evaluate_tiers, rows)
+
+    with span("pagination"):
+        paginator = KeysetPaginator(runs, get_setting("TRACKER_PAGE_SIZE"))
+        page = await paginator.aget_page(before=before, after=after)
+        if not page:
+            page = await paginator.aget_page()
+    with span("evaluation"):
+        if page:
+            page_runs = await aevaluate_runs(
+                runs, windows, start=page.start, end=page.end
+            )
+            await aload_notes(page_runs)
+        else:
+            page_runs = []
+
+    with span("personal-bests"):
+        if filtered:
+            best_runs = await runs.aget_best_runs()
+        else:
+            best_runs = await PersonalBest.objects.aget_best_runs(profile)
+        personal_bests = convert_personal_bests(best_runs)
+
+    with span("quantiles"):
+        tier_quantiles = (
+            None if filtered else await RunSketch.objects.aget_quantiles(profile)
+        )
+
+    return build_overview(
+        profile, tier_results, page, page_runs, personal_bests, tier_quantiles
+    )
+
+
+async def arender(request, template_name, context):
+    """Render a template in the executor, see :mod:`penthouse.executor`."""
+    with span("render"):
+        return await run_in_executor(render, request, template_name, context)
+
+
+@login_required
+async def tracker_overview(request):
+    """Async variant of :func:`~penthouse.views.tracker.tracker_overview`."""
+    profile = await aget_profile(request)
+    filter_form = RunFilterForm(request.GET)
+    filtered = filter_form.is_filtered()
+    filter_query = filter_form.get_query()
+    runs_raw = filter_form.filter_runs(Run.objects.filter_by_profile(profile.pk))
+
+    before = request.GET.get("before", "")
+    after = request.GET.get("after", "")
+
+    with span("overview"):
+        context = await aget_or_compute(
+            "tracker-overview",
+            profile.pk,
+            get_overview_variant(filter_query, before, after),
+            lambda: aget_overview(
+                profile,
+                runs_raw,
+                before=decode_cursor(before),
+                after=decode_cursor(after),
+                filtered=filtered,
+            ),
+        )
+    context["profile"] = profile
+    context["filter_form"] = filter_form
+    context["filter_query"] = filter_query
+    context["bulk_form"] = RunBulkForm(profile.pk)
+
+    return await arender(request, "penthouse/tracker_overview.html", context)
+
+
+async def _aget_run(request, run_id):
+    """Return a run of the user's profile or raise ``Http404``."""
+    profile = await aget_profile(request)
+
+    return await aget_object_or_404(
+        Run.objects.filter_by_profile(profile.pk), pk=run_id
+    )
+
+
+@login_required
+async def run_create(request):
+    """Async variant of :class:`~penthouse.views.tracker.RunCreateView`."""
+    profile = await aget_profile(request)
+    form = RunForm(request.POST if request.method == "POST" else None)
+
+    # the validation of the model's constraints may query the database
+    if request.method == "POST" and await sync_to_async(form.is_valid)():
+        form.instance.profile = profile
+        await form.instance.asave()
+        return redirect("penthouse:tracker-overview")
+
+    return await arender(
+        request, "penthouse/run_create.html", {"form": form, "profile_id": profile.pk}
+    )
+
+
+@login_required
+async def run_update(request, run_id):
+    """Async variant of :class:`~penthouse.views.tracker.RunUpdateView`."""
+    run = await _aget_run(request, run_id)
+    form = RunForm(request.POST if request.method == "POST" else None, instance=run)
+
+    if request.method == "POST" and await sync_to_async(form.is_valid)():
+        await form.instance.asave()
+        return redirect("penthouse:tracker-overview")
+
+    return await arender(
+        request,
+        "penthouse/run_update.html",
+        {"form": form, "object": run, "run": run, "profile_id": run.profile_id},
+    )
+
+
+@login_required
+async def run_delete(request, run_id):
+    """Async variant of :class:`~penthouse.views.tracker.RunDeleteView`."""
+    if request.method not in ("GET", "POST"):
+        return HttpResponseNotAllowed(["GET", "POST"])
+
+    run = await _aget_run(request, run_id)
+
+    if request.method == "POST":
+        await run.adelete()
+        return redirect("penthouse:tracker-overview")
+
+    return await arender(
+        request,
+        "penthouse/run_confirm_delete.html",
+        {"object": run, "run_item": run, "profile_id": run.profile_id},
+    )
@@ -0,0 +1,79 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Views providing the leaderboards across all profiles.
+
+The leaderboards are the persisted personal bests of all profiles (see
+:class:`~penthouse.models.personal_best.PersonalBest`), which are updated
+incrementally on every write of a run. A page of a leaderboard and the rank
+of the user's profile are read from an index, instead of aggregating the
+runs of all profiles.
+"""
+
+# Django imports
+from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
+from django.shortcuts import render
+
+# app imports
+from penthouse.conf import get_setting
+from penthouse.forms.filters import LeaderboardForm
+from penthouse.middleware import get_profile_id
+from penthouse.models.personal_best import PersonalBest
+from penthouse.timing import span
+
+
+def rank_entries(entries, tier, metric, start_index):
+    """Set the ``rank`` of the personal bests of one page of a leaderboard.
+
+    ``start_index`` is the (1-based) position of the first entry. Entries
+    with the same value share their rank, so the rank of the first entry is
+    queried; the following ranks are derived from the positions.
+    """
+    rank = None
+    previous = None
+    for position, entry in enumerate(entries, start=start_index):
+        if rank is None:
+            rank = PersonalBest.objects.count_better(tier, metric, entry.value) + 1
+        elif entry.value != previous:
+            rank = position
+        entry.rank = rank
+        previous = entry.value
+
+    return entries
+
+
+@login_required
+def leaderboard(request):
+    """Show the personal bests of all profiles for one tier and metric."""
+    form = LeaderboardForm(request.GET)
+    tier = form.get_tier()
+    metric = form.get_metric()
+    per_page = get_setting("LEADERBOARD_PAGE_SIZE")
+
+    with span("leaderboard"):
+        paginator = Paginator(
+            PersonalBest.objects.get_leaderboard(tier, metric)
+            .select_related("profile__owner", "run")
+            .defer("run__notes"),
+            per_page,
+        )
+        page = paginator.get_page(request.GET.get("page", None))
+        entries = rank_entries(list(page), tier, metric, page.start_index())
+
+        rank = PersonalBest.objects.get_rank(get_profile_id(request), tier, metric)
+
+    return render(
+        request,
+        "penthouse/leaderboard.html",
+        {
+            "form": form,
+            "query": form.get_query(),
+            "page": page,
+            "entries": entries,
+            "metric": metric,
+            "rank": rank,
+            "rank_page": None if rank is None else (rank - 1) // per_page + 1,
+        },
+    )
@@ -10,20 +10,21 @@ from django.http import Http404
 from django.utils.translation import gettext_lazy as _
 
 # app imports
-from penthouse.models.profile import Profile
+from penthouse.middleware import get_profile_id
 
 
 class ProfileIDMixin:
     """Injects the current user's profile ID into the context.
 
     This mixin can only be used on views that also use the
-    ``LoginRequiredMixin``.
+    ``LoginRequiredMixin``. The profile is resolved once per request, see
+    :mod:`penthouse.middleware`.
     """
 
     def get_context_data(self, **kwargs):  # noqa: D102
         context = super().get_context_data(**kwargs)
 
-        context["profile_id"] = Profile.objects.get(owner=self.request.user).id
+        context["profile_id"] = get_profile_id(self.request)
 
         return context
 
@@ -32,7 +33,8 @@ class RestrictToUserMixin:
     """Limits the resulting queryset to objects, that belong to the current user.
 
     This mixin overwrites the view's ``get_queryset()`` method and automatically
-    uses the model's app-specific ``ModelManager``.
+    uses the model's app-specific ``ModelManager``. The objects are filtered by
+    the ID of the user's profile, see :mod:`penthouse.middleware`.
     """
 
     def get_queryset(self):  # noqa: D102
@@ -41,7 +43,7 @@ class RestrictToUserMixin:
                 "{} is missing the 'model' attribute".format(self.__class__.__name__)
             )
 
-        return self.model.objects.filter_by_user(user=self.request.user)
+        return self.model.objects.filter_by_profile(get_profile_id(self.request))
 
     def get_object(self, queryset=None):
         """Return the object to work on.
@@ -0,0 +1,43 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Views to monitor the app."""
+
+# Python imports
+import hmac
+
+# Django imports
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
+
+# app imports
+from penthouse.conf import get_setting
+from penthouse.metrics import view_metrics
+
+
+def _has_metrics_access(request):
+    """Check for a staff user or the configured token."""
+    if request.user.is_authenticated and request.user.is_staff:
+        return True
+
+    token = get_setting("METRICS_TOKEN")
+    authorization = request.headers.get("Authorization", "")
+    return token is not None and hmac.compare_digest(
+        authorization, "Bearer {}".format(token)
+    )
+
+
+def metrics(request):
+    """Provide the metrics of the app's views in the text format of Prometheus.
+
+    The endpoint is accessible for staff users or with the token specified by
+    ``PENTHOUSE_METRICS_TOKEN``.
+    """
+    if not _has_metrics_access(request):
+        raise PermissionDenied
+
+    return HttpResponse(
+        view_metrics.render_prometheus(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
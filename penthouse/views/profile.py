@@ -6,10 +6,13 @@
 
 # Django imports
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import HttpResponseRedirect
 from django.urls import reverse_lazy
 from django.views import generic
 
 # app imports
+from penthouse.bulk import delete_profile
+from penthouse.middleware import forget_profile
 from penthouse.models.profile import Profile, ProfileForm
 from penthouse.views.mixins import ProfileIDMixin, RestrictToUserMixin
 
@@ -25,6 +28,18 @@ class ProfileDeleteView(
 
     success_url = reverse_lazy("penthouse:profile-update")
 
+    def form_valid(self, form):
+        """Delete the profile with all of its runs at once.
+
+        See :func:`penthouse.bulk.delete_profile`.
+        """
+        success_url = self.get_success_url()
+        delete_profile(self.object)
+
+        forget_profile(self.request)
+
+        return HttpResponseRedirect(success_url)
+
 
 class ProfileUpdateView(
     LoginRequiredMixin, RestrictToUserMixin, ProfileIDMixin, generic.UpdateView
@@ -5,20 +5,47 @@
 """Views related to the run tracker functions."""
 
 # Python imports
-import re
+import io
+import time
 from collections import defaultdict, deque
+from operator import itemgetter
 from statistics import mean
 
 # Django imports
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Max
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import render
 from django.urls import reverse_lazy
 from django.views import generic
 
 # app imports
-from penthouse.models.profile import Profile
-from penthouse.models.tracker import Run, RunForm
+from penthouse.bulk import RunBulkEditor
+from penthouse.cache import get_or_compute
+from penthouse.conf import get_setting
+from penthouse.exporter import CONTENT_TYPES, export_runs
+from penthouse.forms.bulk import RunBulkAction, RunBulkForm
+from penthouse.forms.filters import RunFilterForm
+from penthouse.forms.transfer import RunImportForm, RunPasteForm
+from penthouse.game_constants import TowerTiers
+from penthouse.importer import FORMAT_REPORT, RunImporter
+from penthouse.middleware import get_profile, get_profile_id
+from penthouse.models.personal_best import PersonalBest
+from penthouse.models.sketch import RunSketch
+from penthouse.models.tracker import Run, RunForm, RunMetric, get_metric_expression
+from penthouse.pagination import KeysetPaginator, decode_cursor, keyset_filter
+from penthouse.timing import (
+    is_enabled as is_timing_enabled,
+    record as record_timing,
+    span,
+)
+from penthouse.vectorized import (
+    evaluate as evaluate_vectorized,
+    get_tier_results,
+    is_available as is_vectorized_available,
+)
 from penthouse.views.mixins import ProfileIDMixin, RestrictToUserMixin
 
 
@@ -27,20 +54,48 @@ def _get_deque5():
     return deque(maxlen=5)
 
 
-def natural_sort_key(s, _nsre=re.compile(r"(\d+)")):
-    """Provide natural sorting of strings.
+RUN_FIELDS = ("id", "date", "tier", "waves", "duration", "coins", "cells")
+"""The fields of ``Run``, that are required to create ``RunData`` instances.
 
-    E.g. ["T12", "T1"] will sort to ["T1", "T12"].
+The notes are not required for the evaluation and may be long, so they are
+only fetched for the runs, that are actually displayed, see :func:`load_notes`.
+"""
 
-    See https://stackoverflow.com/a/16090640
-    """
-    return [int(text) if text.isdigit() else text.lower for text in _nsre.split(s)]
+
+class RunAverages:
+    """The rolling averages of a single window for one run."""
+
+    __slots__ = ("window", "coins", "coins_hour", "cells", "cells_hour")
+
+    def __init__(self, window, coins=0, coins_hour=0, cells=0, cells_hour=0):
+        self.window = window
+        self.coins = coins
+        self.coins_hour = coins_hour
+        self.cells = cells
+        self.cells_hour = cells_hour
 
 
 class RunData:
-    """A temporary data class to apply additional evaluation to ``Run`` instances."""
+    """A temporary data class to apply additional evaluation to ``Run`` instances.
 
-    def __init__(self, id, date, tier, waves, duration, coins, cells, notes):
+    Instances are created for every evaluated run, so the attributes are
+    declared as ``__slots__`` to keep them small.
+    """
+
+    __slots__ = RUN_FIELDS + (
+        "notes",
+        "coins_hour",
+        "coins_wave",
+        "cells_hour",
+        "cells_wave",
+        "pb_coins",
+        "pb_cells",
+        "pb_coins_hour",
+        "pb_cells_hour",
+        "averages",
+    )
+
+    def __init__(self, id, date, tier, waves, duration, coins, cells, notes=""):
         self.id = id
         self.date = date
         self.tier = tier
@@ -60,23 +115,120 @@ class RunData:
         self.pb_coins_hour = False
         self.pb_cells_hour = False
 
-        self.coins_avg5 = 0
-        self.coins_hour_avg5 = 0
-        self.cells_avg5 = 0
-        self.cells_hour_avg5 = 0
+        self.averages = []
+
+    @classmethod
+    def from_evaluated(cls, row, windows):
+        """Create an instance from a run evaluated by the database.
+
+        ``row`` is a ``dict`` as provided by
+        :meth:`RunQuerySet.with_evaluation() <penthouse.models.tracker.RunQuerySet.with_evaluation>`
+        and ``values()``, so the derived values are not calculated again.
+        """
+        item = cls.__new__(cls)
+
+        for field in RUN_FIELDS:
+            setattr(item, field, row[field])
+        item.notes = row.get("notes", "")
+        for field in ("coins_hour", "coins_wave", "cells_hour", "cells_wave"):
+            setattr(item, field, int(row[field]))
+        for metric in RunMetric.values:
+            setattr(item, "pb_{}".format(metric), bool(row["pb_{}".format(metric)]))
+
+        item.averages = []
+        for size in windows:
+            averages = RunAverages(size)
+            if row["run_number"] >= size:
+                for subject in TrackerList.avg_subjects:
+                    setattr(
+                        averages,
+                        subject,
+                        round(row["{}_avg{}".format(subject, size)]),
+                    )
+            item.averages.append(averages)
+
+        return item
+
+
+class RollingWindow:
+    """Keep track of the sum of the last ``size`` values.
+
+    The sum is updated whenever a value is pushed, by subtracting the value
+    that drops out of the window. Thus, pushing a value and getting the
+    average are both constant in time, independent of the window's size.
+    """
+
+    def __init__(self, size):
+        self.size = size
+
+        self._values = deque(maxlen=size)
+        self._sum = 0
+
+    def push(self, value):
+        """Add a value to the window, discarding the oldest one if required."""
+        if len(self._values) == self.size:
+            self._sum -= self._values[0]
+
+        self._values.append(value)
+        self._sum += value
+
+    def is_full(self):
+        """Return ``True`` if the window contains ``size`` values."""
+        return len(self._values) == self.size
+
+    def mean(self):
+        """Return the rounded average of the window's values.
+
+        The average is rounded half to even, just like :func:`round`, but
+        is calculated on integers only to stay exact for really big numbers.
+        """
+        count = len(self._values)
+        quotient, remainder = divmod(self._sum, count)
+        if remainder * 2 > count or (remainder * 2 == count and quotient % 2):
+            quotient += 1
+
+        return quotient
 
 
 class TrackerList:
     """A temporary data class to generate the overall overview."""
 
-    def __init__(self):
+    avg_subjects = ("coins", "coins_hour", "cells", "cells_hour")
+    """The attributes of ``RunData`` to calculate rolling averages for."""
+
+    def __init__(self, windows=(5,)):
         self.pb_coins = None
         self.pb_cells = None
         self.pb_coins_hour = None
         self.pb_cells_hour = None
 
+        self.windows = tuple(sorted(set(windows)))
+        self._windows = {
+            subject: [RollingWindow(size) for size in self.windows]
+            for subject in self.avg_subjects
+        }
+        self._maxima = {}
+
         self._entries = deque()
 
+    def seed(self, entries, maxima):
+        """Prepare the evaluation to continue after previous runs.
+
+        ``entries`` are the ``RunData`` instances directly preceding the first
+        entry to be added (at most the size of the largest window minus one)
+        and are only used to fill the rolling windows. ``maxima`` provides the
+        maximum value of all previous runs for the subjects of
+        :meth:`process_pb`.
+        """
+        for entry in entries:
+            for subject in self.avg_subjects:
+                for window in self._windows[subject]:
+                    window.push(getattr(entry, subject))
+
+        self._maxima.update(
+            {subject: value for subject, value in maxima.items() if value is not None}
+        )
+
     def add(self, entry):
         """Add an entry to the class."""
         if entry is None:
@@ -87,30 +239,33 @@ class TrackerList:
         item = self.process_pb(item, "coins_hour", "pb_coins_hour")
         item = self.process_pb(item, "cells_hour", "pb_cells_hour")
 
-        runs = len(self._entries)
-        if runs > 3:
-            item = self.process_avg5(item, "coins", "coins_avg5")
-            item = self.process_avg5(item, "cells", "cells_avg5")
-            item = self.process_avg5(item, "coins_hour", "coins_hour_avg5")
-            item = self.process_avg5(item, "cells_hour", "cells_hour_avg5")
+        item = self.process_avg(item)
 
         self._entries.append(item)
 
-    def process_avg5(self, item, subject="foo", avg5_field="bar"):
-        """Calculate the average of the last 5 runs and add them to the item."""
-        tmp = [getattr(x, subject) for x in list(self._entries)[-4:]]
-        tmp.append(getattr(item, subject))
-        setattr(item, avg5_field, round(mean(tmp)))
+    def process_avg(self, item):
+        """Calculate the rolling averages of all windows and add them to the item.
+
+        ``item.averages`` is populated with one :class:`RunAverages` per
+        window, ordered by window size. The averages of a window are ``0``
+        until the window has seen enough runs.
+        """
+        item.averages = [RunAverages(size) for size in self.windows]
+
+        for subject in self.avg_subjects:
+            value = getattr(item, subject)
+            for window, averages in zip(self._windows[subject], item.averages):
+                window.push(value)
+                if window.is_full():
+                    setattr(averages, subject, window.mean())
 
         return item
 
     def process_pb(self, item, subject="foo", pb_field="bar"):
         """Check if the run has a personal best and stores it."""
-        try:
-            if getattr(item, subject) > getattr(getattr(self, pb_field), subject):
-                setattr(self, pb_field, item)
-                setattr(item, pb_field, True)
-        except AttributeError:
+        value = getattr(item, subject)
+        if subject not in self._maxima or value > self._maxima[subject]:
+            self._maxima[subject] = value
             setattr(self, pb_field, item)
             setattr(item, pb_field, True)
 
@@ -162,22 +317,37 @@ class TierData:
             results[k]["cells_hour_max"] = max(tmp)
 
         return {
-            key: results[key] for key in sorted(results.keys(), key=natural_sort_key)
+            key: results[key]
+            for key in sorted(results.keys(), key=TowerTiers.get_ordinal)
         }
 
+    def get_results_vectorized(self):
+        """Evaluate the results with NumPy, see :mod:`penthouse.vectorized`.
 
-@login_required
-def tracker_overview(request):
-    """Provide an overview over all runs."""
-    runs_raw = (
-        Run.objects.filter_by_user(user=request.user)
-        .select_related("profile")
-        .order_by("date")
-    )
+        Falls back to :meth:`get_results`, if NumPy is not available or the
+        values are too big.
+        """
+        if not is_vectorized_available():
+            return self.get_results()
 
-    runs_by_tier = TierData()
-    tracker_list = TrackerList()
-    for run in runs_raw.iterator():
+        results = get_tier_results(self._entries)
+        if results is None:
+            return self.get_results()
+
+        return {
+            key: results[key]
+            for key in sorted(results.keys(), key=TowerTiers.get_ordinal)
+        }
+
+
+def convert_personal_bests(best_runs):
+    """Convert the runs holding personal bests to ``RunData`` instances.
+
+    ``best_runs`` is a ``dict`` as provided by
+    :meth:`PersonalBestManager.get_best_runs() <penthouse.models.personal_best.PersonalBestManager.get_best_runs>`.
+    """
+    results = {}
+    for metric, run in best_runs.items():
         item = RunData(
             run.id,
             run.date,
@@ -186,36 +356,576 @@ def tracker_overview(request):
             run.duration,
             run.coins,
             run.cells,
-            run.notes,
         )
-        runs_by_tier.add(item)
-        tracker_list.add(item)
-
-    runs_by_tier.get_results()
-
-    return render(
-        request,
-        "penthouse/tracker_overview.html",
-        {
-            "profile": run.profile,
-            "runs": tracker_list._entries,
-            "runs_by_tier": runs_by_tier.get_results(),
-            "pb_coins": tracker_list.pb_coins,
-            "pb_coins_hour": tracker_list.pb_coins_hour,
-            "pb_cells": tracker_list.pb_cells,
-            "pb_cells_hour": tracker_list.pb_cells_hour,
-            "threshold_top_coins": tracker_list.pb_coins.coins
-            * (run.profile.settings_tracker_threshold_top_coins / 100),
-            "threshold_top_coins_hour": tracker_list.pb_coins_hour.coins_hour
-            * (run.profile.settings_tracker_threshold_top_coins_hour / 100),
-            "threshold_top_cells": tracker_list.pb_cells.cells
-            * (run.profile.settings_tracker_threshold_top_cells / 100),
-            "threshold_top_cells_hour": tracker_list.pb_cells_hour.cells_hour
-            * (run.profile.settings_tracker_threshold_top_cells_hour / 100),
-        },
+        for pb_metric in RunMetric.values:
+            setattr(
+                item,
+                "pb_{}".format(pb_metric),
+                getattr(run, "is_pb_{}".format(pb_metric)),
+            )
+        results[metric] = item
+
+    return results
+
+
+def get_personal_bests(profile, runs=None):
+    """Provide the profile's global personal bests as ``RunData`` instances.
+
+    The runs are fetched with a single query from the persisted
+    :class:`~penthouse.models.personal_best.PersonalBest` instances, instead
+    of evaluating all runs of the profile. If ``runs`` is provided (a
+    filtered queryset of the profile's runs), the personal bests among these
+    runs are queried instead.
+    """
+    if runs is None:
+        return convert_personal_bests(PersonalBest.objects.get_best_runs(profile))
+
+    return convert_personal_bests(runs.get_best_runs())
+
+
+def get_notes_queryset(entries):
+    """Provide the query of the notes of the given ``RunData`` instances."""
+    return Run.objects.filter(pk__in=[entry.id for entry in entries]).values_list(
+        "id", "notes"
+    )
+
+
+def apply_notes(entries, notes):
+    """Set the notes of the ``RunData`` instances from a ``dict`` of their IDs."""
+    for entry in entries:
+        entry.notes = notes.get(entry.id, "")
+
+
+def load_notes(entries):
+    """Load the notes of the given ``RunData`` instances with a single query."""
+    apply_notes(entries, dict(get_notes_queryset(entries)))
+
+
+def get_seed_queries(runs, start, windows):
+    """Provide the queries of :func:`get_seed`.
+
+    The result is a tuple of the preceding runs, the aggregates of their
+    maxima (to be passed to ``aggregate()``) and the query of the directly
+    preceding rows.
+    """
+    preceding = runs.filter(keyset_filter(start, "lt"))
+    aggregates = {
+        "max_{}".format(metric): Max(get_metric_expression(metric))
+        for metric in RunMetric.values
+    }
+    rows = preceding.order_by("-date", "-id").values_list(*RUN_FIELDS)[
+        : max(windows) - 1
+    ]
+
+    return preceding, aggregates, rows
+
+
+def build_seed(aggregates, rows):
+    """Build the result of :func:`get_seed` from the results of its queries."""
+    maxima = {}
+    for metric in RunMetric.values:
+        value = aggregates["max_{}".format(metric)]
+        maxima[metric] = None if value is None else int(value)
+
+    return [RunData(*row) for row in rows][::-1], maxima
+
+
+def get_seed(runs, start, windows):
+    """Provide the context of the runs preceding ``start``.
+
+    The result is a tuple of the ``RunData`` instances of the directly
+    preceding runs, as required to fill the largest rolling window, and a
+    ``dict`` with the maximum of all preceding runs for every metric.
+    """
+    preceding, aggregates, rows = get_seed_queries(runs, start, windows)
+
+    return build_seed(preceding.aggregate(**aggregates), rows)
+
+
+def restrict_runs(runs, start=None, end=None):
+    """Restrict the runs to the keys between ``start`` and ``end``, if provided."""
+    if start is not None:
+        runs = runs.filter(keyset_filter(start, "gte"))
+    if end is not None:
+        runs = runs.filter(keyset_filter(end, "lte"))
+
+    return runs
+
+
+def evaluate_rows_python(rows, windows, seed=None):
+    """Evaluate rows of :data:`RUN_FIELDS`, ordered by date, using ``TrackerList``.
+
+    ``seed`` is the context of the preceding runs, as provided by
+    :func:`get_seed`. ``rows`` may be an iterator of the ORM; if timing is
+    enabled, the time spent fetching the rows is recorded separately.
+    """
+    tracker_list = TrackerList(windows=windows)
+    if seed is not None:
+        tracker_list.seed(*seed)
+
+    if is_timing_enabled():
+        _add_rows_timed(tracker_list, rows)
+    else:
+        for row in rows:
+            tracker_list.add(RunData(*row))
+
+    return list(tracker_list._entries)
+
+
+def evaluate_runs_python(runs, windows, start=None, end=None):
+    """Evaluate the runs of the given queryset using ``TrackerList``.
+
+    If ``start`` and ``end`` are provided, only the runs between these keys
+    (see :mod:`penthouse.pagination`) are returned, but evaluated in the
+    context of the preceding runs.
+    """
+    seed = get_seed(runs, start, windows) if start is not None else None
+    rows = (
+        restrict_runs(runs, start, end)
+        .order_by("date", "id")
+        .values_list(*RUN_FIELDS)
+        .iterator()
+    )
+
+    return evaluate_rows_python(rows, windows, seed=seed)
+
+
+def _add_rows_timed(tracker_list, rows):
+    """Add the rows to ``tracker_list``, timing every stage, see :mod:`penthouse.timing`.
+
+    The time spent in the ORM's iterator, the construction of ``RunData``
+    instances and :meth:`TrackerList.add` are recorded as separate spans.
+    """
+    fetch = construct = add = 0
+    rows = iter(rows)
+    while True:
+        start = time.perf_counter()
+        row = next(rows, None)
+        fetched = time.perf_counter()
+        fetch += fetched - start
+        if row is None:
+            break
+
+        entry = RunData(*row)
+        constructed = time.perf_counter()
+        construct += constructed - fetched
+
+        tracker_list.add(entry)
+        add += time.perf_counter() - constructed
+
+    record_timing("evaluation-fetch", fetch)
+    record_timing("evaluation-rundata", construct)
+    record_timing("evaluation-add", add)
+
+
+def get_evaluated_queryset(runs, windows, start=None, end=None, seed=None):
+    """Provide the query of :func:`evaluate_runs_database`.
+
+    The window functions have to operate on the preceding runs of ``start``
+    as well, as required by the largest window, so the query starts with the
+    runs of ``seed`` (see :func:`get_seed`).
+    """
+    if start is not None and seed is not None and seed[0]:
+        start = (seed[0][0].date, seed[0][0].id)
+
+    fields = (
+        ("run_number",)
+        + RUN_FIELDS
+        + ("coins_hour", "coins_wave", "cells_hour", "cells_wave")
+        + tuple("pb_{}".format(metric) for metric in RunMetric.values)
+        + tuple(
+            "{}_avg{}".format(metric, size)
+            for size in windows
+            for metric in RunMetric.values
+        )
+    )
+
+    return (
+        restrict_runs(runs, start, end).with_evaluation(windows=windows).values(*fields)
+    )
+
+
+def evaluate_rows_database(rows, windows, start=None, seed=None):
+    """Create ``RunData`` instances of the rows of :func:`get_evaluated_queryset`.
+
+    Rows preceding ``start`` are skipped; the personal best flags are
+    corrected by the maxima of all preceding runs (see :func:`get_seed`).
+    """
+    maxima = seed[1] if seed is not None else {}
+
+    results = []
+    for row in rows:
+        if start is not None and (row["date"], row["id"]) < start:
+            continue
+
+        item = RunData.from_evaluated(row, windows)
+        for metric, maximum in maxima.items():
+            if maximum is not None and getattr(item, metric) <= maximum:
+                setattr(item, "pb_{}".format(metric), False)
+        results.append(item)
+
+    return results
+
+
+def evaluate_runs_database(runs, windows, start=None, end=None):
+    """Evaluate the runs of the given queryset using the database's window functions.
+
+    If ``start`` and ``end`` are provided, only the runs between these keys
+    (see :mod:`penthouse.pagination`) are returned. The window functions
+    operate on the preceding runs, as required by the largest window, and the
+    personal best flags are corrected by the maxima of all preceding runs.
+    """
+    seed = get_seed(runs, start, windows) if start is not None else None
+    rows = get_evaluated_queryset(runs, windows, start, end, seed=seed).iterator()
+
+    return evaluate_rows_database(rows, windows, start=start, seed=seed)
+
+
+def evaluate_rows_numpy(rows, windows, seed=None):
+    """Evaluate rows of :data:`RUN_FIELDS`, ordered by date, with NumPy.
+
+    The rows are evaluated column-wise by
+    :func:`penthouse.vectorized.evaluate`, providing the same results as
+    :func:`evaluate_rows_python`, which is used if NumPy is not installed or
+    the values are too big.
+    """
+    if not is_vectorized_available():
+        return evaluate_rows_python(rows, windows, seed=seed)
+
+    windows = tuple(sorted(set(windows)))
+    entries, maxima = seed if seed is not None else ([], {})
+
+    columns = {
+        field: [getattr(entry, field) for entry in entries]
+        + [row[RUN_FIELDS.index(field)] for row in rows]
+        for field in ("waves", "duration", "coins", "cells")
+    }
+    results = evaluate_vectorized(
+        columns,
+        windows,
+        maxima={key: value for key, value in maxima.items() if value is not None},
+        offset=len(entries),
+    )
+    if results is None:
+        return evaluate_rows_python(rows, windows, seed=seed)
+
+    derived = zip(
+        *(
+            results[field]
+            for field in ("coins_hour", "coins_wave", "cells_hour", "cells_wave")
+        ),
+        *(results["pb_{}".format(metric)] for metric in RunMetric.values),
+    )
+    averages = zip(
+        *(
+            [
+                RunAverages(size, *values)
+                for values in zip(
+                    *(
+                        results["{}_avg{}".format(subject, size)]
+                        for subject in TrackerList.avg_subjects
+                    )
+                )
+            ]
+            for size in windows
+        )
+    )
+
+    items = []
+    for row, values, row_averages in zip(rows, derived, averages):
+        item = RunData.__new__(RunData)
+        (
+            item.id,
+            item.date,
+            item.tier,
+            item.waves,
+            item.duration,
+            item.coins,
+            item.cells,
+        ) = row
+        item.notes = ""
+        (
+            item.coins_hour,
+            item.coins_wave,
+            item.cells_hour,
+            item.cells_wave,
+            item.pb_coins,
+            item.pb_coins_hour,
+            item.pb_cells,
+            item.pb_cells_hour,
+        ) = values
+        item.averages = list(row_averages)
+        items.append(item)
+
+    return items
+
+
+def evaluate_runs_numpy(runs, windows, start=None, end=None):
+    """Evaluate the runs of the given queryset with NumPy.
+
+    The runs are fetched as tuples and evaluated by
+    :func:`evaluate_rows_numpy`.
+    """
+    seed = get_seed(runs, start, windows) if start is not None else None
+    rows = list(
+        restrict_runs(runs, start, end).order_by("date", "id").values_list(*RUN_FIELDS)
+    )
+
+    return evaluate_rows_numpy(rows, windows, seed=seed)
+
+
+TRACKER_ENGINES = {
+    "database": evaluate_runs_database,
+    "numpy": evaluate_runs_numpy,
+    "python": evaluate_runs_python,
+}
+"""The available implementations to evaluate runs.
+
+The engine to be used is determined by the ``PENTHOUSE_TRACKER_ENGINE``
+setting, see :mod:`penthouse.conf`.
+"""
+
+
+def get_tracker_engine():
+    """Return the configured implementation to evaluate runs."""
+    engine = get_setting("TRACKER_ENGINE")
+    try:
+        return TRACKER_ENGINES[engine]
+    except KeyError:
+        raise ImproperlyConfigured(
+            "PENTHOUSE_TRACKER_ENGINE must be one of {}, got '{}'".format(
+                ", ".join(TRACKER_ENGINES), engine
+            )
+        )
+
+
+def evaluate_tiers(rows):
+    """Provide the statistics by tier of rows of :data:`RUN_FIELDS`.
+
+    The rows are the latest runs of every tier, see
+    :meth:`RunQuerySet.latest_by_tier() <penthouse.models.tracker.RunQuerySet.latest_by_tier>`,
+    in any order. They are ordered by date here, as there are only a few rows
+    per tier and the database would sort them in a temporary table.
+    """
+    runs_by_tier = TierData()
+    for row in sorted(rows, key=itemgetter(1, 0)):
+        runs_by_tier.add(RunData(*row))
+
+    if get_setting("TRACKER_ENGINE") == "numpy":
+        return runs_by_tier.get_results_vectorized()
+    return runs_by_tier.get_results()
+
+
+def get_tier_queryset(runs):
+    """Provide the query of the rows to be evaluated by :func:`evaluate_tiers`.
+
+    The rows are not ordered, see :func:`evaluate_tiers`.
+    """
+    return runs.latest_by_tier(5).order_by().values_list(*RUN_FIELDS)
+
+
+def _get_threshold(personal_best, metric, percentage):
+    """Return the threshold of *top values* of a metric, ``None`` without runs."""
+    if personal_best is None:
+        return None
+
+    return getattr(personal_best, metric) * (percentage / 100)
+
+
+def build_overview(
+    profile, tier_results, page, page_runs, personal_bests, tier_quantiles=None
+):
+    """Build the context of the tracker overview from its computed parts."""
+    pb_coins = personal_bests.get(RunMetric.COINS, None)
+    pb_coins_hour = personal_bests.get(RunMetric.COINS_HOUR, None)
+    pb_cells = personal_bests.get(RunMetric.CELLS, None)
+    pb_cells_hour = personal_bests.get(RunMetric.CELLS_HOUR, None)
+
+    return {
+        "avg_windows": profile.get_avg_windows(),
+        "runs": page_runs,
+        "page": page,
+        "runs_by_tier": tier_results,
+        "tier_quantiles": tier_quantiles,
+        "pb_coins": pb_coins,
+        "pb_coins_hour": pb_coins_hour,
+        "pb_cells": pb_cells,
+        "pb_cells_hour": pb_cells_hour,
+        "threshold_top_coins": _get_threshold(
+            pb_coins, "coins", profile.settings_tracker_threshold_top_coins
+        ),
+        "threshold_top_coins_hour": _get_threshold(
+            pb_coins_hour,
+            "coins_hour",
+            profile.settings_tracker_threshold_top_coins_hour,
+        ),
+        "threshold_top_cells": _get_threshold(
+            pb_cells, "cells", profile.settings_tracker_threshold_top_cells
+        ),
+        "threshold_top_cells_hour": _get_threshold(
+            pb_cells_hour,
+            "cells_hour",
+            profile.settings_tracker_threshold_top_cells_hour,
+        ),
+    }
+
+
+def get_overview(profile, runs, before=None, after=None, filtered=False):
+    """Compute the data of the tracker overview.
+
+    The result is a ``dict`` to be used as template context. It contains the
+    statistics by tier, the personal bests with their thresholds and the
+    evaluated runs of the page, specified by the ``before`` or ``after``
+    keys (see :mod:`penthouse.pagination`).
+
+    If ``filtered`` is ``True``, ``runs`` is a filtered part of the
+    profile's runs and all values, including the personal bests, are
+    calculated over these runs only. The quantiles by tier are estimated from
+    the profile's sketches (see :mod:`penthouse.models.sketch`), which cover
+    all runs, so they are omitted in this case.
+    """
+    windows = profile.get_avg_windows()
+
+    with span("tier-data"):
+        rows = list(get_tier_queryset(runs))
+    with span("tier-results"):
+        tier_results = evaluate_tiers(rows)
+
+    with span("pagination"):
+        paginator = KeysetPaginator(runs, get_setting("TRACKER_PAGE_SIZE"))
+        page = paginator.get_page(before=before, after=after)
+        if not page:
+            page = paginator.get_page()
+    with span("evaluation"):
+        if page:
+            page_runs = get_tracker_engine()(
+                runs, windows, start=page.start, end=page.end
+            )
+            load_notes(page_runs)
+        else:
+            page_runs = []
+
+    with span("personal-bests"):
+        personal_bests = get_personal_bests(profile, runs if filtered else None)
+
+    with span("quantiles"):
+        tier_quantiles = None if filtered else RunSketch.objects.get_quantiles(profile)
+
+    return build_overview(
+        profile, tier_results, page, page_runs, personal_bests, tier_quantiles
+    )
+
+
+def get_overview_variant(filter_query, before, after):
+    """Provide the variant of a cached overview, see :mod:`penthouse.cache`."""
+    return "{}|{}|{}|{}|{}".format(
+        get_setting("TRACKER_ENGINE"),
+        get_setting("TRACKER_PAGE_SIZE"),
+        filter_query,
+        before,
+        after,
     )
 
 
+@login_required
+def tracker_overview(request):
+    """Provide an overview over all runs.
+
+    The runs may be filtered by GET parameters, see
+    :class:`~penthouse.forms.filters.RunFilterForm`. The computed overview is
+    cached per profile, filters and page, see :mod:`penthouse.cache`.
+    """
+    profile = get_profile(request)
+    filter_form = RunFilterForm(request.GET)
+    filtered = filter_form.is_filtered()
+    filter_query = filter_form.get_query()
+    runs_raw = filter_form.filter_runs(Run.objects.filter_by_profile(profile.pk))
+
+    before = request.GET.get("before", "")
+    after = request.GET.get("after", "")
+
+    with span("overview"):
+        context = get_or_compute(
+            "tracker-overview",
+            profile.pk,
+            get_overview_variant(filter_query, before, after),
+            lambda: get_overview(
+                profile,
+                runs_raw,
+                before=decode_cursor(before),
+                after=decode_cursor(after),
+                filtered=filtered,
+            ),
+        )
+    context["profile"] = profile
+    context["filter_form"] = filter_form
+    context["filter_query"] = filter_query
+    context["bulk_form"] = RunBulkForm(profile.pk)
+
+    with span("render"):
+        return render(request, "penthouse/tracker_overview.html", context)
+
+
+@login_required
+def run_export(request, file_format):
+    """Provide a download of all runs of the user's profile.
+
+    The file is streamed, see :mod:`penthouse.exporter`.
+    """
+    if file_format not in CONTENT_TYPES:
+        raise Http404("Unknown export format '{}'".format(file_format))
+
+    profile = get_profile(request)
+
+    response = StreamingHttpResponse(
+        export_runs(profile, file_format), content_type=CONTENT_TYPES[file_format]
+    )
+    response["Content-Disposition"] = 'attachment; filename="runs.{}"'.format(
+        file_format
+    )
+
+    return response
+
+
+class RunBulkView(LoginRequiredMixin, ProfileIDMixin, generic.FormView):
+    """Apply an action to the runs, that are selected in the run list.
+
+    The runs are changed at once, see :mod:`penthouse.bulk`. Deleting runs
+    has to be confirmed once for all selected runs.
+    """
+
+    form_class = RunBulkForm
+
+    http_method_names = ["post"]
+
+    template_name = "penthouse/run_bulk.html"
+
+    success_url = reverse_lazy("penthouse:tracker-overview")
+
+    def get_form_kwargs(self):  # noqa: D102
+        kwargs = super().get_form_kwargs()
+        kwargs["profile_id"] = get_profile_id(self.request)
+
+        return kwargs
+
+    def form_valid(self, form):  # noqa: D102
+        action = form.cleaned_data["action"]
+        if action == RunBulkAction.DELETE and "confirm" not in self.request.POST:
+            return self.render_to_response(
+                self.get_context_data(form=form, confirm=True)
+            )
+
+        editor = RunBulkEditor(get_profile(self.request), form.get_run_ids())
+        if action == RunBulkAction.DELETE:
+            editor.delete()
+        elif action == RunBulkAction.SET_TIER:
+            editor.set_tier(form.cleaned_data["tier"])
+        else:
+            editor.shift_dates(form.cleaned_data["offset"])
+
+        return super().form_valid(form)
+
+
 class RunCreateView(LoginRequiredMixin, ProfileIDMixin, generic.CreateView):
     """Generic class-based view implementation to add ``Run`` instances."""
 
@@ -228,7 +938,7 @@ class RunCreateView(LoginRequiredMixin, ProfileIDMixin, generic.CreateView):
     success_url = reverse_lazy("penthouse:tracker-overview")
 
     def form_valid(self, form):  # noqa: D102
-        form.instance.profile = Profile.objects.get(owner=self.request.user)
+        form.instance.profile = get_profile(self.request)
 
         return super().form_valid(form)
 
@@ -247,6 +957,50 @@ class RunDeleteView(
     success_url = reverse_lazy("penthouse:tracker-overview")
 
 
+class RunImportView(LoginRequiredMixin, ProfileIDMixin, generic.FormView):
+    """Import runs from an uploaded CSV or JSON Lines file.
+
+    The file is processed as a stream; the result, including the rejected
+    rows, is displayed together with a fresh form.
+    """
+
+    form_class = RunImportForm
+
+    template_name = "penthouse/run_import.html"
+
+    def form_valid(self, form):  # noqa: D102
+        importer = RunImporter(get_profile(self.request))
+        result = importer.import_file(
+            form.cleaned_data["file"].file, form.cleaned_data["file_format"]
+        )
+
+        return self.render_to_response(
+            self.get_context_data(form=self.get_form_class()(), result=result)
+        )
+
+
+class RunPasteView(LoginRequiredMixin, ProfileIDMixin, generic.FormView):
+    """Import runs from pasted battle reports of the game.
+
+    The reports are imported like files, see :mod:`penthouse.reports`; the
+    result is displayed together with a fresh form.
+    """
+
+    form_class = RunPasteForm
+
+    template_name = "penthouse/run_paste.html"
+
+    def form_valid(self, form):  # noqa: D102
+        importer = RunImporter(get_profile(self.request))
+        result = importer.import_stream(
+            io.StringIO(form.cleaned_data["reports"]), FORMAT_REPORT
+        )
+
+        return self.render_to_response(
+            self.get_context_data(form=self.get_form_class()(), result=result)
+        )
+
+
 class RunUpdateView(
     LoginRequiredMixin, RestrictToUserMixin, ProfileIDMixin, generic.UpdateView
 ):
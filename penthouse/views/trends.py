@@ -0,0 +1,98 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Views providing the trends and the distributions of a profile's runs."""
+
+# Django imports
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.shortcuts import render
+from django.utils import timezone
+
+# app imports
+from penthouse.forms.filters import TrendsForm
+from penthouse.middleware import get_profile
+from penthouse.models.rollup import RunRollup
+from penthouse.models.sketch import RunSketch
+from penthouse.sketch import QUANTILES
+from penthouse.timing import span
+
+
+def get_trends(profile, period, tier=None):
+    """Provide the rollups of a profile, see :mod:`penthouse.models.rollup`.
+
+    Without ``tier``, the rollups of all tiers are combined per bucket.
+    """
+    with span("rollups"):
+        rollups = RunRollup.objects.get_rollups(profile, period, tier=tier)
+    if tier is None:
+        rollups = RunRollup.combine(rollups)
+
+    return rollups
+
+
+@login_required
+def trends(request):
+    """Show the sums of coins, cells and playtime per day, week or month."""
+    form = TrendsForm(request.GET)
+    profile = get_profile(request)
+
+    return render(
+        request,
+        "penthouse/trends.html",
+        {
+            "form": form,
+            "period": form.get_period(),
+            "rollups": get_trends(profile, form.get_period(), tier=form.get_tier()),
+        },
+    )
+
+
+@login_required
+def trends_data(request):
+    """Provide the trends as JSON, e.g. to be plotted by the client.
+
+    Accepts the same GET parameters as :func:`trends`.
+    """
+    form = TrendsForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({"errors": form.errors.get_json_data()}, status=400)
+
+    profile = get_profile(request)
+    period = form.get_period()
+    tier = form.get_tier()
+
+    return JsonResponse(
+        {
+            "period": period,
+            "tier": tier,
+            "buckets": [
+                {
+                    "start": timezone.localtime(rollup.start).isoformat(),
+                    "runs": rollup.runs,
+                    "duration": rollup.duration,
+                    "coins": rollup.coins,
+                    "coins_hour": rollup.coins_hour,
+                    "cells": rollup.cells,
+                    "cells_hour": rollup.cells_hour,
+                }
+                for rollup in get_trends(profile, period, tier=tier)
+            ],
+        }
+    )
+
+
+@login_required
+def quantiles_data(request):
+    """Provide the estimated quantiles of waves and coins/h by tier as JSON.
+
+    The quantiles are estimated from the profile's sketches, see
+    :mod:`penthouse.models.sketch`, and cover all runs.
+    """
+    profile = get_profile(request)
+
+    with span("quantiles"):
+        tiers = RunSketch.objects.get_quantiles(profile)
+
+    return JsonResponse({"quantiles": QUANTILES, "tiers": tiers})
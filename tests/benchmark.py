@@ -0,0 +1,273 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Benchmarks of the run tracker with synthetic run histories.
+
+For every requested size, a profile with that many runs is generated and the
+following is measured:
+
+- ``overview_*``: the ``tracker_overview`` view, end to end (wall time,
+  number of queries and peak memory of the Python allocations);
+- ``tracker_list_add_ms``: adding all runs to ``TrackerList``;
+- ``tier_data_add_ms`` / ``tier_data_get_results_ms``: ``TierData``;
+- ``render_ms``: rendering the overview's template;
+- ``hr_big_number_ms``: formatting the coins of (at most) 10,000 runs.
+
+Times are the median of several repetitions, in milliseconds. The results are
+written as JSON and may be compared with the results of a previous release::
+
+    python -m tests.benchmark --sizes 100 10000 --output current.json
+    python -m tests.benchmark --compare current.json --tolerance 0.25
+
+With ``--compare``, the script exits with status ``1`` if any time or memory
+value exceeds the previous value by more than the tolerance or if any view
+issues more queries than before.
+"""
+
+# Python imports
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.util.settings_benchmark")
+
+# Django imports
+import django  # noqa: E402
+
+DEFAULT_SIZES = (100, 10000)
+"""The sizes to benchmark, if none are given; 100k and 1M runs take minutes."""
+
+HR_BIG_NUMBER_SAMPLE = 10000
+
+
+def generate_runs(profile, size, seed=0):
+    """Create ``size`` runs for ``profile`` with a realistic distribution.
+
+    The player progresses through the tiers over time and mostly plays the
+    highest unlocked tier. Waves, duration, coins and cells depend on the
+    tier, with some noise. The history spans at most three years.
+    """
+    # app imports
+    from penthouse.game_constants import TowerTiers
+    from penthouse.models import PersonalBest, Run
+
+    rnd = random.Random(seed)
+    tiers = TowerTiers.values
+    interval = min(3 * 3600, 3 * 365 * 24 * 3600 / size)
+    date = datetime.datetime.now(tz=datetime.timezone.utc) - datetime.timedelta(
+        seconds=interval * size
+    )
+
+    batch = []
+    for number in range(size):
+        date += datetime.timedelta(seconds=rnd.expovariate(1 / interval))
+
+        highest = 1 + int((len(tiers) - 4) * number / size)
+        choice = rnd.random()
+        if choice < 0.6:
+            tier = highest
+        elif choice < 0.85:
+            tier = max(1, highest - 1)
+        else:
+            tier = rnd.randint(1, highest)
+
+        waves = min(12000, max(50, int(rnd.gauss(3000 - tier * 120, 600))))
+        batch.append(
+            Run(
+                profile=profile,
+                date=date,
+                tier=tiers[tier - 1],
+                waves=waves,
+                duration=int(waves * rnd.uniform(7, 11)),
+                coins=int(waves * 10 ** (4 + tier * 0.45) * rnd.lognormvariate(0, 0.3)),
+                cells=int(waves * (5 + tier * 3) * rnd.lognormvariate(0, 0.3)),
+                notes="",
+            )
+        )
+        if len(batch) == 10000:
+            Run.objects.bulk_create(batch)
+            batch = []
+
+    Run.objects.bulk_create(batch)
+    PersonalBest.objects.rebuild(profile)
+
+
+def measure(function, repeat):
+    """Return the median wall time of ``function`` in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return round(statistics.median(timings), 3)
+
+
+def run_benchmarks(size, repeat):
+    """Generate a profile with ``size`` runs and return its measurements."""
+    # Django imports
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.template.loader import render_to_string
+    from django.test import Client, RequestFactory
+    from django.test.utils import CaptureQueriesContext
+
+    # app imports
+    from penthouse.game_numbers import format_number
+    from penthouse.models import Profile, Run
+    from penthouse.templatetags.penthouse_tags import hr_big_number
+    from penthouse.views.tracker import (
+        RUN_FIELDS,
+        RunData,
+        TierData,
+        TrackerList,
+        get_overview,
+    )
+
+    user = get_user_model().objects.create_user("benchmark-{}".format(size))
+    profile = Profile.objects.create(owner=user)
+    generate_runs(profile, size)
+
+    results = {}
+
+    client = Client()
+    client.force_login(user)
+    with CaptureQueriesContext(connection) as queries:
+        client.get("/tracker/")
+    results["overview_queries"] = len(queries)
+    results["overview_ms"] = measure(lambda: client.get("/tracker/"), repeat)
+
+    tracemalloc.start()
+    client.get("/tracker/")
+    results["overview_peak_kib"] = round(tracemalloc.get_traced_memory()[1] / 1024)
+    tracemalloc.stop()
+
+    runs = Run.objects.filter(profile=profile)
+    rows = list(runs.order_by("date", "id").values_list(*RUN_FIELDS))
+    entries = [RunData(*row) for row in rows]
+    windows = profile.get_avg_windows()
+
+    def tracker_list_add():
+        tracker_list = TrackerList(windows=windows)
+        for entry in entries:
+            tracker_list.add(entry)
+
+    results["tracker_list_add_ms"] = measure(tracker_list_add, repeat)
+
+    def tier_data_add():
+        tier_data = TierData()
+        for entry in entries:
+            tier_data.add(entry)
+        return tier_data
+
+    results["tier_data_add_ms"] = measure(tier_data_add, repeat)
+    tier_data = tier_data_add()
+    results["tier_data_get_results_ms"] = measure(tier_data.get_results, repeat)
+
+    request = RequestFactory().get("/tracker/")
+    request.user = user
+    context = get_overview(profile, runs)
+    context["profile"] = profile
+    results["render_ms"] = measure(
+        lambda: render_to_string(
+            "penthouse/tracker_overview.html", context, request=request
+        ),
+        repeat,
+    )
+
+    coins = [row[RUN_FIELDS.index("coins")] for row in rows[:HR_BIG_NUMBER_SAMPLE]]
+
+    def format_coins():
+        format_number.cache_clear()
+        for value in coins:
+            hr_big_number(value)
+
+    results["hr_big_number_ms"] = measure(format_coins, repeat)
+
+    return results
+
+
+def compare(current, previous, tolerance):
+    """Return the regressions of ``current`` compared to ``previous`` results."""
+    regressions = []
+    for size, results in current["results"].items():
+        for name, value in results.items():
+            try:
+                before = previous["results"][size][name]
+            except KeyError:
+                continue
+
+            if name.endswith("_queries"):
+                limit = before
+            else:
+                limit = before * (1 + tolerance)
+            if value > limit:
+                regressions.append(
+                    "{} runs, {}: {} (before: {})".format(size, name, value, before)
+                )
+
+    return regressions
+
+
+def main(argv=None):
+    """Run the benchmarks as specified by the command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write the results to this file")
+    parser.add_argument("--compare", help="Compare with the results of this file")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    # Django imports
+    from django.conf import settings
+    from django.core.management import call_command
+
+    database = settings.DATABASES["default"]["NAME"]
+    if os.path.exists(database):
+        os.remove(database)
+
+    django.setup()
+    call_command("migrate", interactive=False, verbosity=0)
+
+    current = {
+        "environment": {
+            "date": datetime.datetime.now(tz=datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": settings.DATABASES["default"]["ENGINE"],
+        },
+        "results": {},
+    }
+    for size in args.sizes:
+        print("Benchmarking {} runs...".format(size), file=sys.stderr)
+        current["results"][str(size)] = run_benchmarks(size, args.repeat)
+
+    output = json.dumps(current, indent=2)
+    if args.output:
+        with open(args.output, "w") as stream:
+            stream.write(output)
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as stream:
+            regressions = compare(current, json.load(stream), args.tolerance)
+        for regression in regressions:
+            print("Regression: {}".format(regression), file=sys.stderr)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
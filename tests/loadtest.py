@@ -0,0 +1,159 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Load test of the tracker overview, comparing the sync and the async views.
+
+A profile with a synthetic run history (see :func:`tests.benchmark.generate_runs`)
+is generated, then the overview is requested concurrently through Django's
+ASGI handler, once with the sync views (``tests.util.urls_dev``) and once
+with the async views (``tests.util.urls_async``). The throughput and the
+latencies (median and 95th percentile, in milliseconds) are written as JSON::
+
+    python -m tests.loadtest --runs 10000 --concurrency 20 --requests 200
+
+The cache is disabled and the pages are requested in turn, so every request
+evaluates runs. The database is SQLite, which serializes all queries; the
+results show the overhead of both variants, not the throughput of a
+production database.
+"""
+
+# Python imports
+import argparse
+import asyncio
+import json
+import os
+import re
+import statistics
+import sys
+import time
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.util.settings_benchmark")
+
+# Django imports
+import django  # noqa: E402
+
+
+async def run_load(client, paths, requests, concurrency):
+    """Request ``paths`` in turn, ``concurrency`` at a time.
+
+    Returns the total time in seconds and the latency of every request.
+    """
+    queue = asyncio.Queue()
+    for number in range(requests):
+        queue.put_nowait(paths[number % len(paths)])
+
+    latencies = []
+
+    async def worker():
+        while not queue.empty():
+            path = queue.get_nowait()
+            start = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                raise RuntimeError(
+                    "{} returned status {}".format(path, response.status_code)
+                )
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    return time.perf_counter() - start, latencies
+
+
+def summarize(duration, latencies):
+    """Provide the throughput and latencies of a single load run."""
+    latencies = sorted(latency * 1000 for latency in latencies)
+
+    return {
+        "requests_per_second": round(len(latencies) / duration, 1),
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))], 3),
+    }
+
+
+def get_paths(client, pages):
+    """Collect the URLs of the latest ``pages`` pages of the overview."""
+    paths = ["/tracker/"]
+    while len(paths) < pages:
+        match = re.search(
+            r'href="\?before=([^"]+)"', client.get(paths[-1]).content.decode()
+        )
+        if match is None:
+            break
+        paths.append("/tracker/?before={}".format(match.group(1)))
+
+    return paths
+
+
+def main(argv=None):
+    """Run the load test as specified by the command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--output", help="Write the results to this file")
+    args = parser.parse_args(argv)
+
+    # Django imports
+    from django.conf import settings
+    from django.core.management import call_command
+
+    database = settings.DATABASES["default"]["NAME"]
+    if os.path.exists(database):
+        os.remove(database)
+
+    django.setup()
+    call_command("migrate", interactive=False, verbosity=0)
+
+    # Django imports
+    from django.contrib.auth import get_user_model
+    from django.test import AsyncClient, Client, override_settings
+
+    # app imports
+    from penthouse.models import Profile
+
+    # local imports
+    from .benchmark import generate_runs
+
+    user = get_user_model().objects.create_user("loadtest")
+    generate_runs(Profile.objects.create(owner=user), args.runs)
+
+    client = Client()
+    client.force_login(user)
+    paths = get_paths(client, args.pages)
+
+    results = {
+        "runs": args.runs,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "pages": len(paths),
+    }
+    for variant, urlconf in (
+        ("sync", "tests.util.urls_dev"),
+        ("async", "tests.util.urls_async"),
+    ):
+        print("Load testing the {} views...".format(variant), file=sys.stderr)
+        async_client = AsyncClient()
+        async_client.cookies = client.cookies
+        with override_settings(ROOT_URLCONF=urlconf):
+            results[variant] = summarize(
+                *asyncio.run(
+                    run_load(async_client, paths, args.requests, args.concurrency)
+                )
+            )
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as stream:
+            stream.write(output)
+    else:
+        print(output)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Run the app's tests with Django's test runner.
+
+The tests are run with :mod:`tests.util.settings_test`; the labels of the
+tests to run may be provided as arguments, e.g.
+``python tests/runtests.py tests.test_query_plans``.
+"""
+
+# Python imports
+import os
+import sys
+
+# Django imports
+import django
+from django.conf import settings
+from django.test.utils import get_runner
+
+
+def runtests(test_labels):
+    """Run the specified tests, all tests by default."""
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    os.environ["DJANGO_SETTINGS_MODULE"] = "tests.util.settings_test"
+    django.setup()
+
+    test_runner = get_runner(settings)()
+    failures = test_runner.run_tests(test_labels or ["tests"])
+
+    sys.exit(bool(failures))
+
+
+if __name__ == "__main__":
+    runtests(sys.argv[1:])
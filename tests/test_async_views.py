@@ -0,0 +1,146 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Compare the async views of :mod:`penthouse.urls_async` with the sync views.
+
+The views are requested with Django's ``AsyncClient`` using
+:mod:`tests.util.urls_async` and have to provide the same responses as the
+sync views of :mod:`penthouse.urls`, apart from the CSRF tokens. The cache is
+disabled, so every response is computed by its view.
+"""
+
+# Python imports
+import re
+from datetime import datetime, timedelta, timezone
+
+# Django imports
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+# external imports
+from asgiref.sync import async_to_sync
+
+# app imports
+from penthouse.models.personal_best import PersonalBest
+from penthouse.models.profile import Profile
+from penthouse.models.tracker import Run
+from penthouse.pagination import encode_cursor
+
+_CSRF_TOKEN_RE = re.compile(r'name="csrfmiddlewaretoken" value="[^"]+"')
+
+RUN_DATA = {
+    "date": "2024-11-01 10:00",
+    "tier": "T2",
+    "waves": 2000,
+    "duration_0": 1,
+    "duration_1": 0,
+    "duration_2": 0,
+    "coins_0": "5",
+    "coins_1": "1000000000000",
+    "cells_0": "20",
+    "cells_1": "1000",
+    "notes": "async",
+}
+"""The POST data of a valid run, see :class:`~penthouse.models.tracker.RunForm`."""
+
+
+def normalize(response):
+    """Return the content of a response without CSRF tokens."""
+    return _CSRF_TOKEN_RE.sub("", response.content.decode())
+
+
+@override_settings(PENTHOUSE_CACHE_ALIAS=None, PENTHOUSE_TRACKER_PAGE_SIZE=10)
+class AsyncViewTest(TestCase):  # noqa: D101
+    @classmethod
+    def setUpTestData(cls):  # noqa: D102
+        cls.user = get_user_model().objects.create_user(username="player")
+        cls.profile, _created = Profile.objects.get_or_create(owner=cls.user)
+
+        date = datetime(2024, 10, 1, tzinfo=timezone.utc)
+        cls.runs = [
+            Run.objects.create(
+                profile=cls.profile,
+                date=date + timedelta(hours=index),
+                tier=tier,
+                waves=1000 + index * 7 % 11,
+                duration=3600 + index * 60,
+                coins=10**9 + index * 13 % 17 * 10**7,
+                cells=10**4 + index * 5 % 7 * 10**2,
+                notes="run {}".format(index),
+            )
+            for index, tier in enumerate(["T1", "T2", "T3"] * 10)
+        ]
+
+    def setUp(self):  # noqa: D102
+        self.client.force_login(self.user)
+        self.async_client.force_login(self.user)
+
+    def async_request(self, method, url, data=None):
+        """Request ``url`` with the ``AsyncClient`` and the async URLs."""
+        with override_settings(ROOT_URLCONF="tests.util.urls_async"):
+            return async_to_sync(getattr(self.async_client, method))(url, data)
+
+    def assertSameResponse(self, url, status_code=200):  # noqa: N802
+        """Assert that the sync and the async view provide the same response."""
+        response = self.client.get(url)
+        async_response = self.async_request("get", url)
+
+        self.assertEqual(response.status_code, status_code)
+        self.assertEqual(async_response.status_code, status_code)
+        self.assertEqual(normalize(async_response), normalize(response))
+
+    def test_overview(self):  # noqa: D102
+        url = reverse("penthouse:tracker-overview")
+        cursor = encode_cursor((self.runs[10].date, self.runs[10].pk))
+
+        for query in ("", "?tier_min=T2&waves_min=1005", "?before=" + cursor):
+            with self.subTest(query=query):
+                self.assertSameResponse(url + query)
+
+    def test_run_forms(self):  # noqa: D102
+        self.assertSameResponse(reverse("penthouse:tracker-run-add"))
+        for name in ("penthouse:tracker-run-update", "penthouse:tracker-run-delete"):
+            for run_id, status_code in ((self.runs[0].pk, 200), (0, 404)):
+                with self.subTest(view=name, run_id=run_id):
+                    self.assertSameResponse(
+                        reverse(name, kwargs={"run_id": run_id}), status_code
+                    )
+
+    def test_run_changes(self):  # noqa: D102
+        response = self.async_request(
+            "post", reverse("penthouse:tracker-run-add"), RUN_DATA
+        )
+        run = Run.objects.get(notes="async")
+        self.assertRedirects(
+            response,
+            reverse("penthouse:tracker-overview"),
+            fetch_redirect_response=False,
+        )
+        self.assertTrue(PersonalBest.objects.filter(run=run).exists())
+
+        response = self.async_request(
+            "post",
+            reverse("penthouse:tracker-run-update", kwargs={"run_id": run.pk}),
+            dict(RUN_DATA, coins_0="1", notes="updated"),
+        )
+        self.assertEqual(response.status_code, 302)
+        run.refresh_from_db()
+        self.assertEqual((run.coins, run.notes), (10**12, "updated"))
+
+        response = self.async_request(
+            "post", reverse("penthouse:tracker-run-delete", kwargs={"run_id": run.pk})
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Run.objects.filter(pk=run.pk).exists())
+
+    def test_invalid_run(self):  # noqa: D102
+        url = reverse("penthouse:tracker-run-add")
+        data = dict(RUN_DATA, waves="")
+
+        self.assertEqual(
+            normalize(self.async_request("post", url, data)),
+            normalize(self.client.post(url, data)),
+        )
+        self.assertFalse(Run.objects.filter(notes="async").exists())
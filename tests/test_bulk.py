@@ -0,0 +1,186 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Test the bulk changes of runs, see :mod:`penthouse.bulk`."""
+
+# Python imports
+from datetime import timedelta
+from unittest import mock
+
+# Django imports
+from django.test import TestCase
+
+# app imports
+from penthouse.bulk import RunBulkEditor
+from penthouse.forms.bulk import RunBulkAction, RunBulkForm
+from penthouse.models.personal_best import GLOBAL_SCOPE
+from penthouse.models.rollup import RollupPeriod, RunRollup, get_bucket_start
+from penthouse.models.tracker import Run
+from tests.util.fixtures import (
+    create_profile,
+    create_runs,
+    get_personal_bests,
+    get_rebuilt_personal_bests,
+    get_rebuilt_sketches,
+    get_sketches,
+)
+
+
+def get_rollup_values(rollups):
+    """Return the sums of rollups as ``list`` of tuples."""
+    return [
+        (rollup.tier, rollup.start, rollup.runs, rollup.duration, rollup.coins)
+        for rollup in rollups
+    ]
+
+
+class RunBulkEditorTest(TestCase):  # noqa: D101
+    @classmethod
+    def setUpTestData(cls):  # noqa: D102
+        cls.profile = create_profile()
+        # two groups of runs, four days apart
+        cls.runs = create_runs(cls.profile, 12) + create_runs(
+            cls.profile, 12, offset=96
+        )
+        cls.other = create_profile("other")
+        cls.other_runs = create_runs(cls.other, 3)
+
+    def edit(self, runs, method, *args):
+        """Apply a bulk change, asserting exactly one bump of the cache."""
+        editor = RunBulkEditor(self.profile, [run.pk for run in runs])
+
+        with mock.patch("penthouse.bulk.bump_generation") as bulk_bump:
+            with mock.patch("penthouse.signals.bump_generation") as signal_bump:
+                with self.captureOnCommitCallbacks(execute=True):
+                    count = getattr(editor, method)(*args)
+
+        bulk_bump.assert_called_once_with(self.profile.pk)
+        signal_bump.assert_not_called()
+        return count
+
+    def assertDerivedData(self):  # noqa: N802
+        """Assert that the derived data matches a full rebuild."""
+        for profile in (self.profile, self.other):
+            self.assertEqual(
+                get_personal_bests(profile), get_rebuilt_personal_bests(profile)
+            )
+            self.assertEqual(get_sketches(profile), get_rebuilt_sketches(profile))
+
+    def assertRollups(self):  # noqa: N802
+        """Assert that the stored rollups match a fresh aggregation."""
+        runs = Run.objects.filter(profile=self.profile)
+        for period in RollupPeriod.values:
+            with self.subTest(period=period):
+                self.assertEqual(
+                    get_rollup_values(
+                        RunRollup.objects.get_rollups(self.profile, period)
+                    ),
+                    get_rollup_values(RunRollup.objects.compute(runs, period)),
+                )
+
+    def test_delete(self):  # noqa: D102
+        self.assertRollups()
+
+        count = self.edit(self.runs[::2] + self.other_runs, "delete")
+
+        self.assertEqual(count, 12)
+        self.assertEqual(Run.objects.filter(profile=self.other).count(), 3)
+        self.assertDerivedData()
+        self.assertRollups()
+
+    def test_set_tier(self):
+        """The personal bests of the previous and the new tiers are refreshed."""
+        runs = [run for run in self.runs if run.tier == "T1"][:3]
+        runs.append([run for run in self.runs if run.tier == "T2"][0])
+
+        count = self.edit(runs, "set_tier", "T4")
+
+        self.assertEqual(count, 4)
+        self.assertDerivedData()
+        stored = get_personal_bests(self.profile)
+        self.assertEqual(
+            {tier for tier, *_rest in stored}, {GLOBAL_SCOPE, "T1", "T2", "T3", "T4"}
+        )
+        moved = {run.pk for run in runs}
+        for tier, _metric, run_id, _value in stored:
+            if tier in ("T1", "T2"):
+                self.assertNotIn(run_id, moved)
+            elif tier == "T4":
+                self.assertIn(run_id, moved)
+
+    def test_shift_dates_backwards(self):
+        """The rollups are invalidated from the earliest new date."""
+        self.assertRollups()
+        run = self.runs[-1]
+        offset = timedelta(days=-4)
+        since = get_bucket_start(RollupPeriod.DAY, run.date + offset)
+
+        count = self.edit([run], "shift_dates", offset)
+
+        self.assertEqual(count, 1)
+        stored = RunRollup.objects.filter(profile=self.profile, period=RollupPeriod.DAY)
+        self.assertTrue(stored.exists())
+        self.assertFalse(stored.filter(start__gte=since).exists())
+        self.assertRollups()
+        self.assertDerivedData()
+
+    def test_shift_dates_forwards(self):  # noqa: D102
+        self.assertRollups()
+
+        self.edit(self.runs[:2], "shift_dates", timedelta(days=2))
+
+        self.assertRollups()
+        self.assertDerivedData()
+
+    def test_no_runs_of_the_profile(self):  # noqa: D102
+        editor = RunBulkEditor(self.profile, [run.pk for run in self.other_runs])
+
+        with mock.patch("penthouse.bulk.bump_generation") as bump:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(editor.delete(), 0)
+
+        bump.assert_not_called()
+        self.assertEqual(Run.objects.filter(profile=self.other).count(), 3)
+
+
+class RunBulkFormTest(TestCase):  # noqa: D101
+    @classmethod
+    def setUpTestData(cls):  # noqa: D102
+        cls.profile = create_profile()
+        cls.runs = create_runs(cls.profile, 3)
+        cls.other_runs = create_runs(create_profile("other"), 3)
+
+    def get_form(self, runs, action=RunBulkAction.DELETE, **data):
+        """Return the bulk form of the test profile."""
+        data.update(runs=[run.pk for run in runs], action=action)
+        return RunBulkForm(self.profile.pk, data)
+
+    def test_valid(self):  # noqa: D102
+        form = self.get_form(self.runs[:2])
+
+        self.assertTrue(form.is_valid())
+        self.assertEqual(
+            sorted(form.get_run_ids()), sorted(run.pk for run in self.runs[:2])
+        )
+
+    def test_runs_of_another_profile(self):  # noqa: D102
+        for runs in (self.other_runs[:1], self.runs[:1] + self.other_runs[:1]):
+            with self.subTest(runs=runs):
+                form = self.get_form(runs)
+
+                self.assertFalse(form.is_valid())
+                self.assertIn("runs", form.errors)
+
+    def test_missing_parameters(self):  # noqa: D102
+        form = self.get_form(self.runs, RunBulkAction.SET_TIER)
+        self.assertFalse(form.is_valid())
+        self.assertIn("tier", form.errors)
+
+        form = self.get_form(self.runs, RunBulkAction.SHIFT_DATES)
+        self.assertFalse(form.is_valid())
+        self.assertIn("offset", form.errors)
+
+        form = self.get_form(self.runs, RunBulkAction.SHIFT_DATES, offset="-1 00:00:00")
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data["offset"], timedelta(days=-1))
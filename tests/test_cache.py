@@ -0,0 +1,132 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Test the versioned caching of profile-specific data, see :mod:`penthouse.cache`."""
+
+# Python imports
+from unittest import mock
+
+# Django imports
+from django.test import TestCase, override_settings
+
+# external imports
+from asgiref.sync import async_to_sync
+
+# app imports
+from penthouse.cache import (
+    aget_or_compute,
+    bump_generation,
+    get_cache,
+    get_generation,
+    get_or_compute,
+    statistics,
+)
+from penthouse.models.tracker import Run
+from tests.util.fixtures import create_profile, create_runs, get_run_values
+
+
+@override_settings(PENTHOUSE_CACHE_ALIAS="default")
+class CacheTest(TestCase):  # noqa: D101
+    @classmethod
+    def setUpTestData(cls):  # noqa: D102
+        cls.profile = create_profile()
+        cls.runs = create_runs(cls.profile, 3)
+
+    def setUp(self):  # noqa: D102
+        get_cache().clear()
+        statistics.reset()
+
+    def compute(self, variant="page-1"):
+        """Get or compute a value of the test profile, counting the computations."""
+        return get_or_compute("test", self.profile.pk, variant, self.computation)
+
+    def assertBumped(self, change):  # noqa: N802
+        """Assert that ``change`` replaces the generation, once committed."""
+        profile_id = self.profile.pk
+        generation = get_generation(profile_id)
+        with self.captureOnCommitCallbacks(execute=True):
+            change()
+            self.assertEqual(get_generation(profile_id), generation)
+
+        self.assertNotEqual(get_generation(profile_id), generation)
+
+    def test_hit_and_miss(self):  # noqa: D102
+        self.computation = mock.Mock(return_value={"value": 1})
+
+        self.assertEqual(self.compute(), {"value": 1})
+        self.assertEqual(self.compute(), {"value": 1})
+        self.compute("page-2")
+
+        self.assertEqual(self.computation.call_count, 2)
+        self.assertEqual((statistics.hits, statistics.misses), (1, 2))
+        self.assertEqual(statistics.ratio, 1 / 3)
+
+    def test_bump_generation(self):  # noqa: D102
+        self.computation = mock.Mock(return_value=1)
+        other = create_profile("other")
+        get_or_compute("test", other.pk, "page-1", self.computation)
+        self.compute()
+
+        bump_generation(self.profile.pk)
+        self.compute()
+        get_or_compute("test", other.pk, "page-1", self.computation)
+
+        self.assertEqual(self.computation.call_count, 3)
+
+    def test_async_entries_are_shared(self):  # noqa: D102
+        self.computation = mock.Mock(return_value=1)
+        self.compute()
+
+        async def compute():
+            return 2
+
+        value = async_to_sync(aget_or_compute)(
+            "test", self.profile.pk, "page-1", compute
+        )
+
+        self.assertEqual(value, 1)
+        self.assertEqual(self.computation.call_count, 1)
+
+    def test_run_created(self):  # noqa: D102
+        self.assertBumped(
+            lambda: Run.objects.create(profile=self.profile, **get_run_values(10))
+        )
+
+    def test_run_updated(self):  # noqa: D102
+        run = self.runs[0]
+        run.coins += 1
+
+        self.assertBumped(run.save)
+
+    def test_run_deleted(self):  # noqa: D102
+        self.assertBumped(self.runs[0].delete)
+
+    def test_profile_updated(self):  # noqa: D102
+        self.profile.settings_tracker_avg_windows = "5,20"
+
+        self.assertBumped(self.profile.save)
+
+    def test_profile_deleted(self):  # noqa: D102
+        self.assertBumped(self.profile.delete)
+
+    def test_rollback(self):  # noqa: D102
+        generation = get_generation(self.profile.pk)
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.runs[0].delete()
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(get_generation(self.profile.pk), generation)
+
+
+class DisabledCacheTest(TestCase):  # noqa: D101
+    def test_disabled(self):  # noqa: D102
+        computation = mock.Mock(return_value=1)
+
+        get_or_compute("test", 1, "page-1", computation)
+        get_or_compute("test", 1, "page-1", computation)
+        bump_generation(1)
+
+        self.assertIsNone(get_cache())
+        self.assertEqual(computation.call_count, 2)
@@ -0,0 +1,144 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Test the implementations to evaluate runs against each other.
+
+All engines of :data:`penthouse.views.tracker.TRACKER_ENGINES` have to provide
+the same results, for all runs as well as for single pages, that are seeded
+with the preceding runs.
+"""
+
+# Django imports
+from django.test import TestCase, override_settings
+
+# app imports
+from penthouse.models.tracker import Run, RunMetric
+from penthouse.pagination import KeysetPaginator
+from penthouse.views.tracker import (
+    RUN_FIELDS,
+    TRACKER_ENGINES,
+    evaluate_tiers,
+    get_overview,
+    get_tier_queryset,
+)
+from tests.util.fixtures import create_profile, create_runs
+
+PAGE_SIZE = 7
+"""The number of runs per page, not a divisor of the number of runs."""
+
+
+def get_values(items):
+    """Return the evaluated values of ``RunData`` instances as tuples."""
+    return [
+        (
+            *(getattr(item, field) for field in RUN_FIELDS),
+            item.coins_hour,
+            item.coins_wave,
+            item.cells_hour,
+            item.cells_wave,
+            item.pb_coins,
+            item.pb_coins_hour,
+            item.pb_cells,
+            item.pb_cells_hour,
+            [
+                (
+                    averages.window,
+                    averages.coins,
+                    averages.coins_hour,
+                    averages.cells,
+                    averages.cells_hour,
+                )
+                for averages in item.averages
+            ],
+        )
+        for item in items
+    ]
+
+
+def get_pages(runs):
+    """Return the ``KeysetPage`` instances of all pages, from the latest one."""
+    paginator = KeysetPaginator(runs, PAGE_SIZE)
+    pages = [paginator.get_page()]
+    while pages[-1].has_previous:
+        pages.append(paginator.get_page(before=pages[-1].start))
+
+    return pages
+
+
+class TrackerEngineTest(TestCase):  # noqa: D101
+    @classmethod
+    def setUpTestData(cls):  # noqa: D102
+        cls.profile = create_profile()
+        cls.profile.settings_tracker_avg_windows = "3,10"
+        cls.profile.save()
+        cls.runs = create_runs(cls.profile, 45)
+        create_runs(create_profile("other"), 10)
+
+    def setUp(self):  # noqa: D102
+        self.windows = self.profile.get_avg_windows()
+
+    def get_querysets(self):
+        """Provide the runs of the test profile, all and by tier."""
+        runs = Run.objects.filter_by_profile(self.profile.pk)
+        yield "all", runs
+        for tier in ("T1", "T2", "T3"):
+            yield tier, runs.filter(tier=tier)
+
+    def evaluate(self, engine, runs, start=None, end=None):
+        """Evaluate the runs with ``engine``."""
+        return get_values(TRACKER_ENGINES[engine](runs, self.windows, start, end))
+
+    def test_all_runs(self):  # noqa: D102
+        for name, runs in self.get_querysets():
+            expected = self.evaluate("python", runs)
+            self.assertEqual(len(expected), runs.count())
+            for engine in TRACKER_ENGINES:
+                with self.subTest(runs=name, engine=engine):
+                    self.assertEqual(self.evaluate(engine, runs), expected)
+
+    def test_pages(self):
+        """Pages are evaluated in the context of their preceding runs."""
+        for name, runs in self.get_querysets():
+            expected = self.evaluate("python", runs)
+            pages = get_pages(runs)
+            self.assertGreater(len(pages), 1)
+
+            for engine in TRACKER_ENGINES:
+                evaluated = []
+                for page in reversed(pages):
+                    evaluated += self.evaluate(engine, runs, page.start, page.end)
+                with self.subTest(runs=name, engine=engine):
+                    self.assertEqual(evaluated, expected)
+
+    def test_tiers(self):  # noqa: D102
+        rows = list(get_tier_queryset(Run.objects.filter_by_profile(self.profile.pk)))
+
+        expected = evaluate_tiers(rows)
+
+        self.assertEqual(list(expected), ["T1", "T2", "T3"])
+        for engine in TRACKER_ENGINES:
+            with self.subTest(engine=engine):
+                with override_settings(PENTHOUSE_TRACKER_ENGINE=engine):
+                    self.assertEqual(evaluate_tiers(rows[::-1]), expected)
+
+    @override_settings(PENTHOUSE_TRACKER_PAGE_SIZE=PAGE_SIZE)
+    def test_overview(self):  # noqa: D102
+        for name, runs in self.get_querysets():
+            for page in get_pages(runs)[:3]:
+                results = {}
+                for engine in TRACKER_ENGINES:
+                    with override_settings(PENTHOUSE_TRACKER_ENGINE=engine):
+                        overview = get_overview(
+                            self.profile, runs, before=page.end, filtered=name != "all"
+                        )
+                    overview["runs"] = get_values(overview["runs"])
+                    overview["page"] = vars(overview["page"])
+                    for metric in RunMetric.values:
+                        key = "pb_{}".format(metric)
+                        overview[key] = overview[key].id
+                    results[engine] = overview
+
+                with self.subTest(runs=name, before=page.end):
+                    self.assertEqual(results["numpy"], results["python"])
+                    self.assertEqual(results["database"], results["python"])
@@ -0,0 +1,143 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Test the bulk import of runs, see :mod:`penthouse.importer`."""
+
+# Python imports
+import csv
+import io
+import json
+from unittest import mock
+
+# Django imports
+from django.db import connection
+from django.test import TestCase
+
+# app imports
+from penthouse.importer import FORMAT_CSV, FORMAT_JSONL, RunImporter
+from penthouse.models.tracker import Run
+from tests.util.fixtures import (
+    create_profile,
+    get_personal_bests,
+    get_rebuilt_personal_bests,
+    get_rebuilt_sketches,
+    get_sketches,
+)
+
+HEADER = "date,tier,waves,duration,coins,cells,notes\n"
+
+ROWS = [
+    "2024-10-01 10:00,T1,1000,1:00:00,1.5T,1.2K,first\n",
+    "2024-10-01 11:00,T2,1200,1h 2m 3s,2T,1500,\n",
+    "2024-10-01 12:00,T1,900,3600,900B,900,\n",
+    "2024-10-01 13:00,T3,800,2h,3.5T,2K,\n",
+    "2024-10-01 14:00,T2,1100,5400,2.5T,1.8K,last\n",
+]
+
+
+def to_jsonl(csv_text):
+    """Convert the CSV test data to JSON Lines."""
+    return "".join(
+        json.dumps(row) + "\n" for row in csv.DictReader(io.StringIO(csv_text))
+    )
+
+
+class RunImporterTest(TestCase):  # noqa: D101
+    @classmethod
+    def setUpTestData(cls):  # noqa: D102
+        cls.profile = create_profile()
+
+    def import_text(self, text, file_format, **kwargs):
+        """Import ``text`` for the test profile."""
+        return RunImporter(self.profile, **kwargs).import_stream(
+            io.StringIO(text), file_format
+        )
+
+    def assertDerivedData(self):  # noqa: N802
+        """Assert that the derived data matches a full rebuild."""
+        self.assertEqual(
+            get_personal_bests(self.profile), get_rebuilt_personal_bests(self.profile)
+        )
+        self.assertEqual(get_sketches(self.profile), get_rebuilt_sketches(self.profile))
+
+    def test_csv(self):  # noqa: D102
+        result = self.import_text(HEADER + "".join(ROWS), FORMAT_CSV)
+
+        self.assertEqual((result.created, result.error_count), (5, 0))
+        run = Run.objects.get(notes="first")
+        self.assertEqual(
+            (run.tier, run.waves, run.duration, run.coins, run.cells),
+            ("T1", 1000, 3600, 1500 * 10**9, 1200),
+        )
+        self.assertEqual(Run.objects.get(tier="T2", waves=1200).duration, 3723)
+        self.assertDerivedData()
+
+    def test_jsonl(self):  # noqa: D102
+        text = to_jsonl(HEADER + "".join(ROWS)) + "\nnot json\n[1, 2]\n"
+
+        result = self.import_text(text, FORMAT_JSONL)
+
+        self.assertEqual((result.created, result.error_count), (5, 2))
+        self.assertEqual([line for line, _messages in result.errors], [7, 8])
+        self.assertEqual(
+            list(Run.objects.order_by("date").values_list("notes", flat=True)),
+            ["first", "", "", "", "last"],
+        )
+        self.assertDerivedData()
+
+    def test_row_errors(self):  # noqa: D102
+        max_cells = connection.ops.integer_field_range("PositiveIntegerField")[1]
+        invalid = [
+            "2024-10-02 10:00,T99,1000,3600,1T,1K,\n",
+            "2024-10-02 11:00,T1,,3600,1T,1K,\n",
+            "2024-10-02 12:00,T1,1000,0,1T,1K,\n",
+            "2024-10-02 13:00,T1,1000,3600,100O,1K,\n",
+            "2024-10-02 14:00,T1,1000,3600,1T,{},\n".format(max_cells + 1),
+        ]
+
+        result = self.import_text(HEADER + ROWS[0] + "".join(invalid), FORMAT_CSV)
+
+        self.assertEqual((result.created, result.error_count), (1, 5))
+        errors = dict(result.errors)
+        self.assertEqual(sorted(errors), [3, 4, 5, 6, 7])
+        self.assertTrue(errors[3][0].startswith("tier: "))
+        self.assertTrue(errors[4][0].startswith("waves: "))
+        self.assertTrue(errors[5][0].startswith("duration: "))
+        self.assertIn("less than or equal to", errors[6][0])
+        self.assertTrue(errors[6][0].startswith("coins: "))
+        self.assertTrue(errors[7][0].startswith("cells: "))
+        self.assertDerivedData()
+
+    def test_max_errors(self):  # noqa: D102
+        text = HEADER + "invalid\n" * 5
+
+        result = self.import_text(text, FORMAT_CSV, max_errors=2)
+
+        self.assertEqual((result.created, result.error_count), (0, 5))
+        self.assertEqual(len(result.errors), 2)
+
+    def test_batches(self):  # noqa: D102
+        importer = RunImporter(self.profile, batch_size=2)
+
+        with mock.patch.object(
+            RunImporter, "_insert", autospec=True, side_effect=RunImporter._insert
+        ) as insert:
+            result = importer.import_stream(
+                io.StringIO(HEADER + "".join(ROWS)), FORMAT_CSV
+            )
+
+        self.assertEqual(result.created, 5)
+        self.assertEqual(
+            [len(call.args[1]) for call in insert.call_args_list], [2, 2, 1]
+        )
+        self.assertEqual(Run.objects.filter(profile=self.profile).count(), 5)
+        self.assertDerivedData()
+
+    def test_import_into_existing_runs(self):  # noqa: D102
+        self.import_text(HEADER + "".join(ROWS[:3]), FORMAT_CSV)
+
+        result = self.import_text(HEADER + "".join(ROWS[3:]), FORMAT_CSV, batch_size=1)
+
+        self.assertEqual(result.created, 2)
+        self.assertDerivedData()
@@ -0,0 +1,182 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Test the resolution of the user's profile, see :mod:`penthouse.middleware`."""
+
+# Python imports
+from importlib import import_module
+
+# Django imports
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+# external imports
+from asgiref.sync import async_to_sync
+
+# app imports
+from penthouse.cache import bump_generation, get_cache, get_generation
+from penthouse.middleware import (
+    SESSION_KEY,
+    ProfileMiddleware,
+    aget_profile,
+    get_profile,
+    get_profile_id,
+)
+from penthouse.models.profile import Profile
+from tests.util.fixtures import create_profile
+
+RESOLVERS = (("sync", get_profile), ("async", async_to_sync(aget_profile)))
+"""The functions to resolve the profile of a request."""
+
+
+def get_request(user, session=None):
+    """Provide a request of ``user`` with a stored session.
+
+    The session is loaded from the database again, as by Django's
+    ``SessionMiddleware`` on every request.
+    """
+    request = RequestFactory().get("/")
+    request.user = user
+
+    async def auser():
+        return user
+
+    request.auser = auser
+    if session is None:
+        session = import_module(settings.SESSION_ENGINE).SessionStore()
+    session.save()
+    request.session = session.__class__(session.session_key)
+
+    return request
+
+
+class ProfileTest(TestCase):  # noqa: D101
+    @classmethod
+    def setUpTestData(cls):  # noqa: D102
+        cls.profile = create_profile()
+        cls.user = get_user_model().objects.create_user(username="no-profile")
+
+    def test_profile(self):  # noqa: D102
+        for name, resolve in RESOLVERS:
+            with self.subTest(resolve=name):
+                request = get_request(self.profile.owner)
+
+                with self.assertNumQueries(1):
+                    self.assertEqual(resolve(request), self.profile)
+                    self.assertEqual(resolve(request), self.profile)
+
+    def test_no_profile(self):
+        """The profile's ID is removed from the session of a user without profile."""
+        for name, resolve in RESOLVERS:
+            with self.subTest(resolve=name):
+                request = get_request(self.user)
+                request.session[SESSION_KEY] = [self.profile.pk, 1]
+                request = get_request(self.user, request.session)
+                request._cached_penthouse_profile_id = self.profile.pk
+
+                with self.assertRaises(Profile.DoesNotExist):
+                    resolve(request)
+
+                self.assertNotIn(SESSION_KEY, request.session)
+                self.assertFalse(hasattr(request, "_cached_penthouse_profile_id"))
+
+
+class ProfileMiddlewareTest(TestCase):  # noqa: D101
+    @classmethod
+    def setUpTestData(cls):  # noqa: D102
+        cls.profile = create_profile()
+
+    def test_sync(self):  # noqa: D102
+        request = get_request(self.profile.owner)
+        middleware = ProfileMiddleware(lambda request: HttpResponse())
+
+        with self.assertNumQueries(0):
+            middleware(request)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(request.penthouse_profile.pk, self.profile.pk)
+            self.assertEqual(get_profile(request), self.profile)
+
+    def test_async(self):  # noqa: D102
+        request = get_request(self.profile.owner)
+
+        async def get_response(request):
+            await aget_profile(request)
+            return HttpResponse()
+
+        with self.assertNumQueries(1):
+            async_to_sync(ProfileMiddleware(get_response))(request)
+            self.assertEqual(request.penthouse_profile.pk, self.profile.pk)
+
+
+@override_settings(PENTHOUSE_CACHE_ALIAS="default", PENTHOUSE_PROFILE_SESSION=True)
+class ProfileSessionTest(TestCase):  # noqa: D101
+    @classmethod
+    def setUpTestData(cls):  # noqa: D102
+        cls.profile = create_profile()
+
+    def setUp(self):  # noqa: D102
+        get_cache().clear()
+        self.request = get_request(self.profile.owner)
+
+    def next_request(self):
+        """Provide the next request of the same session."""
+        self.request = get_request(self.profile.owner, self.request.session)
+        return self.request
+
+    def test_session(self):  # noqa: D102
+        with self.assertNumQueries(2):
+            # the profile and the session
+            self.assertEqual(get_profile_id(self.request), self.profile.pk)
+            self.assertEqual(get_profile_id(self.request), self.profile.pk)
+
+        self.assertEqual(
+            self.request.session[SESSION_KEY],
+            [self.profile.pk, get_generation(self.profile.pk)],
+        )
+
+        request = self.next_request()
+        with self.assertNumQueries(1):
+            # the session only
+            self.assertEqual(get_profile_id(request), self.profile.pk)
+
+    def test_stale_generation(self):
+        """The profile is fetched again, after its generation was replaced."""
+        get_profile_id(self.request)
+        bump_generation(self.profile.pk)
+        generation = get_generation(self.profile.pk)
+
+        request = self.next_request()
+        with self.assertNumQueries(2):
+            self.assertEqual(get_profile_id(request), self.profile.pk)
+
+        self.assertEqual(request.session[SESSION_KEY], [self.profile.pk, generation])
+
+    def test_deleted_profile(self):
+        """The ID of a deleted profile is not used, but removed."""
+        get_profile_id(self.request)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.delete()
+
+        request = self.next_request()
+        with self.assertRaises(Profile.DoesNotExist):
+            get_profile_id(request)
+        self.assertNotIn(SESSION_KEY, request.session)
+
+        profile = Profile.objects.create(owner=self.profile.owner)
+        request = self.next_request()
+        self.assertEqual(get_profile_id(request), profile.pk)
+
+    @override_settings(PENTHOUSE_CACHE_ALIAS=None)
+    def test_no_cache(self):
+        """Without a cache, there is no generation, so the session is not used."""
+        get_profile_id(self.request)
+        self.assertNotIn(SESSION_KEY, self.request.session)
+
+        self.request.session[SESSION_KEY] = [self.profile.pk + 1, 1]
+        request = self.next_request()
+        with self.assertNumQueries(1):
+            self.assertEqual(get_profile_id(request), self.profile.pk)
@@ -0,0 +1,157 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Test the keyset pagination of runs, see :mod:`penthouse.pagination`."""
+
+# Python imports
+from datetime import timedelta
+
+# Django imports
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+# external imports
+from asgiref.sync import async_to_sync
+
+# app imports
+from penthouse.models.tracker import Run
+from penthouse.pagination import KeysetPaginator, decode_cursor, encode_cursor
+from tests.util.fixtures import START, create_profile, create_runs, get_run_values
+
+
+class CursorTest(SimpleTestCase):  # noqa: D101
+    def test_round_trip(self):  # noqa: D102
+        for key in ((START, 1), (START + timedelta(microseconds=5), 12345)):
+            with self.subTest(key=key):
+                self.assertEqual(decode_cursor(encode_cursor(key)), key)
+
+    def test_invalid(self):  # noqa: D102
+        cursor = encode_cursor((START, 12))
+        for value in (
+            None,
+            "",
+            "garbage",
+            cursor.replace("_", "-"),
+            cursor[:-2] + "x",
+            cursor.replace("2024-10", "2024-13"),
+            "_12",
+        ):
+            with self.subTest(value=value):
+                self.assertIsNone(decode_cursor(value))
+
+
+class KeysetPaginatorTest(TestCase):  # noqa: D101
+    @classmethod
+    def setUpTestData(cls):  # noqa: D102
+        cls.profile = create_profile()
+        cls.runs = []
+        for index in range(8):
+            values = get_run_values(index)
+            # three runs of the same date, only distinguished by their id
+            if index in (4, 5):
+                values["date"] = cls.runs[3].date
+            cls.runs.append(Run.objects.create(profile=cls.profile, **values))
+        create_runs(create_profile("other"), 4, offset=2)
+
+        cls.keys = [(run.date, run.pk) for run in cls.runs]
+
+    def setUp(self):  # noqa: D102
+        self.paginator = KeysetPaginator(
+            Run.objects.filter_by_profile(self.profile.pk), 3
+        )
+
+    def get_keys(self, page):
+        """Return the keys of the runs of a page."""
+        return [key for key in self.keys if page.start <= key <= page.end]
+
+    def test_latest_page(self):  # noqa: D102
+        page = self.paginator.get_page()
+
+        self.assertEqual(self.get_keys(page), self.keys[-3:])
+        self.assertTrue(page.has_previous)
+        self.assertFalse(page.has_next)
+        self.assertIsNone(page.next_cursor)
+
+    def test_before(self):
+        """Walk from the latest to the first page."""
+        pages = [self.paginator.get_page()]
+        while pages[-1].has_previous:
+            pages.append(
+                self.paginator.get_page(before=decode_cursor(pages[-1].previous_cursor))
+            )
+
+        self.assertEqual(
+            [self.get_keys(page) for page in pages],
+            [self.keys[5:], self.keys[2:5], self.keys[:2]],
+        )
+        self.assertEqual(
+            [(page.has_previous, page.has_next) for page in pages],
+            [(True, False), (True, True), (False, True)],
+        )
+        self.assertIsNone(pages[-1].previous_cursor)
+
+    def test_after(self):
+        """Walk from the first to the latest page."""
+        pages = [self.paginator.get_page(after=(START - timedelta(days=1), 0))]
+        while pages[-1].has_next:
+            pages.append(
+                self.paginator.get_page(after=decode_cursor(pages[-1].next_cursor))
+            )
+
+        self.assertEqual(
+            [self.get_keys(page) for page in pages],
+            [self.keys[:3], self.keys[3:6], self.keys[6:]],
+        )
+        self.assertEqual(
+            [(page.has_previous, page.has_next) for page in pages],
+            [(False, True), (True, True), (True, False)],
+        )
+
+    def test_same_date(self):
+        """Runs of the same date are split between pages by their id."""
+        page = self.paginator.get_page(before=self.keys[5])
+
+        self.assertEqual(self.get_keys(page), self.keys[2:5])
+        self.assertEqual(page.start[0], START + timedelta(hours=2))
+        self.assertEqual(page.end, self.keys[4])
+
+        page = self.paginator.get_page(after=self.keys[3])
+
+        self.assertEqual(self.get_keys(page), self.keys[4:7])
+
+    def test_empty(self):  # noqa: D102
+        for kwargs in ({"before": self.keys[0]}, {"after": self.keys[-1]}):
+            with self.subTest(**kwargs):
+                page = self.paginator.get_page(**kwargs)
+                self.assertFalse(page)
+                self.assertFalse(page.has_previous or page.has_next)
+
+        paginator = KeysetPaginator(Run.objects.none(), 3)
+        self.assertFalse(paginator.get_page())
+
+    def test_async(self):  # noqa: D102
+        for kwargs in ({}, {"before": self.keys[5]}, {"after": self.keys[3]}):
+            with self.subTest(**kwargs):
+                page = self.paginator.get_page(**kwargs)
+                async_page = async_to_sync(self.paginator.aget_page)(**kwargs)
+                self.assertEqual(vars(async_page), vars(page))
+
+    @override_settings(PENTHOUSE_TRACKER_PAGE_SIZE=3)
+    def test_invalid_cursor(self):
+        """The overview falls back to the latest page on invalid cursors."""
+        self.client.force_login(self.profile.owner)
+        url = reverse("penthouse:tracker-overview")
+        cursor = encode_cursor(self.keys[0])
+
+        for data in (
+            {"before": "garbage"},
+            {"after": cursor + "x"},
+            {"before": cursor},
+        ):
+            with self.subTest(**data):
+                response = self.client.get(url, data)
+
+                self.assertEqual(response.status_code, 200)
+                page = response.context["page"]
+                self.assertEqual(self.get_keys(page), self.keys[-3:])
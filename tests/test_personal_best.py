@@ -0,0 +1,171 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Test the maintenance of the stored personal bests.
+
+After every change of runs, the stored personal bests have to match a full
+rebuild, see :meth:`PersonalBestManager.rebuild() <penthouse.models.personal_best.PersonalBestManager.rebuild>`.
+"""
+
+# Django imports
+from django.test import TestCase
+
+# app imports
+from penthouse.bulk import delete_profile, delete_runs
+from penthouse.models.personal_best import GLOBAL_SCOPE, PersonalBest
+from penthouse.models.profile import Profile
+from penthouse.models.tracker import Run, RunMetric
+from penthouse.signals import suspend_run_receivers
+from tests.util.fixtures import (
+    create_profile,
+    create_runs,
+    get_personal_bests,
+    get_rebuilt_personal_bests,
+    get_run_values,
+)
+
+
+class PersonalBestTest(TestCase):  # noqa: D101
+    @classmethod
+    def setUpTestData(cls):  # noqa: D102
+        cls.profile = create_profile()
+        cls.runs = create_runs(cls.profile, 30)
+
+    def assertPersonalBests(self, profile=None):  # noqa: N802
+        """Assert that the stored personal bests match a full rebuild."""
+        profile = profile or self.profile
+        stored = get_personal_bests(profile)
+
+        self.assertEqual(stored, get_rebuilt_personal_bests(profile))
+        return stored
+
+    def get_holder(self, tier=GLOBAL_SCOPE, metric=RunMetric.COINS):
+        """Return the run holding a personal best of the test profile."""
+        return PersonalBest.objects.get(
+            profile=self.profile, tier=tier, metric=metric
+        ).run
+
+    def test_created(self):  # noqa: D102
+        stored = self.assertPersonalBests()
+
+        self.assertEqual(
+            {(tier, metric) for tier, metric, _run_id, _value in stored},
+            {
+                (tier, metric)
+                for tier in (GLOBAL_SCOPE, "T1", "T2", "T3")
+                for metric in RunMetric.values
+            },
+        )
+        self.assertEqual(self.get_holder().coins, max(run.coins for run in self.runs))
+
+    def test_raised(self):  # noqa: D102
+        run = self.runs[4]
+        run.coins = self.get_holder().coins + 1
+        run.save()
+
+        self.assertPersonalBests()
+        self.assertEqual(self.get_holder(), run)
+        self.assertEqual(self.get_holder(run.tier), run)
+
+    def test_lowered(self):  # noqa: D102
+        holder = self.get_holder()
+        tier_holder = self.get_holder(holder.tier, RunMetric.CELLS_HOUR)
+        holder.coins = 1
+        holder.save()
+
+        self.assertPersonalBests()
+        self.assertNotEqual(self.get_holder(), holder)
+        self.assertEqual(
+            self.get_holder(holder.tier, RunMetric.CELLS_HOUR), tier_holder
+        )
+
+    def test_tie(self):
+        """The earlier run keeps the personal best on the same value."""
+        holder = self.get_holder()
+        run = Run.objects.create(
+            profile=self.profile,
+            **dict(get_run_values(100), tier=holder.tier, coins=holder.coins)
+        )
+
+        self.assertPersonalBests()
+        self.assertEqual(self.get_holder(), holder)
+
+        run.date = holder.date.replace(year=2000)
+        run.save()
+
+        self.assertPersonalBests()
+        self.assertEqual(self.get_holder(), run)
+
+    def test_moved_to_another_tier(self):  # noqa: D102
+        holder = self.get_holder("T1")
+        holder.tier = "T2" if holder.tier != "T2" else "T3"
+        holder.save()
+
+        self.assertPersonalBests()
+        self.assertNotEqual(self.get_holder("T1"), holder)
+
+    def test_moved_to_a_new_tier(self):  # noqa: D102
+        run = self.runs[0]
+        run.tier = "T9"
+        run.save()
+
+        stored = self.assertPersonalBests()
+        self.assertIn(("T9", RunMetric.COINS, run.pk, run.coins), stored)
+
+    def test_deleted(self):  # noqa: D102
+        holder = self.get_holder()
+        holder.delete()
+
+        self.assertPersonalBests()
+        self.assertNotEqual(self.get_holder().pk, holder.pk)
+
+    def test_last_run_of_tier_deleted(self):  # noqa: D102
+        run = Run.objects.create(profile=self.profile, **get_run_values(100, ("T9",)))
+        run.delete()
+
+        stored = self.assertPersonalBests()
+        self.assertNotIn("T9", {tier for tier, *_rest in stored})
+
+    def test_suspended_receivers(self):
+        """Suspended receivers leave the personal bests to the caller."""
+        holder = self.get_holder()
+        holder.coins = 1
+
+        with suspend_run_receivers():
+            holder.save()
+            Run.objects.create(profile=self.profile, **get_run_values(100, ("T9",)))
+
+        stored = get_personal_bests(self.profile)
+        self.assertEqual(self.get_holder(), holder)
+        self.assertNotIn("T9", {tier for tier, *_rest in stored})
+        self.assertNotEqual(stored, get_rebuilt_personal_bests(self.profile))
+
+    def test_delete_runs(self):  # noqa: D102
+        other = create_profile("other")
+        other_runs = create_runs(other, 6)
+        holders = [self.get_holder(), self.get_holder("T2", RunMetric.CELLS)]
+
+        count = delete_runs(
+            Run.objects.filter(
+                pk__in=[run.pk for run in holders + other_runs[:2] + self.runs[:3]]
+            )
+        )
+
+        self.assertEqual(count, len({run.pk for run in holders + self.runs[:3]}) + 2)
+        self.assertPersonalBests()
+        self.assertPersonalBests(other)
+
+    def test_delete_profile(self):  # noqa: D102
+        other = create_profile("other")
+        create_runs(other, 6)
+        profile_id = self.profile.pk
+
+        # independent of the number of runs
+        with self.assertNumQueries(13):
+            delete_profile(self.profile)
+
+        self.assertFalse(Profile.objects.filter(pk=profile_id).exists())
+        self.assertFalse(PersonalBest.objects.filter(profile_id=profile_id).exists())
+        self.assertFalse(Run.objects.filter(profile_id=profile_id).exists())
+        self.assertPersonalBests(other)
@@ -0,0 +1,82 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Assert the query budgets of all views of :mod:`penthouse.urls`.
+
+Every view has to provide a budget in ``PENTHOUSE_QUERY_BUDGETS`` of the test
+settings, see :func:`penthouse.metrics.assert_query_budget`. The views are
+requested by a logged in user, so the budgets include the queries of the
+session and the user. Caching is disabled, so the views compute their data.
+"""
+
+# Python imports
+from datetime import datetime, timedelta, timezone
+
+# Django imports
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+# app imports
+from penthouse import urls
+from penthouse.metrics import assert_query_budget
+from penthouse.models.profile import Profile
+from penthouse.models.tracker import Run
+
+REQUESTS = {
+    "tracker-run-bulk": {
+        "method": "post",
+        "data": lambda run: {"runs": [run.pk], "action": "delete"},
+    },
+    "tracker-run-delete": {"kwargs": lambda run: {"run_id": run.pk}},
+    "tracker-run-export": {"kwargs": lambda run: {"file_format": "csv"}},
+    "tracker-run-update": {"kwargs": lambda run: {"run_id": run.pk}},
+}
+"""The arguments of the requests of views, that do not provide a plain GET."""
+
+
+class QueryBudgetTest(TestCase):  # noqa: D101
+    @classmethod
+    def setUpTestData(cls):  # noqa: D102
+        cls.user = get_user_model().objects.create_user(
+            username="player", is_staff=True
+        )
+        profile, _created = Profile.objects.get_or_create(owner=cls.user)
+
+        date = datetime(2024, 10, 1, tzinfo=timezone.utc)
+        for index, tier in enumerate(["T1", "T2", "T3"] * 10):
+            cls.last_run = Run.objects.create(
+                profile=profile,
+                date=date + timedelta(hours=index),
+                tier=tier,
+                waves=1000 + index,
+                duration=3600 + index,
+                coins=10**9 + index,
+                cells=10**4 + index,
+            )
+
+    def setUp(self):  # noqa: D102
+        self.client.force_login(self.user)
+
+    def test_views(self):  # noqa: D102
+        for pattern in urls.urlpatterns:
+            view_name = "{}:{}".format(urls.app_name, pattern.name)
+            request = REQUESTS.get(pattern.name, {})
+            with self.subTest(view=view_name):
+                response = assert_query_budget(
+                    self.client,
+                    view_name,
+                    method=request.get("method", "get"),
+                    kwargs=request.get("kwargs", lambda run: None)(self.last_run),
+                    data=request.get("data", lambda run: None)(self.last_run),
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_exceeded_budget(self):  # noqa: D102
+        with self.assertRaisesMessage(AssertionError, "budget: 1"):
+            assert_query_budget(self.client, "penthouse:tracker-overview", budget=1)
+
+    def test_missing_budget(self):  # noqa: D102
+        with self.settings(PENTHOUSE_QUERY_BUDGETS={}):
+            with self.assertRaisesMessage(AssertionError, "No query budget"):
+                assert_query_budget(self.client, "penthouse:tracker-overview")
@@ -0,0 +1,111 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Verify the query plans of the run tracker's queries of runs.
+
+The queries are explained by the database (``EXPLAIN QUERY PLAN`` of SQLite)
+and have to search the indexes of ``Run``: they may neither scan a table nor
+sort the runs in a temporary b-tree. Only the results of subqueries, e.g. the
+window of the latest runs per tier, may be scanned.
+"""
+
+# Python imports
+from datetime import datetime, timedelta, timezone
+from unittest import skipUnless
+
+# Django imports
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+
+# app imports
+from penthouse.models.personal_best import GLOBAL_SCOPE, PersonalBest
+from penthouse.models.profile import Profile
+from penthouse.models.tracker import Run, RunMetric
+from penthouse.pagination import KeysetPaginator
+from penthouse.views.tracker import get_tier_queryset
+
+
+def explain(queryset):
+    """Return the details of the query plan of ``queryset``."""
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN QUERY PLAN {}".format(sql), params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+@skipUnless(connection.vendor == "sqlite", "The plans are verified for SQLite")
+class QueryPlanTest(TestCase):  # noqa: D101
+    @classmethod
+    def setUpTestData(cls):  # noqa: D102
+        cls.user = get_user_model().objects.create_user(username="player")
+        cls.profile, _created = Profile.objects.get_or_create(owner=cls.user)
+
+        date = datetime(2024, 10, 1, tzinfo=timezone.utc)
+        for index, tier in enumerate(["T1", "T2", "T3"] * 4):
+            Run.objects.create(
+                profile=cls.profile,
+                date=date + timedelta(hours=index),
+                tier=tier,
+                waves=1000 + index,
+                duration=3600 + index,
+                coins=10**9 + index,
+                cells=10**4 + index,
+            )
+
+        cls.runs = Run.objects.filter_by_profile(cls.profile.pk)
+        cls.key = cls.runs.order_by("date", "id").values_list("date", "id")[5]
+
+    def assertIndexSearch(self, queryset):  # noqa: N802
+        """Assert that ``queryset`` searches the indexes of ``Run``."""
+        plan = explain(queryset)
+        subqueries = {
+            detail.split(" ", 1)[1]
+            for detail in plan
+            if detail.startswith("CO-ROUTINE ")
+        }
+
+        self.assertTrue(
+            any(
+                detail.startswith("SEARCH ") and "INDEX penthouse_run_" in detail
+                for detail in plan
+            ),
+            plan,
+        )
+        for detail in plan:
+            if detail.startswith("SCAN "):
+                self.assertIn(detail.split(" ", 1)[1], subqueries, plan)
+            self.assertNotIn("USE TEMP B-TREE", detail, plan)
+
+    def test_run_list(self):  # noqa: D102
+        for runs in (self.runs, Run.objects.filter_by_user(self.user)):
+            paginator = KeysetPaginator(runs, 5)
+            with self.subTest(query=str(runs.query)):
+                self.assertIndexSearch(paginator._get_keys_query())
+                self.assertIndexSearch(paginator._get_keys_query(before=self.key))
+                self.assertIndexSearch(paginator._get_keys_query(after=self.key))
+
+    def test_latest_runs_by_tier(self):  # noqa: D102
+        self.assertIndexSearch(get_tier_queryset(self.runs))
+
+    def test_tier_list(self):  # noqa: D102
+        paginator = KeysetPaginator(self.runs.filter(tier="T2"), 5)
+
+        self.assertIndexSearch(paginator._get_keys_query())
+        self.assertIndexSearch(paginator._get_keys_query(before=self.key))
+        self.assertIndexSearch(paginator._get_keys_query(after=self.key))
+
+    def test_best_run(self):
+        """The hourly values are expressions, that are not indexed."""
+        for metric in (RunMetric.COINS, RunMetric.CELLS):
+            for runs in (self.runs, self.runs.filter(tier="T2")):
+                with self.subTest(metric=metric, query=str(runs.query)):
+                    self.assertIndexSearch(runs._get_best_query(metric)[:1])
+
+    def test_personal_best_runs(self):  # noqa: D102
+        for tier in (GLOBAL_SCOPE, "T2"):
+            with self.subTest(tier=tier):
+                self.assertIndexSearch(
+                    PersonalBest.objects._get_best_runs_query(self.profile, tier)
+                )
@@ -0,0 +1,156 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Test the import of battle reports, see :mod:`penthouse.reports`."""
+
+# Python imports
+import io
+import os
+import tempfile
+
+# Django imports
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase
+
+# app imports
+from penthouse.importer import FORMAT_REPORT, RunImporter
+from penthouse.models.tracker import Run
+from penthouse.reports import read_battle_reports
+from tests.util.fixtures import create_profile, create_runs
+
+REPORT = """Battle Report
+Battle Date\tOct 14, 2024 13:22
+Game Time\t1d 2h 3m 4s
+Real Time\t6h 12m 3s
+Tier\t10
+Wave\t4,512
+Killed By\tBoss
+Coins Earned\t12.34T
+Cells Earned\t12.3K
+"""
+
+
+def read(text):
+    """Return the rows of the battle reports of ``text``."""
+    return list(read_battle_reports(io.StringIO(text)))
+
+
+class ReadBattleReportsTest(SimpleTestCase):  # noqa: D101
+    def test_single_report(self):  # noqa: D102
+        self.assertEqual(
+            read(REPORT),
+            [
+                (
+                    1,
+                    {
+                        "date": "2024-10-14T13:22:00",
+                        "duration": str(6 * 3600 + 12 * 60 + 3),
+                        "tier": "T10",
+                        "waves": "4512",
+                        "coins": "12.34T",
+                        "cells": "12.3K",
+                    },
+                )
+            ],
+        )
+
+    def test_several_reports(self):  # noqa: D102
+        text = REPORT + "\n" + REPORT.replace("Tier\t10", "Tier\t11") + REPORT
+
+        rows = read(text)
+
+        self.assertEqual([line for line, _row in rows], [1, 11, 20])
+        self.assertEqual([row["tier"] for _line, row in rows], ["T10", "T11", "T10"])
+
+    def test_reports_without_header(self):  # noqa: D102
+        report = REPORT.replace("Battle Report\n", "")
+
+        rows = read(report + report)
+
+        self.assertEqual([line for line, _row in rows], [1, 9])
+        self.assertEqual(rows[0][1], rows[1][1])
+
+    def test_duration_with_days(self):  # noqa: D102
+        rows = read(REPORT.replace("Real Time\t6h 12m 3s", "Real Time\t1d 2h 3m 4s"))
+
+        self.assertEqual(rows[0][1]["duration"], str(((24 + 2) * 60 + 3) * 60 + 4))
+
+    def test_values(self):  # noqa: D102
+        text = "tier: t12\nwave 12,345,678\nbattle date 2024-10-14 13:22\n"
+
+        self.assertEqual(
+            read(text),
+            [
+                (
+                    1,
+                    {
+                        "tier": "T12",
+                        "waves": "12345678",
+                        "date": "2024-10-14 13:22",
+                    },
+                )
+            ],
+        )
+
+    def test_no_reports(self):  # noqa: D102
+        self.assertEqual(read("Tiered\nSome text\n"), [])
+
+
+class ImportBattleReportsTest(TestCase):  # noqa: D101
+    @classmethod
+    def setUpTestData(cls):  # noqa: D102
+        cls.profile = create_profile()
+
+    def import_reports(self, text):
+        """Import the battle reports of ``text`` for the test profile."""
+        return RunImporter(self.profile).import_stream(io.StringIO(text), FORMAT_REPORT)
+
+    def test_import(self):  # noqa: D102
+        result = self.import_reports(REPORT + REPORT.replace("13:22", "15:00"))
+
+        self.assertEqual((result.created, result.error_count), (2, 0))
+        run = Run.objects.filter(profile=self.profile).earliest("date")
+        self.assertEqual(
+            (run.tier, run.waves, run.duration, run.coins, run.cells),
+            ("T10", 4512, 22323, 12340 * 10**9, 12300),
+        )
+
+    def test_invalid_values(self):  # noqa: D102
+        text = (
+            REPORT.replace("Wave\t4,512", "Wave\t99,999")
+            + REPORT.replace("12.34T", "100O")
+            + REPORT
+        )
+
+        result = self.import_reports(text)
+
+        self.assertEqual((result.created, result.error_count), (1, 2))
+        errors = dict(result.errors)
+        self.assertTrue(errors[1][0].startswith("waves: "))
+        self.assertTrue(errors[10][0].startswith("coins: "))
+
+
+class ExportCommandTest(TestCase):  # noqa: D101
+    @classmethod
+    def setUpTestData(cls):  # noqa: D102
+        cls.profile = create_profile()
+        create_runs(cls.profile, 3)
+
+    def test_report_format(self):
+        """Battle reports may only be imported."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "runs.txt")
+
+            with self.assertRaisesMessage(CommandError, "runs.txt"):
+                call_command("penthouse_export_runs", path, user="player")
+            self.assertFalse(os.path.exists(path))
+
+    def test_export(self):  # noqa: D102
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "runs.csv")
+
+            call_command("penthouse_export_runs", path, user="player")
+
+            with open(path, encoding="utf-8") as stream:
+                self.assertEqual(len(stream.readlines()), 4)
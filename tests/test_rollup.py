@@ -0,0 +1,168 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Test the time-bucketed rollups of runs, see :mod:`penthouse.models.rollup`."""
+
+# Python imports
+import io
+from datetime import timedelta
+
+# Django imports
+from django.test import TestCase
+from django.utils import timezone
+
+# app imports
+from penthouse.importer import FORMAT_CSV, RunImporter
+from penthouse.models.rollup import RollupPeriod, RunRollup, get_bucket_start
+from penthouse.models.tracker import Run
+from tests.util.fixtures import create_profile, create_runs, get_run_values
+
+
+def get_rollup_values(rollups):
+    """Return the sums of rollups as ``list`` of tuples."""
+    return [
+        (rollup.tier, rollup.start, rollup.runs, rollup.duration, rollup.coins)
+        for rollup in rollups
+    ]
+
+
+class RunRollupTest(TestCase):  # noqa: D101
+    @classmethod
+    def setUpTestData(cls):  # noqa: D102
+        cls.profile = create_profile()
+        # runs on several days, weeks and months
+        cls.runs = []
+        for index, days in enumerate((0, 0, 1, 3, 9, 9, 20, 35, 36, 70)):
+            values = get_run_values(index)
+            values["date"] += timedelta(days=days)
+            cls.runs.append(Run.objects.create(profile=cls.profile, **values))
+        cls.current_run = Run.objects.create(
+            profile=cls.profile, **dict(get_run_values(10), date=timezone.now())
+        )
+        create_runs(create_profile("other"), 5)
+
+    def get_stored(self, period=RollupPeriod.DAY):
+        """Return the stored rollups of the test profile."""
+        return RunRollup.objects.filter(profile=self.profile, period=period)
+
+    def assertRollups(self):  # noqa: N802
+        """Assert that the rollups match a fresh aggregation of all periods."""
+        runs = Run.objects.filter(profile=self.profile)
+        for period in RollupPeriod.values:
+            with self.subTest(period=period):
+                self.assertEqual(
+                    get_rollup_values(
+                        RunRollup.objects.get_rollups(self.profile, period)
+                    ),
+                    get_rollup_values(RunRollup.objects.compute(runs, period)),
+                )
+
+    def test_closed_buckets(self):
+        """Only the closed buckets are stored."""
+        self.assertRollups()
+
+        for period in RollupPeriod.values:
+            with self.subTest(period=period):
+                stored = self.get_stored(period)
+                current = get_bucket_start(period, timezone.now())
+                self.assertTrue(stored.exists())
+                self.assertFalse(stored.filter(start__gte=current).exists())
+                self.assertEqual(sum(rollup.runs for rollup in stored), len(self.runs))
+
+    def test_tier(self):  # noqa: D102
+        self.assertRollups()
+
+        rollups = RunRollup.objects.get_rollups(
+            self.profile, RollupPeriod.WEEK, tier="T2"
+        )
+
+        self.assertEqual({rollup.tier for rollup in rollups}, {"T2"})
+        self.assertEqual(
+            sum(rollup.runs for rollup in rollups),
+            len([run for run in self.runs + [self.current_run] if run.tier == "T2"]),
+        )
+
+    def test_moved_to_an_earlier_date(self):
+        """The rollups are invalidated from the new date of the run."""
+        self.assertRollups()
+        run = self.runs[-1]
+        run.date = self.runs[2].date
+        run.save()
+
+        stored = self.get_stored()
+        self.assertTrue(stored.exists())
+        self.assertFalse(
+            stored.filter(
+                start__gte=get_bucket_start(RollupPeriod.DAY, run.date)
+            ).exists()
+        )
+        self.assertRollups()
+
+    def test_moved_to_a_later_date(self):  # noqa: D102
+        self.assertRollups()
+        run = self.runs[0]
+        run.date += timedelta(days=40)
+        run.save()
+
+        self.assertRollups()
+
+    def test_updated(self):  # noqa: D102
+        self.assertRollups()
+        run = self.runs[4]
+        run.coins *= 2
+        run.tier = "T9"
+        run.save()
+
+        self.assertRollups()
+
+    def test_deleted(self):  # noqa: D102
+        self.assertRollups()
+        run = self.runs[3]
+        run.delete()
+
+        stored = self.get_stored()
+        self.assertFalse(
+            stored.filter(
+                start__gte=get_bucket_start(RollupPeriod.DAY, run.date)
+            ).exists()
+        )
+        self.assertRollups()
+
+    def test_imported(self):  # noqa: D102
+        self.assertRollups()
+        date = self.runs[5].date - timedelta(hours=1)
+
+        result = RunImporter(self.profile).import_stream(
+            io.StringIO(
+                "date,tier,waves,duration,coins,cells\n"
+                "{},T1,1000,3600,1T,1K\n".format(date.isoformat())
+            ),
+            FORMAT_CSV,
+        )
+
+        self.assertEqual(result.created, 1)
+        self.assertFalse(
+            self.get_stored()
+            .filter(start__gte=get_bucket_start(RollupPeriod.DAY, date))
+            .exists()
+        )
+        self.assertRollups()
+
+    def test_combine(self):  # noqa: D102
+        rollups = RunRollup.objects.get_rollups(self.profile, RollupPeriod.MONTH)
+
+        combined = RunRollup.combine(rollups)
+
+        self.assertEqual(
+            [(rollup.start, rollup.runs) for rollup in combined],
+            [
+                (rollup.start, rollup.runs)
+                for rollup in RunRollup.combine(
+                    RunRollup.objects.compute(
+                        Run.objects.filter(profile=self.profile), RollupPeriod.MONTH
+                    )
+                )
+            ],
+        )
+        self.assertEqual(sum(rollup.runs for rollup in combined), len(self.runs) + 1)
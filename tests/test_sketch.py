@@ -0,0 +1,166 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Test the quantile sketches of runs, see :mod:`penthouse.sketch`."""
+
+# Python imports
+import importlib
+import random
+
+# Django imports
+from django.apps import apps
+from django.test import SimpleTestCase, TestCase
+
+# app imports
+from penthouse.models.sketch import RunSketch, SketchMetric
+from penthouse.models.tracker import Run
+from penthouse.sketch import QUANTILES, RELATIVE_ACCURACY, QuantileSketch
+from tests.util.fixtures import (
+    create_profile,
+    create_runs,
+    get_rebuilt_sketches,
+    get_run_values,
+    get_sketches,
+)
+
+
+def get_exact_quantile(values, q):
+    """Return the ``q``-quantile of ``values``, as ranked by ``QuantileSketch``."""
+    return sorted(values)[int(q * (len(values) - 1))]
+
+
+def create_sketch(values):
+    """Return a sketch of ``values``."""
+    sketch = QuantileSketch()
+    for value in values:
+        sketch.add(value)
+
+    return sketch
+
+
+class QuantileSketchTest(SimpleTestCase):  # noqa: D101
+    def setUp(self):  # noqa: D102
+        generator = random.Random(23)
+        self.values = [int(generator.lognormvariate(12, 2)) for _ in range(5000)]
+
+    def assertQuantiles(self, sketch, values):  # noqa: N802
+        """Assert the quantiles of ``sketch`` within the promised accuracy."""
+        self.assertEqual(sketch.count, len(values))
+        for q in (0, 0.01, 0.25, *QUANTILES, 1):
+            with self.subTest(q=q):
+                exact = get_exact_quantile(values, q)
+                self.assertLessEqual(
+                    abs(sketch.quantile(q) - exact), exact * RELATIVE_ACCURACY
+                )
+
+    def test_quantiles(self):  # noqa: D102
+        self.assertQuantiles(create_sketch(self.values), self.values)
+
+    def test_remove(self):  # noqa: D102
+        sketch = create_sketch(self.values)
+        for value in self.values[:4000]:
+            sketch.remove(value)
+
+        self.assertQuantiles(sketch, self.values[4000:])
+        self.assertEqual(sketch.to_dict(), create_sketch(self.values[4000:]).to_dict())
+
+    def test_remove_all(self):  # noqa: D102
+        sketch = create_sketch(self.values)
+        for value in self.values:
+            sketch.remove(value)
+
+        self.assertEqual(sketch.to_dict(), QuantileSketch().to_dict())
+        self.assertIsNone(sketch.quantile(0.5))
+
+    def test_merge(self):  # noqa: D102
+        sketch = create_sketch(self.values[:1000])
+        sketch.merge(create_sketch(self.values[1000:]))
+
+        self.assertQuantiles(sketch, self.values)
+        self.assertEqual(sketch.to_dict(), create_sketch(self.values).to_dict())
+
+    def test_zeros(self):  # noqa: D102
+        sketch = create_sketch([0, 0, 0, 10, 100])
+
+        self.assertEqual(sketch.quantile(0.5), 0)
+        self.assertLessEqual(abs(sketch.quantile(1) - 100), 100 * RELATIVE_ACCURACY)
+
+    def test_serialization(self):  # noqa: D102
+        sketch = create_sketch(self.values)
+
+        restored = QuantileSketch.from_dict(sketch.to_dict())
+
+        self.assertEqual(restored.to_dict(), sketch.to_dict())
+        self.assertEqual(restored.quantile(0.9), sketch.quantile(0.9))
+
+
+class RunSketchTest(TestCase):  # noqa: D101
+    @classmethod
+    def setUpTestData(cls):  # noqa: D102
+        cls.profile = create_profile()
+        cls.runs = create_runs(cls.profile, 30)
+
+    def assertSketches(self):  # noqa: N802
+        """Assert that the stored sketches match a full rebuild."""
+        self.assertEqual(get_sketches(self.profile), get_rebuilt_sketches(self.profile))
+
+    def test_created(self):  # noqa: D102
+        self.assertEqual(
+            set(get_sketches(self.profile)),
+            {
+                (tier, metric)
+                for tier in ("T1", "T2", "T3")
+                for metric in SketchMetric.values
+            },
+        )
+        self.assertSketches()
+
+    def test_updated(self):  # noqa: D102
+        run = self.runs[0]
+        run.waves += 500
+        run.coins *= 3
+        run.save()
+
+        self.assertSketches()
+
+    def test_moved_to_another_tier(self):  # noqa: D102
+        run = self.runs[1]
+        run.tier = "T5"
+        run.save()
+
+        self.assertIn(("T5", SketchMetric.WAVES), get_sketches(self.profile))
+        self.assertSketches()
+
+    def test_deleted(self):  # noqa: D102
+        run = Run.objects.create(profile=self.profile, **get_run_values(100, ("T7",)))
+        run.delete()
+        self.runs[2].delete()
+
+        self.assertNotIn(("T7", SketchMetric.WAVES), get_sketches(self.profile))
+        self.assertSketches()
+
+    def test_quantiles(self):  # noqa: D102
+        quantiles = RunSketch.objects.get_quantiles(self.profile)
+
+        self.assertEqual(list(quantiles), ["T1", "T2", "T3"])
+        for tier, results in quantiles.items():
+            runs = [run for run in self.runs if run.tier == tier]
+            self.assertEqual(results["runs"], len(runs))
+            values = [run.waves for run in runs]
+            for q, estimate in zip(QUANTILES, results[SketchMetric.WAVES]):
+                exact = get_exact_quantile(values, q)
+                # the estimates are rounded to integers
+                self.assertLessEqual(
+                    abs(estimate - exact), exact * RELATIVE_ACCURACY + 1
+                )
+
+    def test_migration(self):
+        """The frozen sketches of the data migration match the current ones."""
+        migration = importlib.import_module("penthouse.migrations.0008_runsketch")
+        expected = get_rebuilt_sketches(self.profile)
+        RunSketch.objects.all().delete()
+
+        migration.populate_run_sketches(apps, None)
+
+        self.assertEqual(get_sketches(self.profile), expected)
@@ -0,0 +1,86 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Provide the test data of the app's tests."""
+
+# Python imports
+from datetime import datetime, timedelta, timezone
+
+# Django imports
+from django.contrib.auth import get_user_model
+
+# app imports
+from penthouse.models.personal_best import PersonalBest
+from penthouse.models.profile import Profile
+from penthouse.models.sketch import RunSketch
+from penthouse.models.tracker import Run
+
+START = datetime(2024, 10, 1, tzinfo=timezone.utc)
+"""The date of the first run of :func:`create_runs`."""
+
+
+def create_profile(username="player", **kwargs):
+    """Create a user with the given username and return the user's profile."""
+    user = get_user_model().objects.create_user(username=username, **kwargs)
+    profile, _created = Profile.objects.get_or_create(owner=user)
+
+    return profile
+
+
+def get_run_values(index, tiers=("T1", "T2", "T3")):
+    """Provide the values of the ``index``-th run of :func:`create_runs`.
+
+    The values vary, so that personal bests are reached by different runs.
+    """
+    return {
+        "date": START + timedelta(hours=index),
+        "tier": tiers[index % len(tiers)],
+        "waves": 1000 + index * 7 % 11 * 10,
+        "duration": 3600 + index * 37 % 13 * 60,
+        "coins": 10**9 + index * 13 % 17 * 10**7,
+        "cells": 10**4 + index * 5 % 7 * 10**2,
+    }
+
+
+def create_runs(profile, count, tiers=("T1", "T2", "T3"), offset=0):
+    """Create ``count`` runs of a profile, one per hour, saving every run.
+
+    The runs are saved one by one, so the receivers of :mod:`penthouse.signals`
+    maintain the derived data, e.g. the personal bests.
+    """
+    return [
+        Run.objects.create(profile=profile, **get_run_values(index, tiers))
+        for index in range(offset, offset + count)
+    ]
+
+
+def get_personal_bests(profile):
+    """Return the stored personal bests of a profile as ``set`` of tuples."""
+    return set(
+        PersonalBest.objects.filter(profile=profile).values_list(
+            "tier", "metric", "run_id", "value"
+        )
+    )
+
+
+def get_rebuilt_personal_bests(profile):
+    """Rebuild the personal bests of a profile, see :func:`get_personal_bests`."""
+    PersonalBest.objects.rebuild(profile)
+
+    return get_personal_bests(profile)
+
+
+def get_sketches(profile):
+    """Return the stored sketches of a profile as ``dict``."""
+    return {
+        (sketch.tier, sketch.metric): sketch.data
+        for sketch in RunSketch.objects.filter(profile=profile)
+    }
+
+
+def get_rebuilt_sketches(profile):
+    """Rebuild the sketches of a profile, see :func:`get_sketches`."""
+    RunSketch.objects.rebuild(profile)
+
+    return get_sketches(profile)
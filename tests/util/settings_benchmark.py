@@ -0,0 +1,28 @@
+# SPDX-FileCopyrightText: 2024 Mischback
+# SPDX-License-Identifier: MIT
+# SPDX-FileType: SOURCE
+
+"""Settings to run the app's benchmarks, see ``tests/benchmark.py``."""
+
+# Python imports
+import os
+import tempfile
+
+# local imports
+from .settings_test import *  # noqa: F401, F403
+
+# The benchmarks generate their own data in a dedicated database
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.environ.get(
+            "PENTHOUSE_BENCHMARK_DB",
+            os.path.join(tempfile.gettempdir(), "penthouse-benchmark.sqlite"),
+        ),
+    }
+}
+
+DEBUG = False
+
+# Measure the actual computation instead of cache hits
+PENTHOUSE_CACHE_ALIAS = None
@@ -45,9 +45,29 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "penthouse.middleware.ProfileMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
 ]
 
+# The query budgets of the app's views, see tests/test_query_budgets.py
+PENTHOUSE_QUERY_BUDGETS = {
+    "penthouse:leaderboard": 8,
+    "penthouse:metrics": 2,
+    "penthouse:profile-delete": 5,
+    "penthouse:profile-update": 4,
+    "penthouse:tracker-overview": 12,
+    "penthouse:tracker-quantiles-data": 4,
+    "penthouse:tracker-run-add": 3,
+    "penthouse:tracker-run-bulk": 4,
+    "penthouse:tracker-run-delete": 4,
+    "penthouse:tracker-run-export": 4,
+    "penthouse:tracker-run-import": 3,
+    "penthouse:tracker-run-paste": 3,
+    "penthouse:tracker-run-update": 4,
+    "penthouse:tracker-trends": 7,
+    "penthouse:tracker-trends-data": 6,
+}
+
 ROOT_URLCONF = "tests.util.urls_dev"
 
 SECRET_KEY = "only-for-development"  # nosec: this is on purpose, just for development